@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Sonja Stuedli
+
+"""
+Deterministic generator of synthetic BibTeX corpora for the benchmarks.
+
+The same seed always produces the same corpus. The entries mix entry types and contain latex accents, brace protected
+words in titles, long author lists and month strings (including some that are not recognised).
+"""
+
+import random
+
+__all__ = ['generate_entries', 'generate_corpus']
+
+ENTRY_TYPES = (
+    ('article', 45), ('inproceedings', 30), ('book', 6), ('incollection', 5), ('phdthesis', 4), ('techreport', 4),
+    ('misc', 6),
+)
+
+FIRST_NAMES = (
+    'Sonja', 'Etienne', 'Francois', 'Mark', 'Anna', 'J.', 'M.', 'S.', 'E.', 'Karl Johan', 'Jos\\\'{e}', 'Ren\\\'{e}e',
+    'J\\"{o}rg', 'Bj\\"{o}rn', 'Fran\\c{c}ois', 'Zo\\"{e}', 'Nikola', '\\AA{}sa', 'S{\\o}ren', 'Ji\\v{r}\\\'{\\i}',
+    'Maria Jos\\\'{e}', 'Chen', 'Hiroshi', 'Ludwig', 'Jean-Pierre',
+)
+
+LAST_NAMES = (
+    'Stuedli', 'St\\"{u}dli', 'Peters', 'M\\"{u}ller', 'Garc\\\'{i}a', 'Ko\\v{c}i', '\\AA{}str\\"{o}m', 'Smith', 'Brown',
+    'Nguyen', 'Wang', 'Li', 'Kumar', 'Rossi', 'Schr\\"{o}dinger', 'Erd\\H{o}s', 'Gau{\\ss}', 'Lyapunov', 'Markov',
+    'Kalman', 'Dvo\\v{r}\\\'{a}k', 'Nystr\\"{o}m', 'Ca\\~{n}ada', '{\\L}ukasiewicz', 'Fontaine',
+)
+
+VON_PARTS = ('van', 'von', 'de la', 'van der', 'di')
+
+TITLE_WORDS = (
+    'distributed', 'control', 'of', 'networked', 'systems', 'with', 'stochastic', 'delays', 'optimal', 'estimation',
+    'for', 'large', 'scale', 'sensor', 'networks', 'a', 'survey', 'on', 'robust', 'learning', 'in', 'the', 'presence',
+    'adaptive', 'filtering', 'consensus', 'algorithms', 'convergence', 'analysis', 'nonlinear', 'observers', 'and',
+    'stability', 'chains', 'games', 'approach', 'using', 'data', 'driven', 'model', 'predictive', 'fast', 'methods',
+    'na\\"{\\i}ve', 'r\\\'{e}sum\\\'{e}', 'se\\~{n}or',
+)
+
+PROTECTED_WORDS = ('{MIMO}', '{Markov}', '{Lyapunov}', '{Kalman}', '{LQR}', '{PID}', '{IoT}', '{5G}', '{GPU}', '{Bayes}')
+
+JOURNALS = (
+    'IEEE Transactions on Automatic Control', 'Automatica', 'Systems \\& Control Letters',
+    'International Journal of Control', 'SIAM Journal on Control and Optimization', 'Journal of Machine Learning Research',
+    'IEEE Transactions on Signal Processing', 'Annual Reviews in Control',
+)
+
+CONFERENCES = (
+    'Proceedings of the IEEE Conference on Decision and Control', 'American Control Conference',
+    'European Control Conference', 'IFAC World Congress', 'International Conference on Machine Learning',
+)
+
+PUBLISHERS = ('Springer', 'Elsevier', 'IEEE', 'Cambridge University Press', 'MIT Press', 'Wiley')
+
+MONTHS = (
+    'jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec', 'January', 'June', 'sept',
+    '3', '11', 'Spring', 'jan-feb',
+)
+
+KEYWORDS = ('control', 'estimation', 'networks', 'learning', 'optimisation', 'stability', 'consensus', 'filtering')
+
+
+def _weighted_choice(generator, choices):
+    total = sum(weight for _, weight in choices)
+    value = generator.uniform(0, total)
+    for choice, weight in choices:
+        value -= weight
+        if value <= 0:
+            return choice
+    return choices[-1][0]
+
+
+def _name(generator):
+    first = generator.choice(FIRST_NAMES)
+    last = generator.choice(LAST_NAMES)
+    form = generator.random()
+    if form < 0.1:
+        last = generator.choice(VON_PARTS) + ' ' + last
+    if form < 0.55:
+        return last + ', ' + first
+    return first + ' ' + last
+
+
+def _authors(generator):
+    length = generator.random()
+    if length < 0.02:
+        # a long author list, e.g. of a collaboration
+        count = generator.randint(20, 60)
+    else:
+        count = generator.randint(1, 6)
+    return ' and '.join(_name(generator) for _ in range(count))
+
+
+def _title(generator):
+    words = [generator.choice(TITLE_WORDS) for _ in range(generator.randint(4, 14))]
+    for _ in range(generator.randint(0, 2)):
+        words.insert(generator.randrange(len(words) + 1), generator.choice(PROTECTED_WORDS))
+    words[0] = words[0][:1].upper() + words[0][1:]
+    if generator.random() < 0.2:
+        words.insert(generator.randint(1, len(words)), ':')
+        return ' '.join(words).replace(' :', ':')
+    return ' '.join(words)
+
+
+def _fields(generator, entry_type):
+    fields = [('author', _authors(generator)), ('title', _title(generator)),
+              ('year', str(generator.randint(1950, 2024)))]
+    if entry_type == 'article':
+        fields += [('journal', generator.choice(JOURNALS)), ('volume', str(generator.randint(1, 70))),
+                   ('number', str(generator.randint(1, 12)))]
+    elif entry_type in ('inproceedings', 'incollection'):
+        fields += [('booktitle', generator.choice(CONFERENCES))]
+    elif entry_type == 'book':
+        fields += [('publisher', generator.choice(PUBLISHERS)), ('address', 'Berlin')]
+    elif entry_type == 'phdthesis':
+        fields += [('school', 'ETH Z\\"{u}rich')]
+    elif entry_type == 'techreport':
+        fields += [('institution', 'University of Newcastle')]
+    if generator.random() < 0.8:
+        fields.append(('month', generator.choice(MONTHS)))
+    if generator.random() < 0.7:
+        start = generator.randint(1, 2000)
+        fields.append(('pages', '%d--%d' % (start, start + generator.randint(1, 30))))
+    if generator.random() < 0.6:
+        fields.append(('doi', '10.%d/%s.%d' % (generator.randint(1000, 9999), generator.choice(KEYWORDS),
+                                               generator.randint(1, 10 ** 6))))
+    if generator.random() < 0.4:
+        fields.append(('keywords', ', '.join(generator.sample(KEYWORDS, generator.randint(1, 4)))))
+    if generator.random() < 0.15:
+        fields.append(('abstract', ' '.join(generator.choice(TITLE_WORDS) for _ in range(generator.randint(40, 120)))))
+    return fields
+
+
+def _format_entry(generator, entry_type, entry_id, fields):
+    lines = ['@' + entry_type + '{' + entry_id + ',']
+    for key, value in fields:
+        if generator.random() < 0.1 and '"' not in value:
+            lines.append('  ' + key + ' = "' + value + '",')
+        else:
+            lines.append('  ' + key + ' = {' + value + '},')
+    lines.append('}\n')
+    return '\n'.join(lines)
+
+
+def generate_entries(count, seed=0):
+    """
+    Generates the strings of count BibTeX entries
+
+    :param count: number of entries
+    :type count: int
+    :param seed: seed of the generator, the same seed produces the same entries
+    :type seed: int
+    :returns: generator of str
+    """
+    generator = random.Random(seed)
+    for index in range(count):
+        entry_type = _weighted_choice(generator, ENTRY_TYPES)
+        entry_id = 'entry%d' % index
+        yield _format_entry(generator, entry_type, entry_id, _fields(generator, entry_type))
+
+
+def generate_corpus(count, seed=0):
+    """
+    Generates a BibTeX file with count entries
+
+    :param count: number of entries
+    :type count: int
+    :param seed: seed of the generator, the same seed produces the same corpus
+    :type seed: int
+    :returns: the contents of the file
+    :rtype: str
+    """
+    return '\n'.join(generate_entries(count, seed))
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Sonja Stuedli
+
+"""
+Benchmarks of parsing, writing, the latex codecs and round trips on synthetic corpora.
+
+Usage: PYTHONPATH=. python benchmarks/run_benchmarks.py --sizes 1000 100000 --output results.json
+
+The corpus is generated and processed in batches, such that the memory needed does not depend on the corpus size.
+The results are written as JSON to compare runs, e.g. before and after a change.
+"""
+
+import io
+import sys
+import json
+import logging
+import time
+import argparse
+import platform
+import datetime
+
+from corpus import generate_entries
+
+import bibtexentryparser
+from bibtexentryparser.bibDefinitions import BibDefinitions
+from bibtexentryparser.bibconfig import BibConfig
+from bibtexentryparser.bibparser import BibTexParser
+from bibtexentryparser.bibwriter import BibTexWriter
+
+DEFAULT_SIZES = (1000, 100000, 1000000)
+BENCHMARKS = ('parse', 'write', 'latex_to_string', 'string_to_latex', 'round_trip', 'iterparse')
+
+# number of entries processed at once
+BATCH_SIZE = 10000
+
+
+def _batches(count, seed):
+    batch = []
+    for bibstring in generate_entries(count, seed):
+        batch.append(bibstring)
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _raw_fields(bibstrings, parser):
+    """
+    Returns the title and author fields of the entries with their latex expressions, the input of the codec benchmarks
+    """
+    fields = []
+    for bibstring in bibstrings:
+        entry = parser.parse(bibstring)
+        fields.extend(entry[key] for key in ('title', 'author') if key in entry)
+    return [field if isinstance(field, str) else ' and '.join(field) for field in fields]
+
+
+def run_size(count, seed, benchmarks):
+    """
+    Runs the benchmarks on a corpus of count entries
+
+    :returns: dictionary from the benchmark to its total time in nanoseconds and number of processed items
+    :rtype: dict
+    """
+    parser = BibTexParser()
+    writer = BibTexWriter()
+    # a parser keeping the latex expressions
+    raw_parser = BibTexParser(config=BibConfig())
+    totals = dict((benchmark, {'ns': 0, 'items': 0}) for benchmark in benchmarks)
+    mismatches = 0
+
+    def timed(benchmark, function, items):
+        start = time.perf_counter_ns()
+        result = function()
+        totals[benchmark]['ns'] += time.perf_counter_ns() - start
+        totals[benchmark]['items'] += items
+        return result
+
+    for batch in _batches(count, seed):
+        entries = timed('parse', lambda: [parser.parse(bibstring) for bibstring in batch], len(batch)) \
+            if 'parse' in benchmarks else [parser.parse(bibstring) for bibstring in batch]
+        if 'write' in benchmarks:
+            timed('write', lambda: [writer.write(entry) for entry in entries], len(entries))
+        if 'latex_to_string' in benchmarks or 'string_to_latex' in benchmarks:
+            fields = _raw_fields(batch, raw_parser)
+            if 'latex_to_string' in benchmarks:
+                decoded = timed('latex_to_string', lambda: [BibDefinitions.latex_to_string(field) for field in fields],
+                                len(fields))
+            else:
+                decoded = [BibDefinitions.latex_to_string(field) for field in fields]
+            if 'string_to_latex' in benchmarks:
+                timed('string_to_latex', lambda: [BibDefinitions.string_to_latex(field) for field in decoded],
+                      len(decoded))
+        if 'round_trip' in benchmarks:
+            round_trip = timed('round_trip', lambda: [parser.parse(writer.write(entry)) for entry in entries],
+                               len(entries))
+            mismatches += sum(1 for entry, copy in zip(entries, round_trip) if entry != copy)
+        if 'iterparse' in benchmarks:
+            text = '\n'.join(batch)
+            timed('iterparse', lambda: sum(1 for _ in parser.iterparse(io.StringIO(text))), len(batch))
+
+    results = dict()
+    for benchmark, total in totals.items():
+        seconds = total['ns'] / 1e9
+        results[benchmark] = {
+            'seconds': seconds,
+            'items': total['items'],
+            'items_per_second': total['items'] / seconds if seconds else None,
+            'ns_per_item': total['ns'] / total['items'] if total['items'] else None,
+        }
+    if 'round_trip' in benchmarks:
+        results['round_trip']['mismatches'] = mismatches
+    return results
+
+
+def main(arguments=None):
+    argument_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argument_parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                                 help='numbers of entries of the corpora (default: %(default)s)')
+    argument_parser.add_argument('--seed', type=int, default=0, help='seed of the corpus generator')
+    argument_parser.add_argument('--benchmarks', nargs='+', choices=BENCHMARKS, default=list(BENCHMARKS),
+                                 help='benchmarks to run (default: all)')
+    argument_parser.add_argument('--output', help='JSON file of the results (default: standard output)')
+    arguments = argument_parser.parse_args(arguments)
+
+    # the corpus contains months that are not recognised on purpose, do not time the logging of every one
+    logging.getLogger('bibtexentryparser').setLevel(logging.CRITICAL)
+    bibtexentryparser.reset_to_default_settings()
+    results = {
+        'meta': {
+            'date': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'python': sys.version,
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'package_version': bibtexentryparser.__version__,
+            'seed': arguments.seed,
+            'batch_size': BATCH_SIZE,
+        },
+        'results': dict(),
+    }
+    for count in arguments.sizes:
+        print("Running %d entries ..." % count, file=sys.stderr)
+        results['results'][str(count)] = run_size(count, arguments.seed, arguments.benchmarks)
+        for benchmark, result in results['results'][str(count)].items():
+            print("  %-16s %10.3f s %12.0f items/s" % (benchmark, result['seconds'], result['items_per_second'] or 0),
+                  file=sys.stderr)
+
+    if arguments.output is None:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        with open(arguments.output, 'w', encoding='utf-8') as output_file:
+            json.dump(results, output_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -11,16 +11,41 @@ This package is heavily based on the bibtexparser version 0.6.2 module and modif
 """
 
 __all__ = [
-    'load', 'write',
-    'getString', 'setString',
-    'bibparser', 'bibwriter'
+    'load', 'load_file', 'iterparse', 'aiterparse', 'parse_many', 'write', 'write_to', 'awrite',
+    'getString', 'setString', 'getStrings', 'setStrings', 'to_columns',
+    'bibparser', 'bibwriter', 'bibtokenizer', 'bibentry', 'bibfile', 'bibsession', 'bibcache', 'bibcolumns',
+    'bibdatabase', 'bibtextindex', 'bibdedup', 'bibnames', 'bibconfig', 'bibpool', 'bibtiming',
+    'BibConfig', 'BibPool', 'BibTimer', 'BibEntry', 'BibName', 'BibFile', 'BibSession', 'BibDatabase', 'BibTextIndex', 'BibDeduplicator',
 ]
 __version__ = '1.0.0'
 
 
 from bibtexentryparser import bibparser
 from bibtexentryparser import bibwriter
+from bibtexentryparser import bibtokenizer
+from bibtexentryparser import bibcache
 from bibtexentryparser.bibDefinitions import BibDefinitions
+from bibtexentryparser import bibconfig
+from bibtexentryparser.bibconfig import BibConfig
+from bibtexentryparser.bibentry import BibEntry
+from bibtexentryparser import bibnames
+from bibtexentryparser.bibnames import BibName
+from bibtexentryparser import bibfile
+from bibtexentryparser.bibfile import BibFile
+from bibtexentryparser import bibsession
+from bibtexentryparser.bibsession import BibSession
+from bibtexentryparser import bibpool
+from bibtexentryparser.bibpool import BibPool
+from bibtexentryparser import bibtiming
+from bibtexentryparser.bibtiming import BibTimer
+from bibtexentryparser import bibcolumns
+from bibtexentryparser.bibcolumns import to_columns
+from bibtexentryparser import bibdatabase
+from bibtexentryparser.bibdatabase import BibDatabase
+from bibtexentryparser import bibtextindex
+from bibtexentryparser.bibtextindex import BibTextIndex
+from bibtexentryparser import bibdedup
+from bibtexentryparser.bibdedup import BibDeduplicator
 
 # Load default settings for all global choices
 def reset_to_default_settings():
@@ -46,10 +71,93 @@ def load(bibtex_str, parser=None):
     :rtype: dictionary
     """
     if parser is None:
-        parser = bibparser.BibTexParser()
+        with bibpool.default_parsers.acquire() as default_parser:
+            return default_parser.parse(bibtex_str)
     return parser.parse(bibtex_str)
 
 
+def load_file(path, cache_dir=None, parser=None, encoding='utf-8'):
+    """
+    Load all :class:`BibEntry` objects of a file, optionally using a persistent cache
+
+    :param path: path of the file to be parsed
+    :type path: str
+    :param cache_dir: directory storing the parsed entries keyed by file contents and settings (optional)
+    :type cache_dir: str
+    :param parser: custom parser to use (optional)
+    :type parser: BibTexParser
+    :param encoding: encoding of the file
+    :type encoding: str
+    :returns: bibliographic expression objects
+    :rtype: list of dictionaries
+    """
+    if parser is None:
+        parser = bibparser.BibTexParser()
+    return parser.parse_file(path, encoding, cache_dir)
+
+
+def iterparse(fileobj, chunk_size=65536, parser=None):
+    """
+    Iterate over the :class:`BibEntry` objects in a file containing several entries
+
+    :param fileobj: file-like object or path of the file to be parsed
+    :type fileobj: file or str
+    :param chunk_size: number of characters read at once
+    :type chunk_size: int
+    :param parser: custom parser to use (optional)
+    :type parser: BibTexParser
+    :returns: generator of bibliographic expression objects
+    :rtype: generator of dictionaries
+    """
+    if parser is None:
+        parser = bibparser.BibTexParser()
+    return parser.iterparse(fileobj, chunk_size)
+
+
+def aiterparse(reader, batch_size=1000, executor=None, parser=None, chunk_size=65536, encoding='utf-8'):
+    """
+    Asynchronously iterate over the :class:`BibEntry` objects read from an asyncio stream, parsing in an executor
+
+    :param reader: stream providing bytes, e.g. asyncio.StreamReader
+    :type reader: asyncio.StreamReader
+    :param batch_size: number of entries parsed at once in the executor
+    :type batch_size: int
+    :param executor: thread executor of the parsing (default: the default executor of the event loop)
+    :type executor: concurrent.futures.ThreadPoolExecutor
+    :param parser: custom parser to use (optional)
+    :type parser: BibTexParser
+    :param chunk_size: number of bytes read at once
+    :type chunk_size: int
+    :param encoding: encoding of the stream
+    :type encoding: str
+    :returns: asynchronous generator of bibliographic expression objects
+    :rtype: async generator of dictionaries
+    """
+    if parser is None:
+        parser = bibparser.BibTexParser()
+    return parser.aiterparse(reader, chunk_size=chunk_size, batch_size=batch_size, executor=executor, encoding=encoding)
+
+
+def parse_many(source, workers=None, batch_size=1000, parser=None):
+    """
+    Parse the :class:`BibEntry` objects in a file containing several entries in parallel processes
+
+    :param source: file-like object or path of the file to be parsed
+    :type source: file or str
+    :param workers: number of worker processes (default: number of cpus)
+    :type workers: int
+    :param batch_size: number of entries sent to a worker at once
+    :type batch_size: int
+    :param parser: custom parser to use (optional)
+    :type parser: BibTexParser
+    :returns: generator of bibliographic expression objects in the order of the file
+    :rtype: generator of dictionaries
+    """
+    if parser is None:
+        parser = bibparser.BibTexParser()
+    return parser.parse_many(source, workers, batch_size)
+
+
 def write(bibentry, writer=None):
     """
     Dump :class:`BibEntry` object to a BibTeX string
@@ -62,10 +170,51 @@ def write(bibentry, writer=None):
     :rtype: unicode
     """
     if writer is None:
-        writer = bibwriter.BibTexWriter()
+        with bibpool.default_writers.acquire() as default_writer:
+            return default_writer.write(bibentry)
     return writer.write(bibentry)
 
 
+def write_to(fileobj, bibentries, writer=None):
+    """
+    Dump several :class:`BibEntry` objects to a file
+
+    :param fileobj: file-like object opened in text or binary mode or path of the file
+    :type fileobj: file or str
+    :param bibentries: entries to be written
+    :type bibentries: iterable of dictionaries
+    :param writer: custom writer to use (optional)
+    :type writer: BibTexWriter
+    :returns: number of entries written
+    :rtype: int
+    """
+    if writer is None:
+        writer = bibwriter.BibTexWriter()
+    return writer.write_to(fileobj, bibentries)
+
+
+async def awrite(stream, bibentries, batch_size=1000, executor=None, writer=None):
+    """
+    Dump several :class:`BibEntry` objects to an asyncio stream, formatting in an executor
+
+    :param stream: stream accepting bytes, e.g. asyncio.StreamWriter
+    :type stream: asyncio.StreamWriter
+    :param bibentries: entries to be written
+    :type bibentries: iterable or asynchronous iterable of dictionaries
+    :param batch_size: number of entries formatted at once in the executor
+    :type batch_size: int
+    :param executor: thread executor of the formatting (default: the default executor of the event loop)
+    :type executor: concurrent.futures.ThreadPoolExecutor
+    :param writer: custom writer to use (optional)
+    :type writer: BibTexWriter
+    :returns: number of entries written
+    :rtype: int
+    """
+    if writer is None:
+        writer = bibwriter.BibTexWriter()
+    return await writer.awrite(stream, bibentries, batch_size, executor)
+
+
 def getString(bibentry,key,writer=None):
     """
     getString: from a bibtex entry return the field of the given key as string
@@ -80,7 +229,8 @@ def getString(bibentry,key,writer=None):
     :rtype: unicode
     """
     if writer is None:
-        writer = bibwriter.BibTexWriter()
+        with bibpool.default_writers.acquire() as default_writer:
+            return default_writer.get_entry_field(bibentry,key)
     return writer.get_entry_field(bibentry,key)
     
     
@@ -100,6 +250,46 @@ def setString(bibentry,key,text,parser=None):
     :rtype: unicode
     """
     if parser is None:
-        parser = bibparser.BibTexParser()
+        with bibpool.default_parsers.acquire() as default_parser:
+            return default_parser.set_entry_field(bibentry,key,text)
     return parser.set_entry_field(bibentry,key,text)
 
+
+def getStrings(bibentries, keys, default=None, writer=None):
+    """
+    getStrings: from several bibtex entries return the fields of the given keys as strings, one row per entry
+
+    :param bibentries: entries
+    :type bibentries: iterable of dictionaries
+    :param keys: keys that should be extracted
+    :type keys: list of String
+    :param default: value of the fields missing in an entry
+    :param writer: custom writer to use (optional)
+    :type writer: BibTexWriter
+    :returns: one list of strings per entry, in the order of keys
+    :rtype: list of lists
+    """
+    if writer is None:
+        with bibpool.default_writers.acquire() as default_writer:
+            return default_writer.get_entry_fields(bibentries, keys, default)
+    return writer.get_entry_fields(bibentries, keys, default)
+
+
+def setStrings(bibentries, updates, parser=None):
+    """
+    setStrings: sets fields of several bibentries
+
+    :param bibentries: entries
+    :type bibentries: iterable of dictionaries
+    :param updates: one dictionary from the key to the text per entry, or a single dictionary for all entries
+    :type updates: list of dictionaries or dictionary
+    :param parser: custom parser to use (optional)
+    :type parser: BibTexParser
+    :returns: the changed entries
+    :rtype: list of dictionaries
+    """
+    if parser is None:
+        with bibpool.default_parsers.acquire() as default_parser:
+            return default_parser.set_entry_fields(bibentries, updates)
+    return parser.set_entry_fields(bibentries, updates)
+
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Sonja Stuedli
+
+from collections import deque
+
+__all__ = ['AhoCorasick']
+
+class AhoCorasick(object):
+    """
+    Multi-pattern matcher replacing many words in a single scan over a text.
+
+    The words are compiled into an Aho-Corasick automaton, such that the time needed to scan a text only depends on
+    the length of the text and the number of matches, not on the number of words.
+
+    """
+
+    def __init__(self, replacements):
+        """
+        Builds the automaton
+
+        :param replacements: dictionary from the words to search to their replacement
+        :type replacements: dict
+        """
+        self.replacements = dict(replacements)
+
+        # state 0 is the root, every state has transitions, a failure link and the lengths of all words ending in it
+        self._goto = [dict()]
+        self._fail = [0]
+        self._output = [()]
+        for word in self.replacements:
+            if not word:
+                continue
+            state = 0
+            for character in word:
+                next_state = self._goto[state].get(character)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][character] = next_state
+                    self._goto.append(dict())
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            self._output[state] = (len(word),)
+
+        # breadth first such that the failure links of shorter prefixes are known
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for character, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and character not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(character, 0)
+                self._fail[next_state] = fail
+                self._output[next_state] = self._output[next_state] + self._output[fail]
+
+    def __len__(self):
+        return len(self.replacements)
+
+    def find(self, text):
+        """
+        Finds all non-overlapping occurrences of the words in text. Where occurrences overlap the leftmost and then
+        the longest one is chosen.
+
+        :param text: the text to scan
+        :type text: str
+        :returns: list of tuples (start, end)
+        :rtype: list
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+
+        matches = []
+        state = 0
+        for end, character in enumerate(text, 1):
+            while state and character not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(character, 0)
+            for length in output[state]:
+                matches.append((end - length, end))
+        if not matches:
+            return matches
+
+        matches.sort(key=lambda match: (match[0], -match[1]))
+        selected = []
+        last_end = 0
+        for start, end in matches:
+            if start >= last_end:
+                selected.append((start, end))
+                last_end = end
+        return selected
+
+    def replace(self, text):
+        """
+        Replaces all non-overlapping occurrences of the words in text by their replacement
+
+        :param text: the text to scan
+        :type text: str
+        :returns: str
+        """
+        matches = self.find(text)
+        if not matches:
+            return text
+        pieces = []
+        position = 0
+        for start, end in matches:
+            pieces.append(text[position:start])
+            pieces.append(self.replacements[text[start:end]])
+            position = end
+        pieces.append(text[position:])
+        return ''.join(pieces)
@@ -10,18 +10,226 @@
 # Modified by Sonja Stuedli
 
 import re 
+import json
+import string
+import functools
+import hashlib
 import itertools
+import unicodedata
 
 import logging
 
+from bibtexentryparser.ahocorasick import AhoCorasick
+
 log = logging.getLogger(__name__)
 
+_control_word_re = re.compile(r'\\[a-zA-Z]+')
+
+# an optionally braced accent or control word with an optional argument, e.g. \"{a}, {\v s}, \'{\i}, {\o} or \o{}
+_generic_latex_re = re.compile(r'\{?\\(?:[a-zA-Z]+|[^a-zA-Z\s])\s*(?:\{\\?[a-zA-Z]?\}|\\[a-zA-Z](?![a-zA-Z])|[a-zA-Z])?\}?')
+
+# runs of capitals and capitals following a colon, both are protected by braces
+_upper_case_re = re.compile(r'[A-Z][A-Z]+|(?<=:)[A-Z]|(?<=: )[A-Z]')
+_protected_upper_case_re = re.compile(r'{([A-Z]+)}')
+
+# up to this many protected words a regular expression is faster than the Aho-Corasick automaton
+_max_regex_protected_words = 256
+
+# accents that are written with a symbol, e.g. \"{a} or \"a
+_symbol_accents = {
+    '"': '\u0308',
+    "'": '\u0301',
+    '`': '\u0300',
+    '^': '\u0302',
+    '~': '\u0303',
+    '=': '\u0304',
+    '.': '\u0307',
+}
+
+# accents that are written with a letter, e.g. \v{s} or \v s
+_letter_accents = {
+    'u': '\u0306',
+    'v': '\u030c',
+    'H': '\u030b',
+    'c': '\u0327',
+    'k': '\u0328',
+    'r': '\u030a',
+    'd': '\u0323',
+    'b': '\u0331',
+}
+
+# special letters and symbols (unicode, latex)
+_special_characters = (
+    ('ı','\\i'),
+    ('ȷ','\\j'),
+    ('ß','\\ss'),
+    ('æ','\\ae'),
+    ('Æ','\\AE'),
+    ('œ','\\oe'),
+    ('Œ','\\OE'),
+    ('å','\\aa'),
+    ('Å','\\AA'),
+    ('ø','\\o'),
+    ('Ø','\\O'),
+    ('ł','\\l'),
+    ('Ł','\\L'),
+    ('&','\\&'),
+)
+
+def _build_string_latex_tuppels():
+    r"""
+    Builds the conversion table between unicode and latex for all accented letters that exist as a single unicode
+    character. Alternative spellings are listed first, such that the braced form, e.g. \"{a} or {\o}, is used for
+    writing. A bare control word like \o would merge with a following letter, e.g. S\oren.
+    """
+    tuppels = []
+    for character, latex in _special_characters:
+        if _control_word_re.fullmatch(latex):
+            tuppels.append((character, latex))
+            tuppels.append((character, latex + '{}'))
+            tuppels.append((character, '{' + latex + '}'))
+        else:
+            tuppels.append((character, latex))
+    accents = [(command, combining, False) for command, combining in _symbol_accents.items()]
+    accents.extend((command, combining, True) for command, combining in _letter_accents.items())
+    for command, combining, is_letter in accents:
+        for letter in string.ascii_letters:
+            character = unicodedata.normalize('NFC', letter + combining)
+            if len(character) != 1:
+                continue
+            # i and j lose their dot when accented
+            bases = [letter]
+            if letter in 'ij':
+                bases.insert(0, '\\' + letter)
+            for base in bases:
+                if is_letter:
+                    tuppels.append((character, '{\\' + command + ' ' + base + '}'))
+                    tuppels.append((character, '\\' + command + ' ' + base))
+                elif len(base) == 1:
+                    tuppels.append((character, '{\\' + command + base + '}'))
+                    tuppels.append((character, '\\' + command + base))
+                tuppels.append((character, '{\\' + command + '{' + base + '}}'))
+                if base != bases[0]:
+                    tuppels.append((character, '\\' + command + '{' + base + '}'))
+            # written form
+            tuppels.append((character, '\\' + command + '{' + bases[0] + '}'))
+    return tuple(tuppels)
+
+def _alternation(strings, guard_control_words=False):
+    """
+    Returns a regular expression pattern matching any of strings, the longest strings first
+    """
+    patterns = []
+    for latex in sorted(strings, key=len, reverse=True):
+        pattern = re.escape(latex)
+        if guard_control_words and _control_word_re.fullmatch(latex):
+            # a control word like \o must not match the beginning of \over
+            pattern += '(?![a-zA-Z])'
+        patterns.append(pattern)
+    return '|'.join(patterns) or '(?!)'
+
+def _compile_latex_codec(table):
+    r"""
+    Compiles a conversion table into one regular expression and one dictionary per direction.
+
+    Trying every expression of the table at every backslash would make the decoding slower the larger the table is.
+    Instead the expressions of the form of an accent or a control word with an optional argument, e.g. \"{a},
+    {\v s} or \o{}, are found by one generic pattern and looked up in the dictionary. Only the other expressions of
+    the table, e.g. added with add_latex_conversions, are tried one after the other. A generic match that is not in
+    the table, e.g. \"{a}} or \textit{x}, is decoded by trying all expressions on the matched text.
+
+    :returns: latex_to_string_re, latex_to_string_replace, string_to_latex_re, string_to_latex_replace, the ASCII
+        strings of the table and whether all latex expressions contain a backslash
+    :rtype: tuple
+    """
+    latex_to_string_map = dict((y, x) for x, y in table)
+    string_to_latex_map = dict(table)
+
+    other_expressions = [latex for latex in latex_to_string_map if not _generic_latex_re.fullmatch(latex)]
+    # longest expressions first such that e.g. {\"{a}} is preferred over \"{a}
+    fallback_re = re.compile(_alternation(latex_to_string_map, True))
+    fallback_replace = lambda match: latex_to_string_map[match.group()]
+    if other_expressions:
+        latex_to_string_re = re.compile(_alternation(other_expressions, True) + '|' + _generic_latex_re.pattern)
+    else:
+        latex_to_string_re = _generic_latex_re
+
+    def latex_to_string_replace(match):
+        latex = match.group()
+        try:
+            return latex_to_string_map[latex]
+        except KeyError:
+            return fallback_re.sub(fallback_replace, latex)
+
+    # single characters are matched by a character set, which does not depend on the size of the table
+    unicode_strings = [unicode_string for unicode_string in string_to_latex_map if len(unicode_string) > 1]
+    characters = ''.join(sorted(unicode_string for unicode_string in string_to_latex_map if len(unicode_string) == 1))
+    string_to_latex_patterns = [_alternation(unicode_strings)] if unicode_strings else []
+    if characters:
+        string_to_latex_patterns.append('[' + re.escape(characters) + ']')
+
+    return (
+        latex_to_string_re,
+        latex_to_string_replace,
+        re.compile('|'.join(string_to_latex_patterns) or '(?!)'),
+        lambda match: string_to_latex_map[match.group()],
+        tuple(unicode_string for unicode_string in string_to_latex_map if unicode_string.isascii()),
+        all('\\' in latex for latex in latex_to_string_map),
+    )
+
+def _protect_word(word):
+    """
+    Returns the word with its capitals protected by braces, e.g. {M}arkov
+    """
+    return re.sub('([A-Z]+)','{\\g<1>}',word)
+
+def _compile_protected_words(protected_upper_case_words):
+    """
+    Returns a function replacing the protected upper case words in a string by their protected form
+
+    A few words are replaced with an alternation of the words, longest first, many words with an Aho-Corasick
+    automaton. Both replace the leftmost and then longest of overlapping words.
+    :param protected_upper_case_words: dictionary from the words to their protected form
+    :type: dict
+    :returns: callable
+    """
+    words = dict((word, protected) for word, protected in protected_upper_case_words.items() if word)
+    if len(words) > _max_regex_protected_words:
+        return AhoCorasick(words).replace
+    words_re = re.compile('|'.join(re.escape(word) for word in sorted(words, key=len, reverse=True)) or '(?!)')
+    return functools.partial(words_re.sub, lambda match: words[match.group()])
+
+def _settings_fingerprint(settings, string_latex_tuppels):
+    """
+    Returns the sha256 digest of settings in the format of BibDefinitions.get_settings and a conversion table
+    """
+    canonical = {
+        'protected_upper_case_words': settings['protected_upper_case_words'],
+        'protect_upper_case_fields': sorted(settings['protect_upper_case_fields']),
+        'contains_latex_expressions': sorted(settings['contains_latex_expressions']),
+        'stored_as_integer': settings['stored_as_integer'],
+        'string_latex_tuppels': string_latex_tuppels,
+    }
+    data = json.dumps(canonical, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
 # This only works for Python 3 or higher
 class BibDefinitions(type): 
     """
     Class containing global definitions, functions, and dictionaries for converting a BibTeX entry and properly parse it.
     """
 
+    # counter that is increased by every change of the settings, such that compiled settings can be invalidated
+    _version = 0
+
+    @classmethod
+    def get_version(cls):
+        return cls._version
+
+    @classmethod
+    def _changed(cls):
+        cls._version += 1
+
     @classmethod
     def reset(cls):
         
@@ -34,6 +242,47 @@ class BibDefinitions(type):
             delattr(cls,"default_"+field)
             delattr(cls,"non_recognised_"+field)
         cls.not_stored_as_string = set()
+        cls._changed()
+
+    @classmethod
+    def get_settings(cls):
+        """
+        Returns a copy of all global settings, e.g. to transfer them to another process
+        :returns: settings that can be restored with set_settings
+        :rtype: dict
+        """
+        return {
+            'protected_upper_case_words': dict(cls.protected_upper_case_words),
+            'protect_upper_case_fields': set(cls.protect_upper_case_fields),
+            'contains_latex_expressions': set(cls.contains_latex_expressions),
+            'stored_as_integer': dict((field, (getattr(cls,"recognised_"+field), getattr(cls,"default_"+field)))
+                                      for field in cls.not_stored_as_string),
+        }
+
+    @classmethod
+    def set_settings(cls,settings):
+        """
+        Replaces all global settings with the ones returned by get_settings
+        :param settings: settings returned by get_settings
+        :type: dict
+        """
+        cls.reset()
+        cls.protected_upper_case_words = dict(settings['protected_upper_case_words'])
+        cls.protect_upper_case_fields = set(settings['protect_upper_case_fields'])
+        cls.contains_latex_expressions = set(settings['contains_latex_expressions'])
+        for field, (recognised_dict, standard_list) in settings['stored_as_integer'].items():
+            cls.add_stored_as_integer(field,recognised_dict,standard_list)
+        cls._changed()
+
+    @classmethod
+    def get_settings_fingerprint(cls):
+        """
+        Returns a fingerprint of all global settings including the latex conversion table, which changes whenever a
+        setting changes the result of parsing or writing
+        :returns: hexadecimal digest
+        :rtype: str
+        """
+        return _settings_fingerprint(cls.get_settings(), cls._string_latex_tuppels)
 
     ####################################################################3
     # Proctecting upper case
@@ -53,6 +302,7 @@ class BibDefinitions(type):
                 cls.protect_upper_case_fields.add(field.strip())
         else:
             log.error("fields should be provided as list, set, or string")
+        cls._changed()
                         
     @classmethod
     def add_protected_upper_case_words(cls,protected_upper_case_words):
@@ -63,12 +313,14 @@ class BibDefinitions(type):
         """
         if(type(protected_upper_case_words) is list or type(protected_upper_case_words) is set):
             for word in protected_upper_case_words:
-                cls.protected_upper_case_words[word.strip()] = re.sub('([A-Z]+)','{\g<1>}',word.strip())
+                cls.protected_upper_case_words[word.strip()] = _protect_word(word.strip())
         elif(type(protected_upper_case_words) is str):
-            cls.protected_upper_case_words[protected_upper_case_words.strip()] = re.sub('([A-Z]+)','{\g<1>}',protected_upper_case_words.strip())
+            cls.protected_upper_case_words[protected_upper_case_words.strip()] = _protect_word(protected_upper_case_words.strip())
         else:
             log.error("protected_upper_case_words should be provided as list or string" )
             log.error(type(protected_upper_case_words))
+        cls._protected_words_matcher = None
+        cls._changed()
         return
 
     ################################################
@@ -85,7 +337,8 @@ class BibDefinitions(type):
             for field in fields:
                 cls.contains_latex_expressions.add(field.strip())
         else:
-            logger.warning("fields should be provided as list, set, or string")
+            log.warning("fields should be provided as list, set, or string")
+        cls._changed()
 
     #################################################
     # Some fields can internally be handeled as intergers rather than strings and need special treatment.
@@ -107,6 +360,7 @@ class BibDefinitions(type):
         setattr(cls,"recognised_"+field.strip(), recognised_dict)
         setattr(cls,"default_"+field.strip(), standard_list)
         setattr(cls,"non_recognised_"+field.strip(),set())
+        cls._changed()
 
     # get all non-recognised entries that have been encountered by parser for the field 
     @classmethod
@@ -115,54 +369,84 @@ class BibDefinitions(type):
 
     @classmethod
     def unprotect_upper_case(cls,string):
-        string = re.sub("{([A-Z]+)}","\g<1>",string)
+        string = _protected_upper_case_re.sub(r"\g<1>",string)
         return string
 
     @classmethod
     def protect_upper_case(cls, string):
+        """
+        Protects upper case letters by braces: runs of capitals, capitals following a colon, and all protected upper case words
+        :param string: the string to protect
+        :type: str
+        :returns: str
+        """
+        string = _upper_case_re.sub(r'{\g<0>}',string)
 
-        string = re.sub('([A-Z][A-Z]+)','{\g<1>}',string)
-        string = re.sub('(:)([A-Z]+)','\g<1>{\g<2>}',string)
-        string = re.sub('(: )([A-Z]+)','\g<1>{\g<2>}',string)
+        if not cls.protected_upper_case_words:
+            return string
+        if cls._protected_words_matcher is None or cls._protected_words_source is not cls.protected_upper_case_words:
+            cls._protected_words_matcher = _compile_protected_words(cls.protected_upper_case_words)
+            cls._protected_words_source = cls.protected_upper_case_words
+        return cls._protected_words_matcher(string)
+
+    # replacement function of the protected upper case words, built again when the words change
+    _protected_words_matcher = None
+    _protected_words_source = None
 
-        for key in cls.protected_upper_case_words:
-            string = string.replace(key,cls.protected_upper_case_words[key])
-        
-        return string
-    
     @classmethod
     def latex_to_string(cls,field):
-        log.debug("Change LaTex to a normal string")
-        latex_to_string_map=dict((y, x) for x, y in cls._string_latex_tuppels)       
-        for key in latex_to_string_map:
-            log.debug("Replace " + key + " with " + latex_to_string_map[key])
-            log.debug("string becomes " + field.replace(key,latex_to_string_map[key]))
-            field = field.replace(key,latex_to_string_map[key])
-        return field
+        """
+        Replaces all latex expressions of the conversion table by the corresponding unicode characters in a single pass
+        :param field: string containing latex expressions
+        :type: str
+        :returns: str
+        """
+        if cls._latex_codec_table is not cls._string_latex_tuppels:
+            cls._compile_latex_codec()
+        # usually all latex expressions contain a backslash, then there is nothing to do without one
+        if cls._latex_codec_backslash_only and '\\' not in field:
+            return field
+        return cls._latex_to_string_re.sub(cls._latex_to_string_replace, field)
 
- 
     @classmethod
     def string_to_latex(cls,field):
-        log.debug("Change string to latex")       
-        string_to_latex_map=dict(cls._string_latex_tuppels)
-        for key in string_to_latex_map:
-            log.debug("Replace " + key + " with " + string_to_latex_map[key])
-            field = field.replace(key,string_to_latex_map[key])
-        return field
-        
-    # contains all latex to unicode converstions: should be extended 
-    _string_latex_tuppels = (
-        ('ä','\\"{a}'),
-        ('å','\\r{a}'),
-        ("á","\\'{a}"),
-        ("à","\\`{a}"),
-        ('ë','\\"{e}'),
-        ("í","\\'{\\i}"),
-        ('ø','\\o'),
-        ('ö','\\"{o}'),
-        ('ò',"\\'{o}"),
-        ('ü','\\"{u}'),
-        ('ç','\\c{c}'),
-        ('š','\\v{s}'),
-        ('&','\\&'),
-    )
+        """
+        Replaces all characters of the conversion table by the corresponding latex expressions in a single pass
+        :param field: unicode string
+        :type: str
+        :returns: str
+        """
+        if cls._latex_codec_table is not cls._string_latex_tuppels:
+            cls._compile_latex_codec()
+        # pure ASCII text only needs to be converted if it contains one of the few ASCII characters of the table
+        if field.isascii() and not any(key in field for key in cls._string_to_latex_ascii_keys):
+            return field
+        return cls._string_to_latex_re.sub(cls._string_to_latex_replace, field)
+
+    @classmethod
+    def add_latex_conversions(cls,string_latex_tuppels):
+        """
+        Function to extend the conversion table between unicode and latex
+        :param string_latex_tuppels: tuples (unicode string, latex expression); if there are several latex expressions for the same string the last one is used for writing
+        :type: list or tuple
+        """
+        cls._string_latex_tuppels = cls._string_latex_tuppels + tuple((unicode_string, latex) for unicode_string, latex in string_latex_tuppels)
+        cls._changed()
+
+    @classmethod
+    def _compile_latex_codec(cls):
+        """
+        Compiles the conversion table, the codec is compiled again whenever _string_latex_tuppels is replaced.
+        """
+        table = cls._string_latex_tuppels
+        (cls._latex_to_string_re, cls._latex_to_string_replace, cls._string_to_latex_re, cls._string_to_latex_replace,
+         cls._string_to_latex_ascii_keys, cls._latex_codec_backslash_only) = _compile_latex_codec(table)
+        cls._latex_codec_table = table
+
+    # the conversion table the codec was compiled from
+    _latex_codec_table = None
+    _latex_codec_backslash_only = False
+
+    # contains all conversions between unicode and latex. If several latex expressions are given for the same string,
+    # all are recognised when reading and the last one is used for writing.
+    _string_latex_tuppels = _build_string_latex_tuppels()
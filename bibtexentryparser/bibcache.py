@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Sonja Stuedli
+
+import os
+import sys
+import pickle
+import hashlib
+import logging
+import tempfile
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+__all__ = ['LRUCache', 'InternPool', 'ParsedFileCache']
+
+class LRUCache(object):
+    """
+    A bounded mapping that evicts the least recently used items and counts hits and misses.
+
+    """
+
+    def __init__(self, maxsize=100000):
+        """
+        Creates an empty cache
+
+        :param maxsize: maximal number of items kept in the cache
+        :type maxsize: int
+        """
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key, default=None):
+        """
+        Returns the cached value of key and marks it as recently used
+
+        :param key: the key
+        :param default: returned if the key is not cached
+        """
+        try:
+            value = self._items[key]
+            # the key may have been evicted by another thread in the meantime
+            self._items.move_to_end(key)
+        except KeyError:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Stores a value and evicts the least recently used item if the cache is full
+
+        :param key: the key
+        :param value: the value
+        """
+        self._items[key] = value
+        try:
+            self._items.move_to_end(key)
+        except KeyError:
+            # evicted by another thread in the meantime
+            pass
+        if len(self._items) > self.maxsize:
+            try:
+                self._items.popitem(last=False)
+            except KeyError:
+                # emptied by another thread
+                return
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Removes all items, the counters are kept
+        """
+        self._items.clear()
+
+    def reset_statistics(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def statistics(self):
+        """
+        Returns the usage statistics of the cache
+
+        :returns: dictionary with hits, misses, evictions, size, maxsize and hit_rate
+        :rtype: dict
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._items),
+            'maxsize': self.maxsize,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+class InternPool(LRUCache):
+    """
+    A bounded pool of field values, such that equal values share one object.
+
+    Strings (and subclasses such as parsed names) are shared directly, lists (e.g. authors) are copied with shared items
+    and all other values are returned unchanged.
+
+    """
+
+    def __init__(self, maxsize=100000):
+        super().__init__(maxsize)
+        self.saved_bytes = 0
+
+    def intern(self, value):
+        """
+        Returns the pooled object equal to value
+
+        :param value: a processed field value
+        :returns: the shared value
+        """
+        value_type = type(value)
+        if value_type is list:
+            return [self.intern(item) for item in value]
+        if value_type is str:
+            key = value
+        elif isinstance(value, str):
+            # subclasses, e.g. BibName, are kept apart from equal plain strings
+            key = (value_type, value)
+        else:
+            return value
+        pooled = self.get(key)
+        if pooled is None:
+            self.put(key, value)
+            return value
+        self.saved_bytes += sys.getsizeof(value)
+        return pooled
+
+    def reset_statistics(self):
+        super().reset_statistics()
+        self.saved_bytes = 0
+
+    def statistics(self):
+        """
+        Returns the usage statistics of the pool
+
+        :returns: dictionary with hits, misses, evictions, size, maxsize, hit_rate and saved_bytes
+        :rtype: dict
+        """
+        statistics = super().statistics()
+        statistics['saved_bytes'] = self.saved_bytes
+        return statistics
+
+
+class ParsedFileCache(object):
+    """
+    A directory storing the parsed entries of files in pickle files.
+
+    The cache files are named by a key computed from the contents of the parsed file and a fingerprint of the
+    settings used for parsing, such that changed files or settings never load outdated entries. The cache files are
+    loaded with pickle, so the cache directory must not be writable by untrusted users.
+
+    """
+
+    # version of the cache format, increase if the format changes
+    format_version = 1
+
+    def __init__(self, cache_dir):
+        """
+        :param cache_dir: directory of the cache files, created if it does not exist
+        :type cache_dir: str
+        """
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def get_key(self, path, fingerprint):
+        """
+        Computes the key of a file parsed with the given settings
+
+        :param path: path to the parsed file
+        :type path: str
+        :param fingerprint: fingerprint of the settings used for parsing
+        :type fingerprint: str
+        :returns: hexadecimal digest
+        :rtype: str
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(str(self.format_version).encode('ascii'))
+        digest.update(fingerprint.encode('utf-8'))
+        with open(path, 'rb') as parsed_file:
+            for chunk in iter(lambda: parsed_file.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _cache_path(self, key):
+        return os.path.join(self.cache_dir, key + '.pickle')
+
+    def load(self, key):
+        """
+        Loads the stored data of key
+
+        :returns: the stored data or None if there is none
+        """
+        try:
+            with open(self._cache_path(key), 'rb') as cache_file:
+                return pickle.load(cache_file)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.warning("Cache file can not be read: " + self._cache_path(key))
+            return None
+
+    def store(self, key, data):
+        """
+        Stores data for key, the file is replaced atomically such that concurrent readers never see partial files.
+        Data that can not be written or pickled is not stored and a warning is logged.
+
+        :returns: True if the data has been stored
+        :rtype: bool
+        """
+        temporary_path = None
+        try:
+            handle, temporary_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(handle, 'wb') as cache_file:
+                pickle.dump(data, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, self._cache_path(key))
+            return True
+        except (OSError, pickle.PicklingError, TypeError, AttributeError) as error:
+            logger.warning("Cache file can not be written: " + self._cache_path(key) + " (" + str(error) + ")")
+            self._remove(temporary_path)
+            return False
+        except BaseException:
+            self._remove(temporary_path)
+            raise
+
+    @staticmethod
+    def _remove(temporary_path):
+        if temporary_path is None:
+            return
+        try:
+            os.unlink(temporary_path)
+        except OSError:
+            pass
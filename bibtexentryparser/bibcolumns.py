@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Sonja Stuedli
+
+from collections import namedtuple
+
+from bibtexentryparser.bibconfig import BibConfig
+
+__all__ = ['to_columns', 'DictionaryColumn', 'MISSING_CODE']
+
+# value used in integer columns and dictionary codes for missing or non-numeric fields
+MISSING_CODE = -1
+
+# A dictionary encoded string column: codes[i] is the index of the value of entry i in vocabulary or MISSING_CODE
+DictionaryColumn = namedtuple('DictionaryColumn', ['codes', 'vocabulary'])
+
+
+def to_columns(entries, fields=None, integer_fields=None, config=None):
+    """
+    Converts parsed entries to NumPy columns for vectorised filtering and grouping.
+
+    Fields that are internally stored as integer (see BibDefinitions.add_stored_as_integer) and the year become int64
+    arrays. Strings of the fields stored as integer are converted with the recognised strings of the configuration. All other fields become a :class:`DictionaryColumn` of int32 codes and the vocabulary of distinct values.
+    Lists (e.g. authors) are encoded as the BibTeX string joined by ' and '. Missing, non-recognised or non-numeric
+    values are encoded as MISSING_CODE.
+
+    Requires NumPy.
+
+    :param entries: the parsed entries
+    :type entries: iterable of dict
+    :param fields: fields to convert (default: all fields of the entries in the order they are found)
+    :type fields: list
+    :param integer_fields: fields converted to integer arrays (default: the fields stored as integer and year)
+    :type integer_fields: set
+    :param config: the settings the entries have been parsed with (default: the global settings)
+    :type config: BibConfig
+    :returns: dictionary from the field to its column
+    :rtype: dict
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("to_columns requires NumPy, install it with 'pip install bibtexentryparser[numpy]'") from None
+
+    if fields is None:
+        entries = list(entries)
+        fields = list(dict.fromkeys(key for entry in entries for key in entry))
+    if config is None:
+        config = BibConfig.from_definitions()
+    if integer_fields is None:
+        integer_fields = set(config.not_stored_as_string)
+        integer_fields.add('year')
+    recognised = dict((field, config.get_recognised(field)) for field in config.not_stored_as_string)
+
+    values = dict((field, []) for field in fields)
+    vocabularies = dict((field, dict()) for field in fields if field not in integer_fields)
+    for entry in entries:
+        for field in fields:
+            value = entry.get(field)
+            if field in integer_fields:
+                values[field].append(_to_integer(value, recognised.get(field)))
+            else:
+                if value is None:
+                    values[field].append(MISSING_CODE)
+                    continue
+                if type(value) is list:
+                    value = ' and '.join(str(item) for item in value)
+                vocabulary = vocabularies[field]
+                code = vocabulary.get(value)
+                if code is None:
+                    code = len(vocabulary)
+                    vocabulary[value] = code
+                values[field].append(code)
+
+    columns = dict()
+    for field in fields:
+        if field in integer_fields:
+            columns[field] = numpy.array(values[field], dtype=numpy.int64)
+        else:
+            vocabulary = numpy.empty(len(vocabularies[field]), dtype=object)
+            vocabulary[:] = list(vocabularies[field])
+            columns[field] = DictionaryColumn(numpy.array(values[field], dtype=numpy.int32), vocabulary)
+    return columns
+
+
+def _to_integer(value, recognised=None):
+    if type(value) is int:
+        return value
+    if recognised is not None and isinstance(value, str) and value.lower() in recognised:
+        return recognised[value.lower()]
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return MISSING_CODE
@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Sonja Stuedli
+
+from types import MappingProxyType
+
+from bibtexentryparser.bibDefinitions import (BibDefinitions, _compile_latex_codec, _compile_protected_words,
+                                              _protect_word, _settings_fingerprint, _upper_case_re, _protected_upper_case_re)
+
+__all__ = ['BibConfig']
+
+
+class BibConfig(object):
+    """
+    Frozen, precompiled settings for parsing and writing, an alternative to the global :class:`BibDefinitions`.
+
+    A configuration is passed explicitly to a parser or writer, e.g. BibTexParser(config=config). Parsers and writers
+    without a configuration use the global BibDefinitions. A configuration can not be changed after it has been
+    created and everything is compiled once, such that differently configured parsers can run side by side and
+    threads can share a configuration without locks. Use :meth:`replace` to derive a changed configuration.
+
+    """
+
+    __slots__ = ('protected_upper_case_words', 'protect_upper_case_fields', 'contains_latex_expressions',
+                 'not_stored_as_string', 'stored_as_integer', 'string_latex_tuppels', '_codec', '_matcher',
+                 '_fingerprint')
+
+    def __init__(self, protected_upper_case_words=(), protect_upper_case_fields=(), contains_latex_expressions=(),
+                 stored_as_integer=None, string_latex_tuppels=None):
+        """
+        :param protected_upper_case_words: words whose capitals are protected, e.g. ['Markov'], or a dictionary from
+            the word to its protected form
+        :type protected_upper_case_words: list or dict
+        :param protect_upper_case_fields: fields whose capitals are protected
+        :type protect_upper_case_fields: iterable of str
+        :param contains_latex_expressions: fields converted between latex and unicode
+        :type contains_latex_expressions: iterable of str
+        :param stored_as_integer: dictionary from the field to (recognised_dict, standard_list), see
+            BibDefinitions.add_stored_as_integer
+        :type stored_as_integer: dict
+        :param string_latex_tuppels: the conversion table (default: the table of BibDefinitions)
+        :type string_latex_tuppels: tuple
+        """
+        if isinstance(protected_upper_case_words, str):
+            protected_upper_case_words = [protected_upper_case_words]
+        if not isinstance(protected_upper_case_words, dict):
+            protected_upper_case_words = dict((word.strip(), _protect_word(word.strip()))
+                                              for word in protected_upper_case_words)
+        if string_latex_tuppels is None:
+            string_latex_tuppels = BibDefinitions._string_latex_tuppels
+        stored_as_integer = dict((field.strip(), (MappingProxyType(dict(recognised_dict)), tuple(standard_list)))
+                                 for field, (recognised_dict, standard_list) in (stored_as_integer or {}).items())
+
+        setattr_ = object.__setattr__
+        setattr_(self, 'protected_upper_case_words', MappingProxyType(dict(protected_upper_case_words)))
+        setattr_(self, 'protect_upper_case_fields', frozenset(field.strip() for field in protect_upper_case_fields))
+        setattr_(self, 'contains_latex_expressions', frozenset(field.strip() for field in contains_latex_expressions))
+        setattr_(self, 'not_stored_as_string', frozenset(stored_as_integer))
+        setattr_(self, 'stored_as_integer', MappingProxyType(stored_as_integer))
+        setattr_(self, 'string_latex_tuppels', tuple(string_latex_tuppels))
+        setattr_(self, '_codec', _get_latex_codec(self.string_latex_tuppels))
+        setattr_(self, '_matcher', _compile_protected_words(self.protected_upper_case_words)
+                 if self.protected_upper_case_words else None)
+        setattr_(self, '_fingerprint', None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("BibConfig is immutable, use replace to derive a changed configuration")
+
+    def __delattr__(self, name):
+        raise AttributeError("BibConfig is immutable, use replace to derive a changed configuration")
+
+    def __reduce__(self):
+        return (BibConfig, self._arguments())
+
+    def __eq__(self, other):
+        if not isinstance(other, BibConfig):
+            return NotImplemented
+        return self.get_fingerprint() == other.get_fingerprint()
+
+    def __hash__(self):
+        return hash(self.get_fingerprint())
+
+    def _arguments(self):
+        return (
+            dict(self.protected_upper_case_words),
+            set(self.protect_upper_case_fields),
+            set(self.contains_latex_expressions),
+            dict((field, (dict(recognised_dict), list(standard_list)))
+                 for field, (recognised_dict, standard_list) in self.stored_as_integer.items()),
+            self.string_latex_tuppels,
+        )
+
+    @classmethod
+    def from_definitions(cls):
+        """
+        Returns a configuration with the current settings of the global :class:`BibDefinitions`
+
+        The configuration is cached until the global settings change.
+
+        :rtype: BibConfig
+        """
+        global _definitions_config
+        version, config = _definitions_config
+        if version != BibDefinitions.get_version():
+            version = BibDefinitions.get_version()
+            settings = BibDefinitions.get_settings()
+            config = cls(settings['protected_upper_case_words'], settings['protect_upper_case_fields'],
+                         settings['contains_latex_expressions'], settings['stored_as_integer'],
+                         BibDefinitions._string_latex_tuppels)
+            _definitions_config = (version, config)
+        return config
+
+    def replace(self, **changes):
+        """
+        Returns a copy of the configuration with some settings replaced
+
+        :param changes: keyword arguments of the constructor, e.g. protect_upper_case_fields=['title']
+        :rtype: BibConfig
+        """
+        names = ('protected_upper_case_words', 'protect_upper_case_fields', 'contains_latex_expressions',
+                 'stored_as_integer', 'string_latex_tuppels')
+        arguments = dict(zip(names, self._arguments()))
+        unknown = set(changes) - set(names)
+        if unknown:
+            raise TypeError("Unknown settings: " + ", ".join(sorted(unknown)))
+        arguments.update(changes)
+        return BibConfig(**arguments)
+
+    def get_fingerprint(self):
+        """
+        Returns a fingerprint of the configuration, equal to the one of BibDefinitions with the same settings
+
+        :returns: hexadecimal digest
+        :rtype: str
+        """
+        if self._fingerprint is None:
+            protected_words, protect_fields, latex_fields, stored_as_integer, table = self._arguments()
+            settings = {
+                'protected_upper_case_words': protected_words,
+                'protect_upper_case_fields': protect_fields,
+                'contains_latex_expressions': latex_fields,
+                'stored_as_integer': stored_as_integer,
+            }
+            object.__setattr__(self, '_fingerprint', _settings_fingerprint(settings, table))
+        return self._fingerprint
+
+    def get_recognised(self, field):
+        """
+        Returns the dictionary from the recognised strings to the integers of a field stored as integer
+        """
+        return self.stored_as_integer[field][0]
+
+    def get_default(self, field):
+        """
+        Returns the strings written for the integers of a field stored as integer
+        """
+        return self.stored_as_integer[field][1]
+
+    def latex_to_string(self, field):
+        """
+        Replaces all latex expressions of the conversion table by the corresponding unicode characters
+        :param field: string containing latex expressions
+        :type: str
+        :returns: str
+        """
+        latex_to_string_re, latex_to_string_replace, _, _, _, backslash_only = self._codec
+        if backslash_only and '\\' not in field:
+            return field
+        return latex_to_string_re.sub(latex_to_string_replace, field)
+
+    def string_to_latex(self, field):
+        """
+        Replaces all characters of the conversion table by the corresponding latex expressions
+        :param field: unicode string
+        :type: str
+        :returns: str
+        """
+        _, _, string_to_latex_re, string_to_latex_replace, ascii_keys, _ = self._codec
+        if field.isascii() and not any(key in field for key in ascii_keys):
+            return field
+        return string_to_latex_re.sub(string_to_latex_replace, field)
+
+    def protect_upper_case(self, string):
+        """
+        Protects upper case letters by braces: runs of capitals, capitals following a colon, and all protected upper
+        case words
+        :param string: the string to protect
+        :type: str
+        :returns: str
+        """
+        string = _upper_case_re.sub(r'{\g<0>}', string)
+        if self._matcher is None:
+            return string
+        return self._matcher(string)
+
+    def unprotect_upper_case(self, string):
+        return _protected_upper_case_re.sub(r"\g<1>", string)
+
+
+def _get_latex_codec(table):
+    """
+    Returns the compiled codec of a conversion table, the codec of the last table is reused since most
+    configurations share the table
+    """
+    global _last_latex_codec
+    last_table, codec = _last_latex_codec
+    if last_table is not table:
+        codec = _compile_latex_codec(table)
+        _last_latex_codec = (table, codec)
+    return codec
+
+
+# the last compiled conversion table and its codec
+_last_latex_codec = (None, None)
+
+# the configuration of the global settings and the settings version it was created for, see from_definitions
+_definitions_config = (None, None)
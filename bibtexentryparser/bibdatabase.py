@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Sonja Stuedli
+
+import re
+import bisect
+import logging
+
+from bibtexentryparser.bibparser import BibTexParser
+
+logger = logging.getLogger(__name__)
+
+__all__ = ['BibDatabase']
+
+# separators between the keywords of the keyword field
+_keyword_separator_re = re.compile(r'\s*[,;]\s*')
+
+
+class BibDatabase(object):
+    """
+    An in-memory collection of parsed entries with secondary indexes for fast queries.
+
+    The database keeps hash indexes on the ID and the entry type, inverted indexes on the individual authors and
+    keywords and a sorted index on the year. All indexes are updated incrementally when entries are added, removed or
+    changed with :meth:`set_entry_field`. Entries changed directly must be passed to :meth:`reindex`.
+
+    """
+
+    def __init__(self, entries=None, parser=None):
+        """
+        Creates a database
+
+        :param entries: parsed entries added to the database (optional)
+        :type entries: iterable of dict
+        :param parser: custom parser used by set_entry_field (optional)
+        :type parser: BibTexParser
+        """
+        self.parser = BibTexParser() if parser is None else parser
+        # entries by ID in the order they are added
+        self.entries = dict()
+        self._order = dict()
+        self._next_order = 0
+        self._by_type = dict()
+        self._by_author = dict()
+        self._by_keyword = dict()
+        self._indexes = (self._by_type, self._by_author, self._by_keyword)
+        self._indexed = dict()
+        # year to the IDs of the entries with a numeric year and the sorted list of these years
+        self._by_year = dict()
+        self._years = list()
+        if entries is not None:
+            for entry in entries:
+                self.add(entry)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, entry_id):
+        return entry_id in self.entries
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def keys(self):
+        return self.entries.keys()
+
+    def values(self):
+        return self.entries.values()
+
+    def __getitem__(self, entry_id):
+        return self.entries[entry_id]
+
+    def get(self, entry_id, default=None):
+        """
+        Returns the entry with the given ID
+
+        :param entry_id: the ID of the entry
+        :type entry_id: str
+        :param default: returned if there is no entry with this ID
+        :returns: bibtex entry
+        :rtype: dict
+        """
+        return self.entries.get(entry_id, default)
+
+    def add(self, entry):
+        """
+        Adds an entry, an entry with the same ID is replaced
+
+        :param entry: the parsed entry
+        :type entry: dict
+        """
+        entry_id = entry['ID']
+        if entry_id in self.entries:
+            logger.debug("Entry " + entry_id + " is replaced.")
+            self._unindex(entry_id)
+        else:
+            self._order[entry_id] = self._next_order
+            self._next_order += 1
+        self.entries[entry_id] = entry
+        self._index(entry_id, entry)
+
+    def remove(self, entry_id):
+        """
+        Removes the entry with the given ID
+
+        :param entry_id: the ID of the entry
+        :type entry_id: str
+        :returns: the removed entry
+        :rtype: dict
+        """
+        entry = self.entries.pop(entry_id)
+        del self._order[entry_id]
+        self._unindex(entry_id)
+        return entry
+
+    def set_entry_field(self, entry_id, key, text):
+        """
+        Sets a field of an entry from its BibTeX string and updates the indexes
+
+        Setting the key 'ID' renames the entry, like :meth:`reindex` this moves the entry to the end.
+
+        :param entry_id: the ID of the entry
+        :type entry_id: str
+        :param key: key that should be set
+        :type key: str
+        :param text: text that should be set
+        :type text: str
+        :returns: the changed entry
+        :rtype: dict
+        :raises ValueError: if the new ID is the ID of another entry
+        """
+        entry = self.entries[entry_id]
+        if key == 'ID':
+            new_id = text.strip()
+            if new_id != entry_id and new_id in self.entries:
+                raise ValueError("An entry with the ID " + new_id + " already exists.")
+            self.remove(entry_id)
+            entry['ID'] = new_id
+            self.add(entry)
+            return entry
+        self._unindex(entry_id)
+        self.parser.set_entry_field(entry, key, text)
+        self._index(entry_id, entry)
+        return entry
+
+    def reindex(self, entry_id):
+        """
+        Updates the indexes of an entry that has been changed directly, a changed ID moves the entry to the end
+
+        :param entry_id: the ID of the entry
+        :type entry_id: str
+        """
+        entry = self.entries[entry_id]
+        if entry['ID'] == entry_id:
+            self._unindex(entry_id)
+            self._index(entry_id, entry)
+        else:
+            self.add(self.remove(entry_id))
+
+    def find(self, author=None, entrytype=None, keyword=None, year=None, year_min=None, year_max=None):
+        """
+        Returns the entries matching all given conditions, without scanning all entries
+
+        Authors and keywords are compared case insensitive.
+
+        :param author: an author of the entry, as stored in the parsed author list
+        :type author: str
+        :param entrytype: the entry type, e.g. 'article'
+        :type entrytype: str
+        :param keyword: a keyword of the entry
+        :type keyword: str
+        :param year: the year of the entry
+        :type year: int
+        :param year_min: the smallest year of the entry
+        :type year_min: int
+        :param year_max: the largest year of the entry
+        :type year_max: int
+        :returns: the matching entries in the order of the database
+        :rtype: list of dictionaries
+        """
+        if year is not None:
+            year_min = year_max = year
+        candidates = list()
+        if author is not None:
+            candidates.append(self._by_author.get(_normalise(author), set()))
+        if entrytype is not None:
+            candidates.append(self._by_type.get(entrytype.lower(), set()))
+        if keyword is not None:
+            candidates.append(self._by_keyword.get(_normalise(keyword), set()))
+        if year_min is not None or year_max is not None:
+            candidates.append(self._find_years(year_min, year_max))
+        if not candidates:
+            return list(self.entries.values())
+
+        candidates.sort(key=len)
+        result = set(candidates[0])
+        for candidate in candidates[1:]:
+            if not result:
+                break
+            result.intersection_update(candidate)
+        return [self.entries[entry_id] for entry_id in sorted(result, key=self._order.__getitem__)]
+
+    def _find_years(self, year_min, year_max):
+        start = 0 if year_min is None else bisect.bisect_left(self._years, year_min)
+        end = len(self._years) if year_max is None else bisect.bisect_right(self._years, year_max)
+        result = set()
+        for year in self._years[start:end]:
+            result.update(self._by_year[year])
+        return result
+
+    def _index(self, entry_id, entry):
+        values = self._index_values(entry)
+        # the indexed values are kept, such that they can be removed after the entry has been changed directly
+        self._indexed[entry_id] = values
+        for index, keys in zip(self._indexes, values[:-1]):
+            for key in keys:
+                index.setdefault(key, set()).add(entry_id)
+        year = values[-1]
+        if year is not None:
+            ids = self._by_year.get(year)
+            if ids is None:
+                ids = self._by_year[year] = set()
+                # only the distinct years are sorted, there are few of them
+                bisect.insort(self._years, year)
+            ids.add(entry_id)
+
+    def _unindex(self, entry_id):
+        values = self._indexed.pop(entry_id)
+        for index, keys in zip(self._indexes, values[:-1]):
+            for key in keys:
+                ids = index[key]
+                ids.discard(entry_id)
+                if not ids:
+                    del index[key]
+        year = values[-1]
+        if year is not None:
+            ids = self._by_year[year]
+            ids.discard(entry_id)
+            if not ids:
+                del self._by_year[year]
+                del self._years[bisect.bisect_left(self._years, year)]
+
+    def _index_values(self, entry):
+        """
+        Returns the entry type, the authors, the keywords and the year indexed for an entry
+        """
+        entry_type = entry.get('ENTRYTYPE')
+        entry_types = () if entry_type is None else (entry_type.lower(),)
+
+        authors = entry.get('author', ())
+        if type(authors) is str:
+            authors = (authors,)
+        authors = frozenset(_normalise(author) for author in authors)
+
+        keywords = entry.get('keyword')
+        if type(keywords) is str:
+            keywords = _keyword_separator_re.split(keywords)
+        elif keywords is None:
+            keywords = ()
+        keywords = frozenset(_normalise(keyword) for keyword in keywords if keyword.strip())
+
+        try:
+            year = int(entry['year'])
+        except (KeyError, TypeError, ValueError):
+            year = None
+        return (entry_types, authors, keywords, year)
+
+
+def _normalise(text):
+    return ' '.join(text.split()).casefold()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Sonja Stuedli
+
+import re
+import zlib
+import random
+import logging
+import unicodedata
+from itertools import combinations
+from collections import namedtuple
+
+from bibtexentryparser.bibconfig import BibConfig
+
+logger = logging.getLogger(__name__)
+
+__all__ = ['BibDeduplicator', 'DuplicateCluster']
+
+# A group of duplicate entries: the IDs, the smallest similarity of the pairs linking the cluster and the similar
+# pairs (ID, ID, similarity)
+DuplicateCluster = namedtuple('DuplicateCluster', ['ids', 'score', 'pairs'])
+
+_non_word_re = re.compile(r'[\W_]+')
+_doi_prefix_re = re.compile(r'^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)', re.IGNORECASE)
+
+# a prime larger than the 32 bit shingle hashes for the universal hash functions of the MinHash signatures
+_PRIME = (1 << 61) - 1
+
+
+class BibDeduplicator(object):
+    """
+    Finds near-duplicate entries with different IDs in large collections of parsed entries.
+
+    Comparing all pairs of entries is quadratic, instead candidate pairs are generated by blocking and by locality
+    sensitive hashing: entries are candidates if they have the same normalised DOI, the same year and surname of the
+    first author or if the MinHash signatures of their title shingles agree in a band. Only the candidate pairs are
+    scored and pairs with a similarity of at least threshold are merged into clusters. Titles and authors are decoded
+    with the LaTeX conversion of the configuration, or else of the global settings.
+
+    """
+
+    def __init__(self, threshold=0.8, num_permutations=32, bands=8, shingle_size=3, max_block_size=1000, seed=1,
+                 config=None):
+        """
+        :param threshold: smallest similarity of duplicate entries, between 0 and 1
+        :type threshold: float
+        :param num_permutations: length of the MinHash signatures
+        :type num_permutations: int
+        :param bands: number of LSH bands, must divide num_permutations. More bands find less similar titles
+        :type bands: int
+        :param shingle_size: number of characters of the title shingles
+        :type shingle_size: int
+        :param max_block_size: blocks with more entries are not used for candidate generation
+        :type max_block_size: int
+        :param seed: seed of the MinHash permutations
+        :type seed: int
+        :param config: the settings the entries have been parsed with (default: the global settings)
+        :type config: BibConfig
+        """
+        if num_permutations % bands:
+            raise ValueError("The number of bands must divide the number of permutations.")
+        self.threshold = threshold
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.max_block_size = max_block_size
+        self.config = config
+        generator = random.Random(seed)
+        self._permutations = [(generator.randrange(1, _PRIME), generator.randrange(0, _PRIME))
+                              for _ in range(num_permutations)]
+
+    def get_config(self):
+        """
+        Returns the settings used for decoding: the config of the deduplicator or else the current global settings
+
+        :rtype: BibConfig
+        """
+        if self.config is not None:
+            return self.config
+        return BibConfig.from_definitions()
+
+    def find_duplicates(self, entries):
+        """
+        Returns the clusters of duplicate entries
+
+        :param entries: the parsed entries
+        :type entries: iterable of dict
+        :returns: the clusters with at least two entries, the most similar clusters first
+        :rtype: list of DuplicateCluster
+        """
+        latex_to_string = self.get_config().latex_to_string
+        features = dict()
+        blocks = dict()
+        for entry in entries:
+            entry_id = entry['ID']
+            if entry_id in features:
+                logger.warning("Duplicate entry ID " + entry_id + ", only the first entry is compared.")
+                continue
+            entry_features = self._get_features(entry, latex_to_string)
+            features[entry_id] = entry_features
+            for key in self._get_block_keys(entry_features):
+                blocks.setdefault(key, []).append(entry_id)
+
+        candidates = set()
+        for key, ids in blocks.items():
+            if len(ids) > self.max_block_size:
+                logger.info("Block " + str(key) + " with " + str(len(ids)) + " entries is skipped.")
+                continue
+            candidates.update(combinations(ids, 2))
+
+        # union find over the IDs of the similar pairs
+        parents = dict()
+
+        def find(entry_id):
+            parent = parents.setdefault(entry_id, entry_id)
+            if parent != entry_id:
+                parent = parents[entry_id] = find(parent)
+            return parent
+
+        pairs = list()
+        for first, second in candidates:
+            score = self._similarity(features[first], features[second])
+            if score >= self.threshold:
+                pairs.append((first, second, score))
+                parents[find(first)] = find(second)
+
+        clusters = dict()
+        for first, second, score in pairs:
+            clusters.setdefault(find(first), []).append((first, second, score))
+        result = list()
+        for cluster_pairs in clusters.values():
+            ids = sorted(set(entry_id for pair in cluster_pairs for entry_id in pair[:2]))
+            cluster_pairs.sort(key=lambda pair: (-pair[2], pair[0], pair[1]))
+            result.append(DuplicateCluster(ids, min(pair[2] for pair in cluster_pairs), cluster_pairs))
+        result.sort(key=lambda cluster: (-cluster.score, cluster.ids))
+        return result
+
+    def _get_features(self, entry, latex_to_string):
+        """
+        Returns the normalised DOI, year, author surnames, title shingles and MinHash signature of an entry
+        """
+        doi = entry.get('doi')
+        if isinstance(doi, str):
+            doi = _doi_prefix_re.sub('', doi.strip()).lower() or None
+        else:
+            doi = None
+
+        year = entry.get('year')
+        year = str(year).strip() if year is not None else None
+
+        authors = entry.get('author', [])
+        if isinstance(authors, str):
+            authors = [authors]
+        surnames = [_get_surname(author, latex_to_string) for author in authors]
+        surnames = [surname for surname in surnames if surname]
+
+        title = entry.get('title')
+        shingles = self._get_shingles(title, latex_to_string) if isinstance(title, str) else frozenset()
+        return (doi, year, surnames, shingles, self._get_signature(shingles))
+
+    def _get_shingles(self, title, latex_to_string):
+        title = _normalise(latex_to_string(title))
+        if len(title) <= self.shingle_size:
+            return frozenset([title]) if title else frozenset()
+        return frozenset(title[start:start + self.shingle_size] for start in range(len(title) - self.shingle_size + 1))
+
+    def _get_signature(self, shingles):
+        if not shingles:
+            return None
+        hashes = [zlib.crc32(shingle.encode('utf-8')) for shingle in shingles]
+        return tuple(min((a * value + b) % _PRIME for value in hashes) for a, b in self._permutations)
+
+    def _get_block_keys(self, features):
+        doi, year, surnames, shingles, signature = features
+        if doi is not None:
+            yield ('doi', doi)
+        if year is not None and surnames:
+            yield ('author', year, surnames[0])
+        if signature is not None:
+            rows = len(signature) // self.bands
+            for band in range(self.bands):
+                yield ('title', band, signature[band * rows:(band + 1) * rows])
+
+    def _similarity(self, first, second):
+        """
+        Returns the similarity of two entries between 0 and 1
+        """
+        first_doi, first_year, first_surnames, first_shingles, _ = first
+        second_doi, second_year, second_surnames, second_shingles, _ = second
+        if first_doi is not None and second_doi is not None:
+            # a DOI identifies the work
+            return 1.0 if first_doi == second_doi else 0.0
+
+        title = _jaccard(first_shingles, second_shingles)
+        authors = _jaccard(set(first_surnames), set(second_surnames))
+        if first_year is None or second_year is None:
+            year = 0.5
+        else:
+            year = 1.0 if first_year == second_year else 0.0
+        return 0.6 * title + 0.25 * authors + 0.15 * year
+
+
+def _normalise(text):
+    """
+    Removes accents, punctuation and case
+    """
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(character for character in text if not unicodedata.combining(character))
+    return _non_word_re.sub(' ', text.replace('{', '').replace('}', '')).strip().casefold()
+
+
+def _get_surname(author, latex_to_string):
+    last = getattr(author, 'last', None)
+    if last is not None:
+        # a parsed name, see BibName
+        return _normalise(last)
+    author = latex_to_string(author)
+    if ',' in author:
+        surname = author.split(',', 1)[0]
+    else:
+        names = author.split()
+        surname = names[-1] if names else ''
+    return _normalise(surname)
+
+
+def _jaccard(first, second):
+    if not first and not second:
+        return 0.0
+    return len(first & second) / len(first | second)
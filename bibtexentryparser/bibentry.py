@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Sonja Stuedli
+
+import sys
+from collections.abc import MutableMapping
+
+__all__ = ['BibEntry']
+
+class BibEntry(MutableMapping):
+    """
+    Compact dictionary-like representation of a BibTeX entry.
+
+    The common fields are stored in slots, such that an entry does not need a dictionary of its own. Rare fields are
+    stored in an overflow dictionary with interned keys. The entry can be used wherever a dictionary entry is
+    expected, e.g. by :class:`BibTexWriter`. Select it with BibTexParser(entry_factory=BibEntry).
+
+    """
+
+    # fields stored in slots, all other fields are stored in _extra
+    _fields = (
+        'ENTRYTYPE', 'ID', 'author', 'title', 'journal', 'booktitle', 'year', 'month', 'volume', 'number', 'pages',
+        'publisher', 'editor', 'doi', 'link', 'keyword', 'abstract', 'note', 'address', 'organization', 'school',
+        'institution', 'series', 'edition', 'isbn', 'issn',
+    )
+    __slots__ = _fields + ('_extra',)
+    _field_set = frozenset(_fields)
+
+    def __init__(self, *args, **kwargs):
+        self._extra = None
+        self.update(*args, **kwargs)
+
+    def __getitem__(self, key):
+        if key in self._field_set:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        if key in self._field_set:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = dict()
+            self._extra[sys.intern(key)] = value
+
+    def __delitem__(self, key):
+        if key in self._field_set:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        else:
+            if self._extra is None:
+                raise KeyError(key)
+            del self._extra[key]
+            if not self._extra:
+                self._extra = None
+
+    def __contains__(self, key):
+        if key in self._field_set:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self):
+        for key in self._fields:
+            if hasattr(self, key):
+                yield key
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        length = sum(1 for key in self._fields if hasattr(self, key))
+        if self._extra is not None:
+            length += len(self._extra)
+        return length
+
+    def __repr__(self):
+        return 'BibEntry(' + repr(dict(self)) + ')'
+
+    def __getstate__(self):
+        return dict(self)
+
+    def __setstate__(self, state):
+        self._extra = None
+        self.update(state)
+
+    def copy(self):
+        return BibEntry(self)
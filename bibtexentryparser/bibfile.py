@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Sonja Stuedli
+
+import os
+import mmap
+import json
+import logging
+
+from bibtexentryparser.bibparser import BibTexParser
+from bibtexentryparser.bibtokenizer import iter_entry_spans
+
+logger = logging.getLogger(__name__)
+
+__all__ = ['BibFile']
+
+# version of the sidecar index format, increase if the format changes
+INDEX_VERSION = 1
+
+
+class BibFile(object):
+    """
+    Random access by ID to the entries of a (large) BibTeX file.
+
+    The file is memory mapped and an index from the entry ID to the byte offsets (start, end) of the entry is built in
+    a single scan over the file. An entry is only parsed when it is requested. The index can be stored in a sidecar
+    file, such that reopening an unchanged file does not need to scan the file again.
+
+    """
+
+    def __init__(self, path, parser=None, encoding='utf-8', index_path=None, use_index_file=True):
+        """
+        Opens a BibTeX file for random access
+
+        :param path: path to the BibTeX file
+        :type path: str
+        :param parser: custom parser to use (optional)
+        :type parser: BibTexParser
+        :param encoding: encoding of the file
+        :type encoding: str
+        :param index_path: path of the sidecar index file (optional), default is path + '.idx'
+        :type index_path: str
+        :param use_index_file: whether a valid sidecar index file should be used instead of scanning the file
+        :type use_index_file: bool
+        """
+        self.path = path
+        self.parser = BibTexParser() if parser is None else parser
+        self.encoding = encoding
+        self.index_path = path + '.idx' if index_path is None else index_path
+
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        if size > 0:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            # an empty file can not be mapped
+            self._map = b''
+
+        self.index = None
+        if use_index_file:
+            self.index = self._load_index()
+        if self.index is None:
+            self.index = self._scan()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, entry_id):
+        return entry_id in self.index
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def keys(self):
+        return self.index.keys()
+
+    def __getitem__(self, entry_id):
+        return self.parser.parse(self.get_entry_string(entry_id))
+
+    def get(self, entry_id, default=None):
+        """
+        Returns the parsed entry with the given ID
+
+        :param entry_id: the ID of the entry
+        :type entry_id: str
+        :param default: returned if there is no entry with this ID
+        :returns: bibtex entry
+        :rtype: dict
+        """
+        if entry_id not in self.index:
+            return default
+        return self[entry_id]
+
+    def get_entry_string(self, entry_id):
+        """
+        Returns the unparsed entry with the given ID
+
+        :param entry_id: the ID of the entry
+        :type entry_id: str
+        :returns: the BibTeX string of the entry
+        :rtype: str
+        """
+        start, end = self.index[entry_id]
+        return self._map[start:end].decode(self.encoding, errors='replace')
+
+    def _scan(self):
+        """
+        Scans the whole file once and builds the index from ID to (start, end) byte offsets.
+        """
+        index = dict()
+        data = self._map
+        for start, end, id_start, id_end in iter_entry_spans(data):
+            entry_id = data[id_start:id_end].decode(self.encoding, errors='replace')
+            if entry_id in index:
+                logger.warning("Duplicate entry ID " + entry_id + ", only the first entry is indexed.")
+            else:
+                index[entry_id] = (start, end)
+        return index
+
+    def _file_signature(self):
+        stat = os.fstat(self._file.fileno())
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    def save_index(self, index_path=None):
+        """
+        Stores the index in a sidecar file
+
+        :param index_path: path of the index file (optional), default is the index_path of the object
+        :type index_path: str
+        """
+        if index_path is None:
+            index_path = self.index_path
+        data = {
+            'version': INDEX_VERSION,
+            'file': self._file_signature(),
+            'entries': [[entry_id, start, end] for entry_id, (start, end) in self.index.items()],
+        }
+        with open(index_path, 'w', encoding='utf-8') as index_file:
+            json.dump(data, index_file)
+
+    def _load_index(self):
+        """
+        Loads the index from the sidecar file if it exists and belongs to the unchanged file.
+        """
+        try:
+            with open(self.index_path, encoding='utf-8') as index_file:
+                data = json.load(index_file)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != INDEX_VERSION or data.get('file') != self._file_signature():
+            logger.debug("Index file is outdated: " + self.index_path)
+            return None
+        return dict((entry_id, (start, end)) for entry_id, start, end in data['entries'])
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Sonja Stuedli
+
+from bibtexentryparser.bibcache import LRUCache
+
+__all__ = ['BibName', 'parse_name', 'split_names', 'name_cache']
+
+# bounded cache of the parsed names of parse_name without an own cache, authors repeat across entries such that most
+# names are only parsed once. Parsers use their own cache, such that parsers in different threads share no state.
+name_cache = LRUCache(100000)
+
+
+class BibName(str):
+    """
+    An author name, which is a string that additionally provides the parts of the name.
+
+    The parts are split following the BibTeX rules for the forms "First von Last", "von Last, First" and
+    "von Last, Jr, First": the von part consists of the words starting with a lower case letter. Braced words, e.g.
+    {van Gogh}, are never split. Missing parts are empty strings.
+
+    """
+
+    def __new__(cls, name, first='', von='', last='', jr=''):
+        bib_name = super().__new__(cls, name)
+        bib_name.first = first
+        bib_name.von = von
+        bib_name.last = last
+        bib_name.jr = jr
+        return bib_name
+
+    def __reduce__(self):
+        return (BibName, (str(self), self.first, self.von, self.last, self.jr))
+
+
+def parse_name(name, cache=None):
+    """
+    Parses a single author name, the result is cached
+
+    :param name: the name, e.g. "Ludwig van Beethoven" or "van Beethoven, Ludwig"
+    :type name: str
+    :param cache: the cache of the parsed names (default: the shared name_cache)
+    :type cache: LRUCache
+    :returns: the name with its parts
+    :rtype: BibName
+    """
+    if cache is None:
+        cache = name_cache
+    parsed_name = cache.get(name)
+    if parsed_name is None:
+        parsed_name = _parse_name(name)
+        cache.put(name, parsed_name)
+    return parsed_name
+
+
+def split_names(field):
+    """
+    Splits a list of names separated by ' and ' outside of braces in a single scan. Outer braces of a name are removed.
+
+    :param field: the names, e.g. "A. Author and {Barnes and Noble}"
+    :type field: str
+    :returns: the names
+    :rtype: list
+    """
+    names = list()
+    depth = 0
+    start = 0
+    scanned = 0
+    separator = field.find(' and ')
+    while separator >= 0:
+        # the braces are counted once per character between the separators
+        depth += field.count('{', scanned, separator) - field.count('}', scanned, separator)
+        scanned = separator
+        if depth == 0:
+            names.append(field[start:separator])
+            start = scanned = separator + 5
+        separator = field.find(' and ', separator + 5)
+    names.append(field[start:])
+    return [_strip_outer_braces(name.strip()) for name in names]
+
+
+def _strip_outer_braces(name):
+    if not name.startswith('{') or not name.endswith('}'):
+        return name
+    # the outer braces are only removed if they enclose the complete name
+    depth = 0
+    for position, character in enumerate(name):
+        if character == '{':
+            depth += 1
+        elif character == '}':
+            depth -= 1
+            if depth == 0:
+                if position == len(name) - 1:
+                    return name[1:-1]
+                return name
+    return name
+
+
+def _split_at_depth_zero(text, separator):
+    """
+    Splits text at the separator characters outside of braces
+    """
+    parts = list()
+    depth = 0
+    start = 0
+    for position, character in enumerate(text):
+        if character == '{':
+            depth += 1
+        elif character == '}':
+            depth -= 1
+        elif depth == 0 and character in separator:
+            parts.append(text[start:position])
+            start = position + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _is_von(word):
+    """
+    Returns whether the word starts with a lower case letter outside of braces
+    """
+    depth = 0
+    for character in word:
+        if character == '{':
+            depth += 1
+        elif character == '}':
+            depth -= 1
+        elif depth == 0 and character.isalpha():
+            return character.islower()
+    return False
+
+
+def _parse_name(name):
+    parts = [part.strip() for part in _split_at_depth_zero(name, ',')]
+    if len(parts) == 1:
+        # First von Last
+        words = [word for word in _split_at_depth_zero(parts[0], ' \t\n~') if word]
+        if not words:
+            return BibName(name)
+        von_words = [index for index, word in enumerate(words[:-1]) if _is_von(word)]
+        if von_words:
+            first = words[:von_words[0]]
+            von = words[von_words[0]:von_words[-1] + 1]
+            last = words[von_words[-1] + 1:]
+        else:
+            first, von, last = words[:-1], [], words[-1:]
+        jr = []
+    else:
+        # von Last, First or von Last, Jr, First
+        words = [word for word in _split_at_depth_zero(parts[0], ' \t\n~') if word]
+        jr = [parts[1]] if len(parts) > 2 else []
+        first = [', '.join(parts[2:]) if len(parts) > 2 else parts[1]]
+        von_words = [index for index, word in enumerate(words[:-1]) if _is_von(word)]
+        if von_words:
+            von = words[:von_words[-1] + 1]
+            last = words[von_words[-1] + 1:]
+        else:
+            von, last = [], words
+    return BibName(name, ' '.join(first).strip(), ' '.join(von), ' '.join(last), ' '.join(jr))
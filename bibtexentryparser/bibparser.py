@@ -9,33 +9,98 @@
 # Francois Boulogne <fboulogne at april dot org>
 # Modified by Sonja Stuedli
 
+import os
 import sys
-import re
+import time
+import asyncio
+import json
+import hashlib
 import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 logger = logging.getLogger(__name__)
 
 from bibtexentryparser.bibDefinitions import BibDefinitions
+from bibtexentryparser.bibconfig import BibConfig
+from bibtexentryparser.bibcache import LRUCache, InternPool, ParsedFileCache
+from bibtexentryparser.bibtokenizer import tokenize, iter_entry_strings, EntrySplitter, ENTRYTYPE, ID, KEY, VALUE
+from bibtexentryparser.bibnames import parse_name, split_names
+from bibtexentryparser.bibtiming import BibTimer
 
 __all__ = ['BibTexParser']
 
+# marks a value missing from a cache
+_MISSING = object()
+
 class BibTexParser(object):
     """
     A parser for reading BibTeX bibliographic data entries.
 
     """
 
-    def __init__(self):
+    def __init__(self, entry_factory=dict, config=None):
         """
         Creates a parser for parsing BibTeX entries
 
+        :param entry_factory: type of the parsed entries, e.g. dict or the more compact :class:`BibEntry`
+        :type entry_factory: callable
+        :param config: frozen settings used by this parser (default: the global settings of :class:`BibDefinitions`)
+        :type config: BibConfig
         :return: parser
         :rtype: `BibTexParser`
         """
+        self.entry_factory = entry_factory
+
+        # explicit settings, see get_config
+        self.config = config
+        # non recognised values of the fields stored as integer if the parser has its own config
+        self.non_recognised = dict()
+
+        # optional pool sharing equal field values between entries, see enable_interning
+        self.intern_pool = None
+        self.intern_fields = None
+
+        # optional cache of processed fields, see enable_field_cache
+        self.field_cache = None
+        self.field_cache_fields = None
+
+        # custom processing stages per key, see add_field_processing_stage
+        self.custom_field_stages = dict()
+
+        # parsed author names, see bibnames.parse_name. Every parser has its own cache since a parser is only used by
+        # one thread at a time.
+        self.name_cache = LRUCache(10000)
+
+        # optional timing of the processing stages, see enable_timing
+        self.timer = None
+        self.invalidate_field_pipelines()
+
         self.reset_to_default_settings()
     
     def is_parser(self):
         return True
 
+    def get_config(self):
+        """
+        Returns the settings used for parsing: the config of the parser or else the current global settings
+
+        :rtype: BibConfig
+        """
+        if self.config is not None:
+            return self.config
+        return BibConfig.from_definitions()
+
+    def get_non_recognised_string_fields(self, field):
+        """
+        Returns the values of a field stored as integer that have not been recognised. They are collected in
+        :class:`BibDefinitions` unless the parser has its own config.
+
+        :rtype: set
+        """
+        if self.config is None:
+            return BibDefinitions.get_non_recognised_string_fields(field)
+        return self.non_recognised.setdefault(field, set())
+
 
     def reset_to_default_settings(self):
         self.entry_key_replacements = {
@@ -51,54 +116,316 @@ class BibTexParser(object):
         }
 
         
-    """
-    Parse a string containing a bibtex entry.
-    
-    :return: bibtex entry
-    :rtype: 'BibTexEntry'
-    """
     def parse(self,bibstring):
+        """
+        Parse a string containing a bibtex entry.
 
-        # locate the entry type
-        logger.debug("Decoding bibtex entry:")
-        logger.debug(bibstring)
-        bibtex_expression = re.search('@(.+?)[{](.+?),(.+)[}]',bibstring,re.DOTALL)
+        The entry is read by the single pass tokenizer in :mod:`bibtexentryparser.bibtokenizer`, such that the parse
+        time grows linearly with the length of the entry.
 
-        d = {}
+        :param bibstring: string containing a bibtex entry
+        :type bibstring: str
+        :return: bibtex entry
+        :rtype: dict
+        """
+        logger.debug("Decoding bibtex entry:\n%s", bibstring)
+
+        timer = self.timer
+        if timer is None:
+            return self._parse_tokens(bibstring, tokenize(bibstring))
+        start = time.perf_counter_ns()
+        entry = self._parse_tokens(bibstring, timer.timed_iterator('tokenize', tokenize(bibstring)))
+        timer.add('entry', time.perf_counter_ns() - start)
+        return entry
+
+    def _parse_tokens(self, bibstring, tokens):
+        d = self.entry_factory()
+        processed_key = None
         try:
-            logger.debug(bibtex_expression.group(1))
-            logger.debug(bibtex_expression.group(2))
-            logger.debug(bibtex_expression.group(3))
-
-            # get the entry_type: 
-            entry_type = self._process_entry_type(bibtex_expression.group(1))
-            d['ENTRYTYPE'] = entry_type
-            
-            # get the entry_id
-            entry_id = bibtex_expression.group(2)
-            d['ID'] = entry_id
-
-            # find keys and fields using regular expressions.
-            # find first all key = {field} and key = "field"
-            for match in re.finditer('\s*?([a-zA-Z0-9]+?)\s*?=\s*?[{"](.*?)[}"]\s*?,',bibtex_expression.group(3),re.DOTALL):
-                logger.debug("Match found:" + match.group(1) + " and " + match.group(2))
-
-                processed_key = self._process_key(match.group(1))
-                d[processed_key] = self._get_processed_field(processed_key,match.group(2))
-            # find all key = string
-            for match in re.finditer('\s*?([a-zA-Z0-9]+?)\s*?=\s*?([^"{}]*?)\s*?,',bibtex_expression.group(3),re.DOTALL):
-                logger.debug("Match found:" + match.group(1) + " and " + match.group(2))
-
-                processed_key = self._process_key(match.group(1))
-                d[processed_key] = self._get_processed_field(processed_key,match.group(2))
-
-        except:
+            for token in tokens:
+                kind = token.kind
+                if kind == VALUE:
+                    d[processed_key] = self._get_processed_field(processed_key,bibstring[token.start:token.end])
+                elif kind == KEY:
+                    processed_key = self._process_key(bibstring[token.start:token.end])
+                elif kind == ENTRYTYPE:
+                    d['ENTRYTYPE'] = self._process_entry_type(bibstring[token.start:token.end])
+                elif kind == ID:
+                    d['ID'] = bibstring[token.start:token.end]
+
+        except Exception:
             logger.warning("Entry not properly decoded.")
             logger.warning(bibstring)
 
             return None
         return d
 
+    def iterparse(self, fileobj, chunk_size=65536):
+        """
+        Parse a file containing several bibtex entries one entry at a time.
+
+        The file is read in chunks, such that the memory needed does not depend on the number of entries in the file.
+        Entries that can not be decoded are skipped.
+
+        :param fileobj: file-like object opened in text or binary mode or path to a file
+        :type fileobj: file or str
+        :param chunk_size: number of characters read at once
+        :type chunk_size: int
+        :return: generator of bibtex entries
+        :rtype: generator of dict
+        """
+        # the entries are tokenized by parse, the splitter only matches braces to find their ends
+        for bibstring in iter_entry_strings(fileobj, chunk_size, match_braces=True):
+            entry = self.parse(bibstring)
+            if entry is not None:
+                yield entry
+
+    async def aiterparse(self, reader, chunk_size=65536, batch_size=1000, executor=None, encoding='utf-8'):
+        """
+        Parse the bibtex entries read from an asyncio stream without blocking the event loop.
+
+        The stream is split and parsed in batches of entries in the executor, such that the event loop stays
+        responsive and only a bounded number of entries is kept in memory. The executor must run the calls in threads
+        of this process, since the batches are parsed with this parser.
+
+        Usage: async for entry in parser.aiterparse(reader): ...
+
+        :param reader: stream providing bytes or str, e.g. asyncio.StreamReader
+        :type reader: asyncio.StreamReader
+        :param chunk_size: number of bytes read at once
+        :type chunk_size: int
+        :param batch_size: number of entries parsed at once in the executor
+        :type batch_size: int
+        :param executor: executor of the CPU-heavy work (default: the default executor of the event loop)
+        :type executor: concurrent.futures.ThreadPoolExecutor
+        :param encoding: encoding of the stream
+        :type encoding: str
+        :return: asynchronous generator of bibtex entries
+        :rtype: async generator of dict
+        """
+        loop = asyncio.get_running_loop()
+        # the entries are tokenized by parse, the splitter only matches braces to find their ends
+        splitter = EntrySplitter(encoding, match_braces=True)
+        bibstrings = []
+        while True:
+            chunk = await reader.read(chunk_size)
+            if not chunk:
+                break
+            bibstrings.extend(await loop.run_in_executor(executor, splitter.feed, chunk))
+            while len(bibstrings) >= batch_size:
+                batch = bibstrings[:batch_size]
+                del bibstrings[:batch_size]
+                for entry in await loop.run_in_executor(executor, self._parse_strings, batch):
+                    yield entry
+        # the rest of the stream is split and parsed in the executor as well
+        for entry in await loop.run_in_executor(executor, self._close_and_parse, splitter, bibstrings):
+            yield entry
+
+    def _close_and_parse(self, splitter, bibstrings):
+        bibstrings.extend(splitter.close())
+        return self._parse_strings(bibstrings)
+
+    def _parse_strings(self, bibstrings):
+        entries = []
+        for bibstring in bibstrings:
+            entry = self.parse(bibstring)
+            if entry is not None:
+                entries.append(entry)
+        return entries
+
+    def parse_file(self, path, encoding='utf-8', cache_dir=None):
+        """
+        Parse all bibtex entries of a file, optionally using a persistent cache.
+
+        If a cache directory is given, the parsed entries are stored there keyed by the contents of the file and the
+        fingerprint of the settings (see get_settings_fingerprint). Loading an unchanged file with unchanged settings
+        again does not parse the file at all. If the cache can not be written, a warning is logged and the parsed
+        entries are returned anyway.
+
+        :param path: path to the file
+        :type path: str
+        :param encoding: encoding of the file
+        :type encoding: str
+        :param cache_dir: directory of the cache (optional)
+        :type cache_dir: str
+        :return: list of bibtex entries
+        :rtype: list of dict
+        """
+        if cache_dir is None:
+            with open(path, encoding=encoding) as bib_file:
+                return list(self.iterparse(bib_file))
+
+        try:
+            cache = ParsedFileCache(cache_dir)
+        except OSError as error:
+            logger.warning("Cache directory can not be created: " + cache_dir + " (" + str(error) + ")")
+            return self.parse_file(path, encoding)
+        key = cache.get_key(path, self.get_settings_fingerprint() + encoding)
+        cached = cache.load(key)
+        if cached is not None:
+            entries, non_recognised = cached
+            _merge_non_recognised(self, non_recognised)
+            return entries
+
+        fields = self.get_config().not_stored_as_string
+        non_recognised_before = dict((field, set(self.get_non_recognised_string_fields(field))) for field in fields)
+        with open(path, encoding=encoding) as bib_file:
+            entries = list(self.iterparse(bib_file))
+        # store the values this file adds to the non recognised fields, such that a cached load reports them as well
+        non_recognised = dict((field, self.get_non_recognised_string_fields(field) - non_recognised_before[field])
+                              for field in fields)
+        cache.store(key, (entries, non_recognised))
+        return entries
+
+    def get_settings_fingerprint(self):
+        """
+        Returns a fingerprint of all settings that change the parsed entries: the :class:`BibConfig`, the key
+        replacements, the entry factory and the custom field processing stages (by name).
+
+        :rtype: str
+        """
+        data = json.dumps({
+            'definitions': self.get_config().get_fingerprint(),
+            'entry_key_replacements': self.entry_key_replacements,
+            'entry_factory': _qualified_name(self.entry_factory),
+            'custom_field_stages': dict((str(key), [[_qualified_name(stage), first] for stage, first in stages])
+                                        for key, stages in self.custom_field_stages.items()),
+        }, sort_keys=True)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def parse_many(self, source, workers=None, batch_size=1000, chunk_size=65536):
+        """
+        Parse a file containing several bibtex entries using several processes.
+
+        The file is split at the entry boundaries into batches of entries that are parsed in a process pool. Every
+        worker uses the config (or a config of the current global settings) and the key replacements of this parser. Custom
+        field processing stages and interning are not transferred to the workers. The entries are returned in the
+        order of the file and only a bounded number of batches is kept in memory.
+
+        :param source: file-like object opened in text or binary mode or path to a file
+        :type source: file or str
+        :param workers: number of worker processes (default: number of cpus)
+        :type workers: int
+        :param batch_size: number of entries sent to a worker at once
+        :type batch_size: int
+        :param chunk_size: number of characters read at once
+        :type chunk_size: int
+        :return: generator of bibtex entries
+        :rtype: generator of dict
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers <= 1:
+            yield from self.iterparse(source, chunk_size)
+            return
+
+        # the frozen config carries all settings including the conversion table, also to spawned workers
+        initargs = (type(self), self.entry_factory, self.get_config(), dict(self.entry_key_replacements))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as executor:
+            pending = deque()
+            batch = []
+            # the workers tokenize the entries, the main process only matches braces to find their ends
+            for bibstring in iter_entry_strings(source, chunk_size, match_braces=True):
+                batch.append(bibstring)
+                if len(batch) >= batch_size:
+                    pending.append(executor.submit(_parse_batch, batch))
+                    batch = []
+                    # keep a bounded number of batches in flight
+                    if len(pending) >= 2 * workers:
+                        yield from _collect_batch(self, pending.popleft())
+            if batch:
+                pending.append(executor.submit(_parse_batch, batch))
+            while pending:
+                yield from _collect_batch(self, pending.popleft())
+
+    def enable_interning(self, maxsize=100000, fields=None):
+        """
+        Share equal processed field values between the parsed entries to save memory.
+
+        The values are kept in a pool of bounded size that evicts the least recently used values. The statistics of
+        the pool are available with get_interning_statistics.
+
+        :param maxsize: maximal number of values kept in the pool
+        :type maxsize: int
+        :param fields: fields whose values should be shared (default: all fields), e.g. ['journal', 'publisher', 'author']
+        :type fields: list or set
+        """
+        self.intern_pool = InternPool(maxsize)
+        self.intern_fields = None if fields is None else set(fields)
+        self.invalidate_field_pipelines()
+
+    def disable_interning(self):
+        self.intern_pool = None
+        self.intern_fields = None
+        self.invalidate_field_pipelines()
+
+    def get_interning_statistics(self):
+        """
+        Returns hits, misses, evictions, size, maxsize, hit_rate and saved_bytes of the interning pool
+
+        :rtype: dict or None if interning is not enabled
+        """
+        if self.intern_pool is None:
+            return None
+        return self.intern_pool.statistics()
+
+    def enable_field_cache(self, maxsize=10000, fields=None):
+        """
+        Cache the processed fields, such that repeated values (e.g. journal names) are only processed once.
+
+        The cache is keyed by the processed key and the raw field, evicts the least recently used fields if it is
+        full and is cleared whenever the settings change. Its statistics are available with
+        get_field_cache_statistics.
+
+        :param maxsize: maximal number of cached fields
+        :type maxsize: int
+        :param fields: fields that should be cached (default: all fields), e.g. ['journal', 'publisher', 'month']
+        :type fields: list or set
+        """
+        self.field_cache = LRUCache(maxsize)
+        self.field_cache_fields = None if fields is None else set(fields)
+
+    def disable_field_cache(self):
+        self.field_cache = None
+        self.field_cache_fields = None
+
+    def get_field_cache_statistics(self):
+        """
+        Returns hits, misses, evictions, size, maxsize and hit_rate of the field cache
+
+        :rtype: dict or None if the cache is not enabled
+        """
+        if self.field_cache is None:
+            return None
+        return self.field_cache.statistics()
+
+    def enable_timing(self):
+        """
+        Count the calls and the time of the processing stages: the tokenizer, the latex decoding, the upper case
+        unprotection, the splitting of the authors, the lookup of the fields stored as integer (e.g. month), the
+        custom stages and the interning, in total and per field key. The statistics are available with
+        get_timing_statistics.
+
+        Fields returned from the field cache are not processed and hence not timed. The parsers of the worker
+        processes of parse_many are not timed.
+        """
+        self.timer = BibTimer()
+        self.invalidate_field_pipelines()
+
+    def disable_timing(self):
+        self.timer = None
+        self.invalidate_field_pipelines()
+
+    def get_timing_statistics(self):
+        """
+        Returns the calls and nanoseconds of the processing stages, see :meth:`BibTimer.as_dict`
+
+        :rtype: dict or None if timing is not enabled
+        """
+        if self.timer is None:
+            return None
+        return self.timer.as_dict()
+
     def _process_entry_type(self,entry_type):
         """ Processes a bibtex entry type. This makes it lower case. 
         :param key: a entry type
@@ -106,6 +433,8 @@ class BibTexParser(object):
         :returns: string
         """
         entry_type = entry_type.lower()
+        if self.intern_pool is not None:
+            entry_type = self.intern_pool.intern(entry_type)
         return entry_type
 
     
@@ -119,94 +448,153 @@ class BibTexParser(object):
         if key in self.entry_key_replacements:
             key = self.entry_key_replacements[key]
 
-        logger.debug("Key processed: " + key)
+        logger.debug("Key processed: %s", key)
         return key
 
-    def _get_index_of_closing_bracket(self, text, start):
-        if text[start] == '[':
-            opening_character = "["
-            closing_character = "]"
-        elif text[start] == '{':
-            opening_character = "{"
-            closing_character = "}"
-        elif text[start] == '(':
-            opening_character = "("
-            closing_character =")"
-        else:
-            return None
-        d = 0
-        for idx, character in enumerate(text[start:]):
-            if character == opening_character:
-                d = d+1
-            elif character == closing_character:
-                d = d -1
-            if d == 0:
-                return idx+start
-        return start
-                
     # this function processes the field of a given key.
     def _get_processed_field(self,key,field):
+        return self._process_field(key, self._get_field_pipeline(key), field)
 
+    def _process_field(self, key, pipeline, field):
         if not field or field == "{}":
-            logger.debug(f'field is empty')
             field = ''
 
-        logger.debug("Start field processing: " + field)
-        processed_field=field.strip()
-        
-        # if (processed_field.startswith('{') and self._get_index_of_closing_bracket(processed_field,0) == len(processed_field)-1):
-        #     processed_field = processed_field[1:len(processed_field)-1]
-        #     logger.debug("Found brackets to strip: " + processed_field)
-
-        # while (processed_field.startswith('"') and processed_field.endswith('"')):
-        #     processed_field = processed_field[1:len(processed_field)-1]
-        #     logger.debug("Found brackets to strip: " + processed_field)
-            
-        # processed_field = processed_field.strip()
-
-        if key in BibDefinitions.contains_latex_expressions:
-            processed_field = BibDefinitions.latex_to_string(processed_field)
-            logger.debug("Transformed latex to string: " + processed_field)
-            
-        if key in BibDefinitions.protect_upper_case_fields:
-            processed_field = BibDefinitions.unprotect_upper_case(processed_field)
-            logger.debug("Unprotect upper case: " + processed_field)
+        field_cache = self.field_cache
+        if field_cache is None or (self.field_cache_fields is not None and key not in self.field_cache_fields):
+            return self._run_field_pipeline(pipeline, field)
+
+        processed_field = field_cache.get((key, field), _MISSING)
+        if processed_field is _MISSING:
+            processed_field = self._run_field_pipeline(pipeline, field)
+            field_cache.put((key, field), processed_field)
+        if type(processed_field) is list:
+            # lists are mutable, every entry gets its own
+            return list(processed_field)
+        return processed_field
+
+    def _run_field_pipeline(self, pipeline, field):
+        processed_field = field.strip()
+        for stage in pipeline:
+            processed_field = stage(processed_field)
+        return processed_field
+
+    def add_field_processing_stage(self, keys, stage, first=False):
+        """
+        Registers a custom stage that processes the fields of the given keys after (or before) the built-in stages.
+
+        :param keys: processed keys whose fields the stage is applied to, None for all keys
+        :type keys: string, list or None
+        :param stage: function taking the field and returning the processed field
+        :type stage: callable
+        :param first: whether the stage is applied before the built-in stages
+        :type first: bool
+        """
+        if keys is None or type(keys) is str:
+            keys = [keys]
+        for key in keys:
+            self.custom_field_stages.setdefault(key, []).append((stage, first))
+        self.invalidate_field_pipelines()
+
+    def clear_field_processing_stages(self):
+        """ removes all custom processing stages
+        """
+        self.custom_field_stages = dict()
+        self.invalidate_field_pipelines()
 
+    def invalidate_field_pipelines(self):
+        """
+        Discards the compiled field pipelines. This is done automatically if the settings of the parser or of
+        :class:`BibDefinitions` change.
+        """
+        self._field_pipelines = dict()
+        # the config the pipelines are compiled for
+        self._pipelines_config = self.get_config()
+        # the cached fields were processed by the old pipelines
+        if getattr(self, 'field_cache', None) is not None:
+            self.field_cache.clear()
+
+    def _get_field_pipeline(self, key):
+        """
+        Returns the tuple of stages processing the fields of key.
+        """
+        if self._pipelines_config is not self.get_config():
+            self.invalidate_field_pipelines()
+        pipeline = self._field_pipelines.get(key)
+        if pipeline is None:
+            pipeline = self._compile_field_pipeline(key)
+            self._field_pipelines[key] = pipeline
+        return pipeline
+
+    def _compile_field_pipeline(self, key):
+        custom_stages = self.custom_field_stages.get(None, []) + self.custom_field_stages.get(key, [])
+        # (name, stage) in the order they are applied
+        stages = [(_stage_name(stage), stage) for stage, first in custom_stages if first]
+
+        config = self._pipelines_config
+        if key in config.contains_latex_expressions:
+            stages.append(('latex_to_string', config.latex_to_string))
+        if key in config.protect_upper_case_fields:
+            stages.append(('unprotect_upper_case', config.unprotect_upper_case))
         if key == "author":
-            processed_field = self._process_authors(processed_field)
+            stages.append(('authors', self._process_authors))
+        if key in config.not_stored_as_string:
+            stages.append(('stored_as_integer', self._compile_string_field_stage(key)))
 
-        if key in BibDefinitions.not_stored_as_string:
-            processed_field = self._process_string_field(key,processed_field)
-            logger.debug("Process non-string fields:" + str(processed_field))
+        stages.extend((_stage_name(stage), stage) for stage, first in custom_stages if not first)
 
-        return processed_field
+        if self.intern_pool is not None and (self.intern_fields is None or key in self.intern_fields):
+            stages.append(('intern', self.intern_pool.intern))
+        if self.timer is not None:
+            return tuple(self.timer.timed(name, key, stage) for name, stage in stages)
+        return tuple(stage for name, stage in stages)
 
     def _process_authors(self,field):
-        fields = field.split(' and ')
-        processed_authors = list()
-        concatenate_entry = None
-        for idx,entry in enumerate(fields):
-            entry = entry.strip()
-            if concatenate_entry is not None:
-                if entry.endswith('}'):
-                    entry = " and ".join([concatenate_entry,entry[:-1]])
-                    concatenate_entry = None
-                else:
-                    concatenate_entry = " and ".join([concatenate_entry,entry])
-            elif entry.startswith('{') and self._get_index_of_closing_bracket(entry,0) == 0:
-                concatenate_entry = entry[1:]
-            elif (entry.startswith('{') and self._get_index_of_closing_bracket(entry,0) == len(entry)-1):
-                entry = entry[1:-1]
-                
-            if concatenate_entry is None:
-                processed_authors.append(entry.strip())
-        return processed_authors
-    
+        """ splits the authors and parses the parts of every name (see :class:`BibName`)
+        """
+        name_cache = self.name_cache
+        return [parse_name(name, name_cache) for name in split_names(field)]
+
     def set_entry_field(self,bibentry,key,text):
         processed_key = self._process_key(key)
         bibentry[processed_key] = self._get_processed_field(processed_key,text)
         return  bibentry    
 
+    def set_entry_fields(self, bibentries, updates):
+        """
+        Sets fields of several entries, the batched form of set_entry_field.
+
+        The key replacements and the processing pipeline are resolved once per key and then applied to the fields of
+        all entries.
+
+        :param bibentries: the entries to be changed
+        :type bibentries: iterable of dict
+        :param updates: one dictionary from the key to the text per entry, or a single dictionary setting the same
+            fields of every entry
+        :type updates: list of dict or dict
+        :returns: the changed entries
+        :rtype: list of dict
+        """
+        bibentries = list(bibentries)
+        if isinstance(updates, dict):
+            updates = [updates] * len(bibentries)
+        else:
+            updates = list(updates)
+            if len(updates) != len(bibentries):
+                raise ValueError("There must be one update per entry.")
+
+        # the processed key and the pipeline of every key
+        resolved = dict()
+        for bibentry, update in zip(bibentries, updates):
+            for key, text in update.items():
+                try:
+                    processed_key, pipeline = resolved[key]
+                except KeyError:
+                    processed_key = self._process_key(key)
+                    pipeline = self._get_field_pipeline(processed_key)
+                    resolved[key] = (processed_key, pipeline)
+                bibentry[processed_key] = self._process_field(processed_key, pipeline, text)
+        return bibentries
+
     # preprocess special fields that are internally not stored as a string
     def _process_string_field(self, key, field):
         """ processes a string field, this field is internally not stored as a string but an int
@@ -214,26 +602,33 @@ class BibTexParser(object):
         :type field: string 
         :returns: integer / string
         """
-        if field == '':
-            return 0
-        if type(field) is str:
-            try:
-                return getattr(BibDefinitions,'recognised_'+ key)[field.lower()]
-        
-            except KeyError:
-                getattr(BibDefinitions, 'non_recognised_'+key).add(field.lower())
-                logger.error(f'For the key {key}, the field {field} is not recognised')
-                return field
-            
-        elif type(field) is list:
-            processed_field = list()
-            for entry in field:
+        return self._compile_string_field_stage(key)(field)
+
+    def _compile_string_field_stage(self, key):
+        recognised = self.get_config().get_recognised(key)
+        non_recognised = self.get_non_recognised_string_fields(key)
+
+        def process_string_field(field):
+            if field == '':
+                return 0
+            if type(field) is str:
                 try:
-                    processed_field.append(getattr(BibDefinitions,'recognised_'+ key)[entry.lower()])
+                    return recognised[field.lower()]
                 except KeyError:
-                    getattr(BibDefinitions, 'non_recognised_'+key).add(entry.lower())
-                    processed_field.append(entry)
-            return processed_field
+                    non_recognised.add(field.lower())
+                    logger.error('For the key %s, the field %s is not recognised', key, field)
+                    return field
+
+            elif type(field) is list:
+                processed_field = list()
+                for entry in field:
+                    try:
+                        processed_field.append(recognised[entry.lower()])
+                    except KeyError:
+                        non_recognised.add(entry.lower())
+                        processed_field.append(entry)
+                return processed_field
+        return process_string_field
 
     #
     def clear_all_key_replacements(self):
@@ -271,3 +666,38 @@ class BibTexParser(object):
 
     def overwrite_key_replacements(self,new_dict):
         self.entry_key_replacements = new_dict
+
+
+# Parser used in the worker processes of BibTexParser.parse_many
+_worker_parser = None
+
+def _init_worker(parser_class, entry_factory, config, entry_key_replacements):
+    global _worker_parser
+    _worker_parser = parser_class(entry_factory=entry_factory, config=config)
+    _worker_parser.overwrite_key_replacements(entry_key_replacements)
+
+def _parse_batch(batch):
+    fields = _worker_parser.get_config().not_stored_as_string
+    for field in fields:
+        _worker_parser.get_non_recognised_string_fields(field).clear()
+    entries = [_worker_parser.parse(bibstring) for bibstring in batch]
+    non_recognised = dict((field, _worker_parser.get_non_recognised_string_fields(field)) for field in fields)
+    return entries, non_recognised
+
+def _collect_batch(parser, future):
+    entries, non_recognised = future.result()
+    # report the non recognised fields of the workers in the main process
+    _merge_non_recognised(parser, non_recognised)
+    return (entry for entry in entries if entry is not None)
+
+def _merge_non_recognised(parser, non_recognised):
+    fields = parser.get_config().not_stored_as_string
+    for field, values in non_recognised.items():
+        if field in fields:
+            parser.get_non_recognised_string_fields(field).update(values)
+
+def _stage_name(stage):
+    return 'custom:' + getattr(stage, '__name__', type(stage).__name__)
+
+def _qualified_name(function):
+    return getattr(function, '__module__', '') + '.' + getattr(function, '__qualname__', repr(function))
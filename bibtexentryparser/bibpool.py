@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Sonja Stuedli
+
+from collections import deque
+from contextlib import contextmanager
+
+from bibtexentryparser.bibDefinitions import BibDefinitions
+from bibtexentryparser.bibparser import BibTexParser
+from bibtexentryparser.bibwriter import BibTexWriter
+
+__all__ = ['BibPool', 'default_parsers', 'default_writers']
+
+
+class BibPool(object):
+    """
+    A pool of reusable parsers or writers created by a factory.
+
+    Creating a parser or writer and compiling its pipelines is expensive compared to parsing or writing a single
+    field. A pool keeps the instances between calls, such that repeated calls only pay this cost once. Every
+    instance is used by one caller at a time, so a pool can be shared by threads. The pooled instances are discarded
+    when the global settings of :class:`BibDefinitions` change, such that the factory is called with the new settings.
+
+    Usage: with pool.acquire() as parser: parser.parse(bibstring)
+
+    """
+
+    def __init__(self, factory, maxsize=16):
+        """
+        :param factory: callable without arguments creating a configured parser or writer
+        :type factory: callable
+        :param maxsize: maximal number of idle instances kept
+        :type maxsize: int
+        """
+        self.factory = factory
+        self.maxsize = maxsize
+        self._idle = deque()
+        self._version = BibDefinitions.get_version()
+
+    def __len__(self):
+        return len(self._idle)
+
+    @contextmanager
+    def acquire(self):
+        """
+        Returns a context manager lending an instance of the pool
+        """
+        instance = self.get()
+        try:
+            yield instance
+        finally:
+            self.release(instance)
+
+    def get(self):
+        """
+        Takes an instance from the pool or creates a new one, return it with release
+
+        :returns: parser or writer
+        """
+        if self._version != BibDefinitions.get_version():
+            self.clear()
+        try:
+            return self._idle.pop()
+        except IndexError:
+            return self.factory()
+
+    def release(self, instance):
+        """
+        Returns an instance taken with get to the pool
+        """
+        if self._version == BibDefinitions.get_version() and len(self._idle) < self.maxsize:
+            self._idle.append(instance)
+
+    def clear(self):
+        """
+        Discards all idle instances, call this after changing a setting the factory depends on
+        """
+        self._version = BibDefinitions.get_version()
+        self._idle.clear()
+
+
+# pools of the default instances used by the functions of the package
+default_parsers = BibPool(BibTexParser)
+default_writers = BibPool(BibTexWriter)
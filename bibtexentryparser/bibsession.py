@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Sonja Stuedli
+
+import hashlib
+import logging
+from collections import namedtuple
+
+from bibtexentryparser.bibparser import BibTexParser
+from bibtexentryparser.bibtokenizer import iter_entry_spans
+
+logger = logging.getLogger(__name__)
+
+__all__ = ['BibSession', 'BibDelta']
+
+# Changes between two versions of a file: dictionaries from ID to the new entries (added, changed) or the old entries
+# (removed)
+BibDelta = namedtuple('BibDelta', ['added', 'changed', 'removed'])
+
+
+class BibSession(object):
+    """
+    Incremental parsing of a BibTeX file that is edited and parsed again.
+
+    The session remembers a content hash of every entry of the previous version. When it is given the new contents
+    of the file, the entries are located by a fast boundary scan and only added or changed entries are parsed. All
+    entries are parsed again when the settings fingerprint of the parser has changed.
+
+    """
+
+    def __init__(self, parser=None):
+        """
+        Creates an empty session
+
+        :param parser: custom parser to use (optional)
+        :type parser: BibTexParser
+        """
+        self.parser = BibTexParser() if parser is None else parser
+        self.reset()
+
+    def reset(self):
+        """
+        Forgets the previous version, such that the next update parses all entries. Call this after changing
+        settings of the parser that are not part of its settings fingerprint, e.g. the code of a custom field stage.
+        """
+        # parsed entries of the current version by ID in the order of the file
+        self.entries = dict()
+        self._hashes = dict()
+        self._fingerprint = None
+
+    def update(self, text):
+        """
+        Updates the session to the new contents of the file
+
+        :param text: the complete new contents of the file
+        :type text: str
+        :returns: the added, changed and removed entries
+        :rtype: BibDelta
+        """
+        # a change of the settings of the parser, e.g. of the global definitions, changes all parsed entries
+        fingerprint = self.parser.get_settings_fingerprint()
+        reparse = self._fingerprint != fingerprint
+        self._fingerprint = fingerprint
+
+        entries = dict()
+        hashes = dict()
+        added = dict()
+        changed = dict()
+        for start, end, id_start, id_end in iter_entry_spans(text):
+            entry_id = text[id_start:id_end]
+            if entry_id in hashes:
+                logger.warning("Duplicate entry ID " + entry_id + ", only the first entry is used.")
+                continue
+            bibstring = text[start:end]
+            digest = _hash(bibstring)
+            if not reparse and self._hashes.get(entry_id) == digest:
+                entries[entry_id] = self.entries[entry_id]
+                hashes[entry_id] = digest
+                continue
+
+            entry = self.parser.parse(bibstring)
+            if entry is None:
+                continue
+            entries[entry_id] = entry
+            hashes[entry_id] = digest
+            if entry_id in self.entries:
+                changed[entry_id] = entry
+            else:
+                added[entry_id] = entry
+
+        removed = dict((entry_id, entry) for entry_id, entry in self.entries.items() if entry_id not in entries)
+        self.entries = entries
+        self._hashes = hashes
+        return BibDelta(added, changed, removed)
+
+    def update_file(self, path, encoding='utf-8'):
+        """
+        Updates the session to the current contents of a file
+
+        :param path: path to the file
+        :type path: str
+        :param encoding: encoding of the file
+        :type encoding: str
+        :returns: the added, changed and removed entries
+        :rtype: BibDelta
+        """
+        with open(path, encoding=encoding) as bib_file:
+            return self.update(bib_file.read())
+
+
+def _hash(bibstring):
+    return hashlib.blake2b(bibstring.encode('utf-8', errors='surrogatepass'), digest_size=16).digest()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Sonja Stuedli
+
+import re
+import json
+import math
+import logging
+
+from bibtexentryparser.bibconfig import BibConfig
+
+logger = logging.getLogger(__name__)
+
+__all__ = ['BibTextIndex']
+
+# version of the index file format, increase if the format changes
+INDEX_VERSION = 1
+
+_token_re = re.compile(r'\w+')
+_phrase_re = re.compile(r'"([^"]*)"')
+# removes the braces protecting the case of letters, e.g. {M}arkov
+_braces_table = str.maketrans('', '', '{}')
+
+
+class BibTextIndex(object):
+    """
+    A full-text inverted index over text fields (e.g. title and abstract) of parsed entries.
+
+    The fields are decoded with the LaTeX conversion of the configuration (or else of the global settings), case folded and split into words. For every word the
+    index stores the positions of the word in every entry, such that phrases can be found without reading the entries.
+    Queries are ranked with BM25. The index is updated incrementally and can be stored in a file.
+
+    """
+
+    # BM25 parameters
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, entries=None, fields=('title', 'abstract'), config=None):
+        """
+        Creates an index
+
+        :param entries: parsed entries added to the index (optional)
+        :type entries: iterable of dict
+        :param fields: the indexed fields
+        :type fields: tuple
+        :param config: the settings the entries have been parsed with (default: the global settings)
+        :type config: BibConfig
+        """
+        self.fields = tuple(fields)
+        self.config = config
+        # term -> {ID: [positions]}
+        self._postings = dict()
+        # ID -> number of words
+        self._lengths = dict()
+        # ID -> the distinct words, to remove an entry without visiting all postings
+        self._entry_terms = dict()
+        self._total_length = 0
+        if entries is not None:
+            for entry in entries:
+                self.add(entry)
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def __contains__(self, entry_id):
+        return entry_id in self._lengths
+
+    def get_config(self):
+        """
+        Returns the settings used for decoding: the config of the index or else the current global settings
+
+        :rtype: BibConfig
+        """
+        if self.config is not None:
+            return self.config
+        return BibConfig.from_definitions()
+
+    def tokenize(self, text):
+        """
+        Splits a text into case folded words
+
+        :param text: the text
+        :type text: str
+        :returns: the words
+        :rtype: list
+        """
+        return _token_re.findall(self.get_config().latex_to_string(text).translate(_braces_table).casefold())
+
+    def add(self, entry):
+        """
+        Adds an entry to the index, an entry with the same ID is replaced
+
+        :param entry: the parsed entry
+        :type entry: dict
+        """
+        entry_id = entry['ID']
+        if entry_id in self._lengths:
+            self.remove(entry_id)
+
+        position = 0
+        length = 0
+        entry_terms = set()
+        for field in self.fields:
+            text = entry.get(field)
+            if not isinstance(text, str):
+                continue
+            terms = self.tokenize(text)
+            for term in terms:
+                self._postings.setdefault(term, dict()).setdefault(entry_id, []).append(position)
+                position += 1
+            # a gap between the fields, such that phrases do not span fields
+            position += 1
+            length += len(terms)
+            entry_terms.update(terms)
+        self._lengths[entry_id] = length
+        self._entry_terms[entry_id] = entry_terms
+        self._total_length += length
+
+    def remove(self, entry_id):
+        """
+        Removes an entry from the index
+
+        :param entry_id: the ID of the entry
+        :type entry_id: str
+        """
+        self._total_length -= self._lengths.pop(entry_id)
+        for term in self._entry_terms.pop(entry_id):
+            postings = self._postings[term]
+            del postings[entry_id]
+            if not postings:
+                del self._postings[term]
+
+    def find_phrase(self, phrase):
+        """
+        Returns the IDs of the entries containing the words of phrase in order
+
+        :param phrase: the phrase
+        :type phrase: str
+        :returns: the IDs of the matching entries
+        :rtype: set
+        """
+        terms = self.tokenize(phrase)
+        if not terms:
+            return set()
+        postings = [self._postings.get(term) for term in terms]
+        if any(posting is None for posting in postings):
+            return set()
+        candidates = set(min(postings, key=len))
+        for posting in postings:
+            candidates.intersection_update(posting)
+        if len(terms) == 1:
+            return candidates
+
+        matches = set()
+        for entry_id in candidates:
+            following = [set(posting[entry_id]) for posting in postings[1:]]
+            for start in postings[0][entry_id]:
+                if all(start + offset in positions for offset, positions in enumerate(following, 1)):
+                    matches.add(entry_id)
+                    break
+        return matches
+
+    def search(self, query, limit=10):
+        """
+        Returns the entries best matching the query
+
+        Entries containing any word of the query are ranked with BM25. Phrases in double quotes must be contained in
+        the matching entries.
+
+        :param query: the query, e.g. 'control "markov chain"'
+        :type query: str
+        :param limit: maximal number of results (None for all)
+        :type limit: int
+        :returns: (ID, score) of the matching entries with the highest score first
+        :rtype: list of tuples
+        """
+        required = None
+        for phrase in _phrase_re.findall(query):
+            matches = self.find_phrase(phrase)
+            required = matches if required is None else required & matches
+        terms = self.tokenize(query.replace('"', ' '))
+
+        scores = dict()
+        number_of_entries = len(self._lengths)
+        average_length = self._total_length / number_of_entries if number_of_entries else 0.0
+        for term in set(terms):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            idf = math.log(1.0 + (number_of_entries - len(postings) + 0.5) / (len(postings) + 0.5))
+            for entry_id, positions in postings.items():
+                if required is not None and entry_id not in required:
+                    continue
+                frequency = len(positions)
+                normalisation = self.k1 * (1.0 - self.b + self.b * self._lengths[entry_id] / average_length)
+                score = idf * frequency * (self.k1 + 1.0) / (frequency + normalisation)
+                scores[entry_id] = scores.get(entry_id, 0.0) + score
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked if limit is None else ranked[:limit]
+
+    def save(self, path):
+        """
+        Stores the index in a file
+
+        :param path: path of the index file
+        :type path: str
+        """
+        data = {
+            'version': INDEX_VERSION,
+            'settings': self.get_config().get_fingerprint(),
+            'fields': list(self.fields),
+            'lengths': self._lengths,
+            'postings': self._postings,
+        }
+        with open(path, 'w', encoding='utf-8') as index_file:
+            json.dump(data, index_file, ensure_ascii=False, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path, config=None):
+        """
+        Loads an index stored with save
+
+        :param path: path of the index file
+        :type path: str
+        :param config: the settings of the index (default: the global settings)
+        :type config: BibConfig
+        :returns: the index
+        :rtype: BibTextIndex
+        """
+        with open(path, encoding='utf-8') as index_file:
+            data = json.load(index_file)
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError("Unsupported text index version in " + path)
+        index = cls(fields=data['fields'], config=config)
+        if data['settings'] != index.get_config().get_fingerprint():
+            logger.warning("The text index " + path + " was built with different settings.")
+        index._lengths = data['lengths']
+        index._total_length = sum(index._lengths.values())
+        index._postings = data['postings']
+        index._entry_terms = dict((entry_id, set()) for entry_id in index._lengths)
+        for term, postings in index._postings.items():
+            for entry_id in postings:
+                index._entry_terms[entry_id].add(term)
+        return index
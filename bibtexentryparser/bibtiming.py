@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Sonja Stuedli
+
+import time
+
+__all__ = ['BibTimer']
+
+
+class BibTimer(object):
+    """
+    Counts the calls of the processing stages of a parser or writer and their cumulative time in nanoseconds, in
+    total and per field key.
+
+    The timer does not slow down a parser or writer by itself: stages are only wrapped by :meth:`timed` when timing
+    is enabled (see BibTexParser.enable_timing and BibTexWriter.enable_timing), otherwise the compiled pipelines run
+    unchanged. The timed time of a stage includes the small overhead of the timing itself.
+
+    """
+
+    def __init__(self):
+        # (stage, key) to [calls, nanoseconds], the lists are shared with the timed functions
+        self._counters = dict()
+
+    def _get_counter(self, stage, key):
+        counter = self._counters.get((stage, key))
+        if counter is None:
+            counter = self._counters[(stage, key)] = [0, 0]
+        return counter
+
+    def timed(self, stage, key, function):
+        """
+        Returns function wrapped such that its calls are counted and timed
+
+        :param stage: name of the stage, e.g. 'latex_to_string'
+        :type stage: str
+        :param key: the field key the function processes or None if it is not specific to a field
+        :type key: str or None
+        :param function: function of a single argument
+        :type function: callable
+        :rtype: callable
+        """
+        counter = self._get_counter(stage, key)
+        clock = time.perf_counter_ns
+
+        def timed_function(value):
+            start = clock()
+            try:
+                return function(value)
+            finally:
+                counter[0] += 1
+                counter[1] += clock() - start
+        return timed_function
+
+    def timed_iterator(self, stage, iterator):
+        """
+        Iterates over iterator and times the production of its items, counting one call per iteration
+        """
+        counter = self._get_counter(stage, None)
+        clock = time.perf_counter_ns
+        counter[0] += 1
+        iterator = iter(iterator)
+        while True:
+            start = clock()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                counter[1] += clock() - start
+                return
+            counter[1] += clock() - start
+            yield item
+
+    def add(self, stage, nanoseconds, key=None, calls=1):
+        """
+        Adds calls of a stage timed by the caller
+        """
+        counter = self._get_counter(stage, key)
+        counter[0] += calls
+        counter[1] += nanoseconds
+
+    def reset(self):
+        """
+        Sets all counters to zero
+        """
+        for counter in self._counters.values():
+            counter[0] = 0
+            counter[1] = 0
+
+    def as_dict(self):
+        """
+        Returns the counters as a dictionary, e.g.
+        {'stages': {'latex_to_string': {'calls': 2, 'ns': 5000}},
+         'fields': {'title': {'latex_to_string': {'calls': 1, 'ns': 3000}}}}
+
+        'stages' contains the totals of every stage and 'fields' the stages of every field key.
+
+        :rtype: dict
+        """
+        stages = dict()
+        fields = dict()
+        for (stage, key), (calls, nanoseconds) in sorted(self._counters.items(), key=lambda item: (item[0][0], str(item[0][1]))):
+            total = stages.setdefault(stage, {'calls': 0, 'ns': 0})
+            total['calls'] += calls
+            total['ns'] += nanoseconds
+            if key is not None:
+                fields.setdefault(key, dict())[stage] = {'calls': calls, 'ns': nanoseconds}
+        return {'stages': stages, 'fields': fields}
@@ -0,0 +1,486 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Sonja Stuedli
+
+import re
+import codecs
+import logging
+from collections import namedtuple
+
+log = logging.getLogger(__name__)
+
+__all__ = ['Token', 'tokenize', 'find_entry', 'iter_entry_strings', 'iter_entry_spans', 'EntrySplitter', 'ENTRYTYPE', 'ID', 'KEY', 'VALUE', 'END']
+
+# Token kinds emitted by the tokenizer
+ENTRYTYPE = 'ENTRYTYPE'
+ID = 'ID'
+KEY = 'KEY'
+VALUE = 'VALUE'
+END = 'END'
+
+# A token is a kind together with the span [start, end) in the scanned text.
+# For VALUE tokens the span excludes one layer of enclosing delimiters.
+Token = namedtuple('Token', ['kind', 'start', 'end'])
+
+# The scanner works on str as well as on bytes-like objects (e.g. bytes or mmap). All patterns and characters it
+# needs are therefore kept in one syntax table per type.
+_Syntax = namedtuple('_Syntax', ['at', 'comma', 'quote', 'opening_brace', 'closing_brace', 'closing_character',
+                                 'entry_type_re', 'entry_id_re', 'key_re', 'separator_re', 'whitespace_re',
+                                 'brace_re', 'quote_re', 'bare_value_re', 'line_start_at_re', 'parenthesis_re',
+                                 'block_types'])
+
+
+def _compile_syntax(encode):
+    return _Syntax(
+        at=encode('@'),
+        comma=encode(','),
+        quote=encode('"'),
+        opening_brace=encode('{'),
+        closing_brace=encode('}'),
+        closing_character={encode('{'): encode('}'), encode('('): encode(')')},
+        entry_type_re=re.compile(encode(r'\s*([^\s{(]+)\s*([{(])')),
+        entry_id_re=re.compile(encode(r'\s*([^\s,{}()]*)\s*([,})])')),
+        key_re=re.compile(encode(r'[\s,]*([^\s=,{}"#()]+)\s*=\s*')),
+        separator_re=re.compile(encode(r'[\s,]*')),
+        whitespace_re=re.compile(encode(r'\s*')),
+        brace_re=re.compile(encode(r'[{}]')),
+        quote_re=re.compile(encode(r'[{}"]')),
+        bare_value_re={
+            encode('}'): re.compile(encode(r'[{},"]')),
+            encode(')'): re.compile(encode(r'[{},")]')),
+        },
+        line_start_at_re=re.compile(encode(r'\n[ \t]*(@)')),
+        parenthesis_re=re.compile(encode(r'[{})]')),
+        block_types=frozenset(encode(block_type) for block_type in ('comment', 'string', 'preamble')),
+    )
+
+_str_syntax = _compile_syntax(lambda string: string)
+_bytes_syntax = _compile_syntax(lambda string: string.encode('ascii'))
+
+
+def _get_syntax(text):
+    if isinstance(text, str):
+        return _str_syntax
+    return _bytes_syntax
+
+
+def tokenize(text, pos=0):
+    """
+    Tokenize the first BibTeX entry found in text at or after pos.
+
+    The scanner moves strictly forwards and keeps track of the brace depth and quotes, so the entry is processed in
+    a single pass and braces or commas nested in values do not end a field. The tokens are emitted in the order
+    ENTRYTYPE, ID, (KEY, VALUE)*, END. The END token is only emitted if the closing character of the entry was found,
+    i.e. a missing END token means the text ended before the entry was complete.
+
+    :param text: text containing a bibtex entry
+    :type text: str or bytes-like (e.g. bytes or mmap)
+    :param pos: position at which the search for the entry starts
+    :type pos: int
+    :returns: generator of `Token`
+    :raises ValueError: if no entry header can be decoded
+    """
+    syntax = _get_syntax(text)
+    start = text.find(syntax.at, pos)
+    if start < 0:
+        raise ValueError("No bibtex entry found")
+
+    match = syntax.entry_type_re.match(text, start + 1)
+    if match is None:
+        raise ValueError("Entry type could not be decoded")
+    yield Token(ENTRYTYPE, match.start(1), match.end(1))
+    closing_character = syntax.closing_character[match.group(2)]
+
+    match = syntax.entry_id_re.match(text, match.end())
+    if match is None:
+        raise ValueError("Entry id could not be decoded")
+    yield Token(ID, match.start(1), match.end(1))
+    if match.group(2) == closing_character:
+        yield Token(END, match.start(2), match.end(2))
+        return
+    pos = match.end()
+
+    length = len(text)
+    while True:
+        pos = syntax.separator_re.match(text, pos).end()
+        if pos >= length:
+            return
+        if text[pos:pos + 1] == closing_character:
+            yield Token(END, pos, pos + 1)
+            return
+
+        match = syntax.key_re.match(text, pos)
+        if match is None:
+            # not a key = value pair, skip it like a value without a key
+            pos = _scan_bare_value(text, pos, syntax, closing_character)[2]
+            continue
+        yield Token(KEY, match.start(1), match.end(1))
+
+        value_start, value_end, pos = _scan_value(text, match.end(), syntax, closing_character)
+        yield Token(VALUE, value_start, value_end)
+
+
+def _scan_value(text, pos, syntax, closing_character):
+    """
+    Scan the value starting at pos.
+
+    :returns: tuple (value_start, value_end, position after the value)
+    """
+    if pos >= len(text):
+        return pos, pos, pos
+
+    character = text[pos:pos + 1]
+    if character == syntax.opening_brace:
+        end = _find_closing_brace(text, pos, syntax)
+    elif character == syntax.quote:
+        end = _find_closing_quote(text, pos, syntax, closing_character)
+    else:
+        end = None
+
+    if end is not None:
+        after = syntax.whitespace_re.match(text, end + 1).end()
+        if after >= len(text) or text[after:after + 1] in (syntax.comma, closing_character):
+            return pos + 1, end, after
+
+    # a value without delimiters or a concatenation of several values
+    return _scan_bare_value(text, pos, syntax, closing_character)
+
+
+def _scan_bare_value(text, pos, syntax, closing_character):
+    """
+    Scan an undelimited value until a comma or the end of the entry at brace depth zero.
+
+    :returns: tuple (value_start, value_end, position after the value)
+    """
+    depth = 0
+    in_quotes = False
+    start = pos
+    for match in syntax.bare_value_re[closing_character].finditer(text, pos):
+        character = match.group()
+        if character == syntax.opening_brace:
+            depth += 1
+        elif character == syntax.closing_brace and depth > 0:
+            depth -= 1
+        elif character == syntax.quote:
+            if depth == 0:
+                in_quotes = not in_quotes
+        elif depth == 0 and not in_quotes:
+            # a comma or the closing character of the entry
+            end = match.start()
+            return start, _rstrip_position(text, start, end), end
+    end = len(text)
+    return start, _rstrip_position(text, start, end), end
+
+
+def _find_closing_brace(text, pos, syntax):
+    """
+    Returns the index of the brace closing the one at pos or None if the text ends first.
+    """
+    depth = 0
+    for match in syntax.brace_re.finditer(text, pos):
+        if match.group() == syntax.opening_brace:
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return match.start()
+    return None
+
+
+def _find_closing_quote(text, pos, syntax, closing_character):
+    """
+    Returns the index of the quote closing the one at pos or None if the text ends first.
+
+    A quote only closes the value if it is at brace depth zero and followed by a comma, the end of the entry or the end
+    of the text, such that quotes inside the value (e.g. St\\"{u}dli) are kept.
+    """
+    depth = 0
+    length = len(text)
+    for match in syntax.quote_re.finditer(text, pos + 1):
+        character = match.group()
+        if character == syntax.opening_brace:
+            depth += 1
+        elif character == syntax.closing_brace:
+            depth -= 1
+        elif depth <= 0:
+            after = syntax.whitespace_re.match(text, match.end()).end()
+            if after >= length or text[after:after + 1] in (syntax.comma, closing_character):
+                return match.start()
+    return None
+
+
+def _rstrip_position(text, start, end):
+    while end > start and text[end - 1:end].isspace():
+        end -= 1
+    return end
+
+
+def _find_block(text, start, syntax):
+    """
+    Returns the end of the @comment, @string or @preamble block at start, None if the block is not terminated or
+    False if there is no such block at start.
+
+    These blocks are not entries and are skipped when a text is split into entries.
+    """
+    header = syntax.entry_type_re.match(text, start + 1)
+    if header is None or header.group(1).lower() not in syntax.block_types:
+        return False
+    if header.group(2) == syntax.opening_brace:
+        end = _find_closing_brace(text, header.end() - 1, syntax)
+        return None if end is None else end + 1
+    depth = 0
+    for match in syntax.parenthesis_re.finditer(text, header.end()):
+        character = match.group()
+        if character == syntax.opening_brace:
+            depth += 1
+        elif character == syntax.closing_brace:
+            depth -= 1
+        elif depth <= 0:
+            return match.end()
+    return None
+
+
+def _find_resync_position(text, pos, syntax):
+    """
+    Returns the position of the next entry header at the start of a line after pos or None if there is none.
+
+    An entry whose braces are not balanced would otherwise swallow all following entries. Parsing continues at the
+    next line starting with a decodable header, e.g. @article{id, since such a line is hardly ever part of a value.
+    """
+    for match in syntax.line_start_at_re.finditer(text, pos):
+        header = syntax.entry_type_re.match(text, match.end())
+        if header is not None and syntax.entry_id_re.match(text, header.end()) is not None:
+            return match.start(1)
+    return None
+
+
+def find_entry(text, pos=0, match_braces=False):
+    """
+    Locate the first BibTeX entry found in text at or after pos.
+
+    :param text: text containing bibtex entries
+    :type text: str or bytes-like
+    :param pos: position at which the search for the entry starts
+    :type pos: int
+    :param match_braces: find the end of an entry delimited by braces at the brace closing the opening one instead
+        of tokenizing its fields, which is several times faster
+    :type match_braces: bool
+    :returns: None if there is no entry, else a tuple (start, end) where end is None if the entry is not complete
+    :rtype: tuple or None
+    :raises ValueError: if the entry header can not be decoded
+    """
+    syntax = _get_syntax(text)
+    start = text.find(syntax.at, pos)
+    if start < 0:
+        return None
+    if match_braces:
+        header = syntax.entry_type_re.match(text, start + 1)
+        entry_id = header and syntax.entry_id_re.match(text, header.end())
+        if not entry_id:
+            raise ValueError("Entry header could not be decoded")
+        return start, _find_entry_end(text, start, header, entry_id, syntax)
+    end = None
+    for token in tokenize(text, start):
+        if token.kind == END:
+            end = token.end
+    return start, end
+
+
+def _find_entry_end(text, start, header, entry_id, syntax):
+    """
+    Returns the end of the entry with the decoded header at start or None if the entry is not terminated. Entries
+    delimited by braces end at the brace closing the opening one, entries delimited by parentheses are tokenized.
+    """
+    if entry_id.group(2) == syntax.closing_character[header.group(2)]:
+        return entry_id.end()
+    if header.group(2) == syntax.opening_brace:
+        end = _find_closing_brace(text, header.end() - 1, syntax)
+        return None if end is None else end + 1
+    end = None
+    for token in tokenize(text, start):
+        if token.kind == END:
+            end = token.end
+    return end
+
+
+def iter_entry_strings(fileobj, chunk_size=65536, encoding='utf-8', match_braces=False):
+    """
+    Split a file containing several BibTeX entries into the strings of the single entries.
+
+    The file is read in chunks of chunk_size characters and only the part of the file that has not been split yet is
+    kept in memory, i.e. the memory needed is bounded by the chunk size and the longest entry. @comment, @string and
+    @preamble blocks are skipped.
+
+    :param fileobj: file-like object opened in text or binary mode or path to a file
+    :type fileobj: file or str
+    :param chunk_size: number of characters (or bytes) read at once
+    :type chunk_size: int
+    :param encoding: encoding used if the file is opened in binary mode
+    :type encoding: str
+    :param match_braces: find the ends of the entries by matching braces instead of tokenizing them, see find_entry
+    :type match_braces: bool
+    :returns: generator of str
+    """
+    if not hasattr(fileobj, 'read'):
+        with open(fileobj, encoding=encoding) as opened_file:
+            yield from iter_entry_strings(opened_file, chunk_size, encoding, match_braces)
+        return
+
+    splitter = EntrySplitter(encoding, match_braces)
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            yield from splitter.close()
+            return
+        yield from splitter.feed(chunk)
+
+
+class EntrySplitter(object):
+    """
+    Incremental splitting of a stream of chunks into the strings of the single entries, see iter_entry_strings.
+
+    Only the part of the stream that has not been split yet is kept.
+
+    """
+
+    def __init__(self, encoding='utf-8', match_braces=False):
+        """
+        :param encoding: encoding used for chunks of bytes
+        :type encoding: str
+        :param match_braces: find the ends of the entries by matching braces instead of tokenizing them, see find_entry
+        :type match_braces: bool
+        """
+        self.encoding = encoding
+        self.match_braces = match_braces
+        self._decoder = None
+        self._buffer = ''
+
+    def feed(self, chunk):
+        """
+        Adds the next chunk of the stream
+
+        :param chunk: the next part of the stream
+        :type chunk: str or bytes
+        :returns: the entries completed by the chunk
+        :rtype: list of str
+        """
+        if isinstance(chunk, bytes):
+            if self._decoder is None:
+                self._decoder = codecs.getincrementaldecoder(self.encoding)(errors='replace')
+            chunk = self._decoder.decode(chunk)
+        self._buffer += chunk
+        return self._split(False)
+
+    def close(self):
+        """
+        Marks the end of the stream
+
+        :returns: the remaining entries, the last entry is passed on as it is if it is not terminated
+        :rtype: list of str
+        """
+        if self._decoder is not None:
+            self._buffer += self._decoder.decode(b'', final=True)
+        return self._split(True)
+
+    def _split(self, eof):
+        buffer = self._buffer
+        entries = list()
+        pos = 0
+        while True:
+            start = buffer.find('@', pos)
+            end = _find_block(buffer, start, _str_syntax) if start >= 0 else False
+            if end is not False:
+                if end is None:
+                    resync = _find_resync_position(buffer, start + 1, _str_syntax)
+                    if resync is None and not eof:
+                        # wait for the end of the block
+                        pos = start
+                        break
+                    log.warning("Skipping block that is not terminated: " + buffer[start:start + 80])
+                    pos = len(buffer) if resync is None else resync
+                    continue
+                log.debug("Skipping block: " + buffer[start:start + 80])
+                pos = end
+                continue
+            try:
+                location = find_entry(buffer, pos, self.match_braces)
+            except ValueError:
+                # the header is broken or not complete yet
+                start = buffer.find('@', pos)
+                if not eof and buffer.find('@', start + 1) < 0:
+                    break
+                log.warning("Skipping entry that can not be decoded: " + buffer[start:start + 80])
+                pos = start + 1
+                continue
+            if location is None:
+                pos = len(buffer)
+                break
+            start, end = location
+            if end is None:
+                resync = _find_resync_position(buffer, start + 1, _str_syntax)
+                if resync is not None:
+                    log.warning("Skipping entry that is not terminated before the next entry: " + buffer[start:start + 80])
+                    pos = resync
+                    continue
+                if eof:
+                    # the last entry is not terminated, pass it on as it is
+                    entries.append(buffer[start:])
+                    pos = len(buffer)
+                else:
+                    pos = start
+                break
+            entries.append(buffer[start:end])
+            pos = end
+        self._buffer = buffer[pos:]
+        return entries
+
+
+def iter_entry_spans(text, pos=0):
+    """
+    Fast scan for the boundaries and IDs of all BibTeX entries in text without tokenizing their fields.
+
+    Entries delimited by braces end at the brace closing the opening one, entries delimited by parentheses are
+    tokenized. @comment, @string and @preamble blocks are skipped. Entries whose header can not be decoded are skipped, as are entries that are not terminated before the
+    next line starting with an entry header. The last entry ends at the end of the text if it is not terminated.
+
+    :param text: text containing bibtex entries
+    :type text: str or bytes-like
+    :param pos: position at which the scan starts
+    :type pos: int
+    :returns: generator of tuples (start, end, id_start, id_end)
+    """
+    syntax = _get_syntax(text)
+    length = len(text)
+    while True:
+        start = text.find(syntax.at, pos)
+        if start < 0:
+            return
+        end = _find_block(text, start, syntax)
+        if end is not False:
+            if end is None:
+                resync = _find_resync_position(text, start + 1, syntax)
+                log.warning("Skipping block that is not terminated at position " + str(start))
+                if resync is None:
+                    return
+                pos = resync
+            else:
+                log.debug("Skipping block at position " + str(start))
+                pos = end
+            continue
+        header = syntax.entry_type_re.match(text, start + 1)
+        entry_id = header and syntax.entry_id_re.match(text, header.end())
+        if not entry_id:
+            log.warning("Skipping entry that can not be decoded at position " + str(start))
+            pos = start + 1
+            continue
+
+        end = _find_entry_end(text, start, header, entry_id, syntax)
+        if end is None:
+            resync = _find_resync_position(text, start + 1, syntax)
+            if resync is not None:
+                log.warning("Skipping entry that is not terminated before the next entry at position " + str(start))
+                pos = resync
+                continue
+            end = length
+        yield start, end, entry_id.start(1), entry_id.end(1)
+        pos = end
@@ -2,21 +2,42 @@
 # -*- coding: utf-8 -*-
 # Author: Francois Boulogne; Modified by Sonja Stuedli
 
+import io
 import re
+import time
+import asyncio
 import logging
-from bibtexentryparser.bibDefinitions import BibDefinitions
+from copy import copy
+from bibtexentryparser.bibconfig import BibConfig
+from bibtexentryparser.bibcache import LRUCache
+from bibtexentryparser.bibtiming import BibTimer
 
 logger = logging.getLogger(__name__)
 
 __all__ = ['BibTexWriter']
 
+# number of output plans cached per writer before the cache is cleared
+_MAX_OUTPUT_PLANS = 1024
+
+# marks a value missing from a cache
+_MISSING = object()
+
 class BibTexWriter(object):
     """
     A writer to convert a BibTex entry stored as dictionary to a formated bibtex entry string.
 
     """
 
-    def __init__(self):
+    def __init__(self, config=None):
+        """
+        Creates a writer
+
+        :param config: frozen settings used by this writer (default: the global settings of :class:`BibDefinitions`)
+        :type config: BibConfig
+        """
+        # explicit settings, see get_config
+        self.config = config
+
         # Character(s) for indenting BibTeX field-value pairs. Default: single space.
         self.indent = ""
 
@@ -39,17 +60,127 @@ class BibTexWriter(object):
         self.opening_field_character = ''
         self.closing_field_character = ''
 
+        # string written between two entries by write_to
+        self.entry_separator = ''
+
+        # optional cache of formatted field values, see enable_field_cache
+        self.field_cache = None
+        self.field_cache_fields = None
+
+        # optional timing of the formatting stages, see enable_timing
+        self.timer = None
+
         self.reset_to_default_settings()
-        
+        self.invalidate_output_plans()
+
     def is_writer(self):
         return True
 
+    def get_config(self):
+        """
+        Returns the settings used for writing: the config of the writer or else the current global settings
+
+        :rtype: BibConfig
+        """
+        if self.config is not None:
+            return self.config
+        return BibConfig.from_definitions()
+
+    def invalidate_output_plans(self):
+        """
+        Discards the cached output plans and field formatters. This is done automatically whenever a setting of the
+        writer changes, also in place (e.g. writer.display_order.append('title')), or when :class:`BibDefinitions`
+        changes.
+        """
+        self._output_plans = dict()
+        self._field_formatters = dict()
+        self._normal_formatters = dict()
+        # the config and the settings the plans are compiled for
+        self._plans_config = self.get_config()
+        self._plans_settings = self._get_settings_snapshot()
+        if self.field_cache is not None:
+            self.field_cache.clear()
+
+    def _get_settings(self):
+        """
+        Returns the settings the output plans depend on
+        """
+        return (self.indent, self.display_order, self.comma_first, self.do_not_display_fields,
+                self.do_only_display_fields, self.write_as_string_fields, self.opening_field_character,
+                self.closing_field_character, self.field_cache, self.field_cache_fields, self.timer)
+
+    def _get_settings_snapshot(self):
+        """
+        Returns a copy of the settings, such that also changes in place are noticed by comparing it with _get_settings
+        """
+        return tuple(copy(setting) if isinstance(setting, (list, set)) else setting for setting in self._get_settings())
+
+    def _check_output_plans(self):
+        """
+        Discards the output plans if the config or a setting changed since they were compiled
+        """
+        if self._plans_config is not self.get_config() or self._plans_settings != self._get_settings():
+            self.invalidate_output_plans()
+
+    def enable_field_cache(self, maxsize=10000, fields=None):
+        """
+        Cache the formatted field values, such that repeated values (e.g. journal names) are only formatted once.
+
+        The cache is keyed by the key and the value, evicts the least recently used values if it is full and is
+        cleared whenever the settings change. Its statistics are available with get_field_cache_statistics.
+
+        :param maxsize: maximal number of cached values
+        :type maxsize: int
+        :param fields: fields that should be cached (default: all fields), e.g. ['journal', 'publisher', 'month']
+        :type fields: list or set
+        """
+        self.field_cache_fields = None if fields is None else set(fields)
+        self.field_cache = LRUCache(maxsize)
+
+    def disable_field_cache(self):
+        self.field_cache = None
+        self.field_cache_fields = None
+
+    def get_field_cache_statistics(self):
+        """
+        Returns hits, misses, evictions, size, maxsize and hit_rate of the field cache
+
+        :rtype: dict or None if the cache is not enabled
+        """
+        if self.field_cache is None:
+            return None
+        return self.field_cache.statistics()
+
+    def enable_timing(self):
+        """
+        Count the calls and the time of the formatting stages: the conversion of the fields stored as integer, the
+        protection of upper case letters, the latex encoding and the formatting of complete fields and entries, in
+        total and per field key. The statistics are available with get_timing_statistics.
+
+        Values returned from the field cache are not formatted and hence their stages are not timed.
+        """
+        self.timer = BibTimer()
+
+    def disable_timing(self):
+        self.timer = None
+
+    def get_timing_statistics(self):
+        """
+        Returns the calls and nanoseconds of the formatting stages, see :meth:`BibTimer.as_dict`
+
+        :rtype: dict or None if timing is not enabled
+        """
+        if self.timer is None:
+            return None
+        return self.timer.as_dict()
+
     def add_do_not_display_field(self,fields):
         if type(fields) is str:
             self.do_not_display_fields.add(fields.strip())
         elif type(fields)is list:
             for field in fields:
                 self.do_not_display_fields.add(field.strip())
+        self.invalidate_output_plans()
 
     def set_do_not_display_field(self,fields):
         self.do_not_display_fields = set()
@@ -58,6 +189,7 @@ class BibTexWriter(object):
         elif type(fields)is list:
             for field in fields:
                 self.do_not_display_fields.add(field.strip())
+        self.invalidate_output_plans()
 
     def reset_to_default_settings(self):
         self.indent = '    '
@@ -67,16 +199,18 @@ class BibTexWriter(object):
         self.do_only_display_fields = None
         self.opening_field_character = '{'
         self.closing_field_character = '}'
+        self.entry_separator = '\n'
         
-        for entry in self.write_as_string_fields:
+        for entry in list(self.write_as_string_fields):
             self.remove_write_as_string_field(entry)
 
     # Add a field that should be written as bibtex string
     # field: string containing the , standard is a list
     def add_write_as_string_field(self,field, standard=None):
         self.write_as_string_fields.add(field)
-        if field in BibDefinitions.not_stored_as_string:
+        if field in self.get_config().not_stored_as_string:
             setattr(self,"standard_"+field, standard)
+        self.invalidate_output_plans()
 
     def remove_write_as_string_field(self,field):
         if field in self.write_as_string_fields:
@@ -85,6 +219,7 @@ class BibTexWriter(object):
                 delattr(self,"standard_"+field)
             except:
                 logger.warning("Attribute can't be deleted")
+            self.invalidate_output_plans()
         
     def get_entry_field(self, bibentry, key):
         """
@@ -98,6 +233,25 @@ class BibTexWriter(object):
         :rtype: str or unicode
         """
         return self._write_field(key,bibentry[key])
+
+    def get_entry_fields(self, bibentries, keys, default=None):
+        """
+        Converts the fields of several entries to BibTeX-formatted strings, the batched form of get_entry_field.
+
+        The formatter of every key is resolved once and then applied to the fields of all entries, e.g. to render a
+        table with one row per entry and one column per key.
+
+        :param bibentries: the entries
+        :type bibentries: iterable of dict
+        :param keys: the field keys, the columns of the rows
+        :type keys: list of str
+        :param default: value of the fields missing in an entry
+        :return: one list of BibTeX-formatted strings per entry, in the order of keys
+        :rtype: list of list
+        """
+        columns = [(key, self._get_field_formatter(key)) for key in keys]
+        return [[formatter(bibentry[key]) if key in bibentry else default for key, formatter in columns]
+                for bibentry in bibentries]
     
         
     def write(self,entry):
@@ -112,97 +266,253 @@ class BibTexWriter(object):
         logger.debug('writing a bibtex entry')
         return self._entry_to_bibtex(entry)
 
-    
-    
+    def write_many(self,entries):
+        """
+        Converts several bibliographic entries to BibTeX-formatted strings one entry at a time.
+
+        :param entries: iterable of entries
+        :type entries: iterable of dict
+        :return: generator of BibTeX-formatted strings, one per entry
+        :rtype: generator of str
+        """
+        for entry in entries:
+            yield self._entry_to_bibtex(entry)
+
+    def write_to(self,fileobj,entries,encoding='utf-8',buffer_size=65536):
+        """
+        Writes several bibliographic entries to a file, separated by entry_separator.
+
+        The entries are formatted one at a time and collected in a buffer of bounded size, such that the memory needed
+        does not depend on the number of entries.
+
+        :param fileobj: file-like object opened in text or binary mode or path to a file
+        :type fileobj: file or str
+        :param entries: iterable of entries
+        :type entries: iterable of dict
+        :param encoding: encoding used if the file is opened in binary mode
+        :type encoding: str
+        :param buffer_size: number of characters collected before they are written to the file
+        :type buffer_size: int
+        :return: number of entries written
+        :rtype: int
+        """
+        if not hasattr(fileobj, 'write'):
+            with open(fileobj, 'w', encoding=encoding) as opened_file:
+                return self.write_to(opened_file, entries, encoding, buffer_size)
+
+        binary = _is_binary_file(fileobj)
+        pieces = []
+        buffered = 0
+        count = 0
+        for bibtex in self.write_many(entries):
+            if count:
+                pieces.append(self.entry_separator)
+            pieces.append(bibtex)
+            buffered += len(bibtex)
+            count += 1
+            if buffered >= buffer_size:
+                _write_pieces(fileobj, pieces, binary, encoding)
+                pieces = []
+                buffered = 0
+        _write_pieces(fileobj, pieces, binary, encoding)
+        return count
+
+    async def awrite(self,stream,entries,batch_size=1000,executor=None,encoding='utf-8'):
+        """
+        Writes several bibliographic entries to an asyncio stream without blocking the event loop.
+
+        The entries are formatted in batches in the executor, such that the event loop stays responsive. After every
+        batch the stream is drained, which bounds the memory needed for slow streams. The executor must run the calls
+        in threads of this process, since the batches are formatted with this writer.
+
+        :param stream: stream accepting bytes, e.g. asyncio.StreamWriter
+        :type stream: asyncio.StreamWriter
+        :param entries: iterable or asynchronous iterable of entries
+        :type entries: iterable of dict
+        :param batch_size: number of entries formatted at once in the executor
+        :type batch_size: int
+        :param executor: executor of the CPU-heavy work (default: the default executor of the event loop)
+        :type executor: concurrent.futures.ThreadPoolExecutor
+        :param encoding: encoding of the written bytes
+        :type encoding: str
+        :return: number of entries written
+        :rtype: int
+        """
+        loop = asyncio.get_running_loop()
+        count = 0
+        batch = []
+        async for entry in _aiterate(entries):
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                stream.write(await loop.run_in_executor(executor, self._format_batch, batch, count, encoding))
+                await stream.drain()
+                count += len(batch)
+                batch = []
+        if batch:
+            stream.write(await loop.run_in_executor(executor, self._format_batch, batch, count, encoding))
+            await stream.drain()
+            count += len(batch)
+        return count
+
+    def _format_batch(self,entries,count,encoding):
+        pieces = []
+        for bibtex in self.write_many(entries):
+            if count:
+                pieces.append(self.entry_separator)
+            pieces.append(bibtex)
+            count += 1
+        return ''.join(pieces).encode(encoding)
+
     def _entry_to_bibtex(self, entry):
-        bibtex = ''
+        timer = self.timer
+        if timer is None:
+            return self._format_entry(entry)
+        start = time.perf_counter_ns()
+        bibtex = self._format_entry(entry)
+        timer.add('entry', time.perf_counter_ns() - start)
+        return bibtex
+
+    def _format_entry(self, entry):
         # Write BibTeX key
-        bibtex += '@' + entry['ENTRYTYPE'] + '{' + entry['ID']
+        pieces = ['@', entry['ENTRYTYPE'], '{', entry['ID']]
+
+        # Write field = value lines
+        for prefix, key, formatter in self._get_output_plan(entry):
+            try:
+                written_field = formatter(entry[key])
+            except TypeError:
+                logger.warning("Writing of the bibtex did not work at: " + key)
+                continue
+            pieces.append(prefix)
+            pieces.append(written_field)
+
+        pieces.append(",\n}\n")
+        return ''.join(pieces)
+
+    def _get_output_plan(self, entry):
+        """
+        Returns the output plan for the fields of entry: a list of (prefix, key, formatter) in display order
+        containing only the fields that should be displayed. The plans are cached per set of fields.
+        """
+        self._check_output_plans()
+        signature = frozenset(entry.keys())
+        plan = self._output_plans.get(signature)
+        if plan is None:
+            if len(self._output_plans) >= _MAX_OUTPUT_PLANS:
+                self._output_plans.clear()
+            plan = self._compile_output_plan(signature)
+            self._output_plans[signature] = plan
+        return plan
 
+    def _compile_output_plan(self, keys):
         # create display_order of fields for this entry
         # first those keys which are both in self.display_order and in entry.keys
-        display_order = [i for i in self.display_order if i in entry.keys()]
+        display_order = [i for i in self.display_order if i in keys]
         # then all the other fields sorted alphabetically
-        display_order.extend([i for i in sorted(entry) if (i not in self.display_order and i not in  ['ENTRYTYPE', 'ID'])])
-        # Write field = value lines
+        display_order.extend([i for i in sorted(keys) if (i not in self.display_order and i not in  ['ENTRYTYPE', 'ID'])])
+        # the previous comma and the newline
+        if self.comma_first:
+            separator = "\n" + self.indent + ", "
+        else:
+            separator = ",\n" + self.indent
+
+        plan = []
         for key in display_order:
             # only print fields that should be displayed
             if (key not in self.do_not_display_fields) and (self.do_only_display_fields is None or key in self.do_only_display_fields):
-                # write the previous comma and the newline
-                if self.comma_first:
-                    bibtex += "\n" + self.indent + ", " 
-                else:
-                    bibtex += ",\n" + self.indent 
-                
-                try:
-                    # write the key and field
-                    bibtex += key + " = "
-                    bibtex += self._write_field(key,entry[key])
-                           
-                except TypeError:
-                    logger.warning(["Writing of the bibtex did not work at: ", key, field])
-
-        bibtex += ",\n}\n"
-        return bibtex
-
+                plan.append((separator + key + " = ", key, self._get_field_formatter(key)))
+        return plan
 
     def _write_field(self,key,field):
-        logger.debug("Start processing writable fields: ")
-        
+        return self._get_field_formatter(key)(field)
+
+    def _get_field_formatter(self,key):
+        """
+        Returns a function converting a field of the given key to its BibTeX-formatted string, including delimiters.
+        """
+        self._check_output_plans()
+        formatter = self._field_formatters.get(key)
+        if formatter is None:
+            formatter = self._compile_field_formatter(key)
+            if self.timer is not None:
+                formatter = self.timer.timed('field', key, formatter)
+            self._field_formatters[key] = formatter
+        return formatter
+
+    def _compile_field_formatter(self,key):
+        opening = self.opening_field_character
+        closing = self.closing_field_character
+
         # check whether fields should be written as string or not
         if key in self.write_as_string_fields:
+            write_string_field = self._write_string_field
             if key == 'author':
-                written_fields = ''
-                for entry in field:
-                    written_fields += self._write_string_field(key,entry)
-                    written_fields += '# "and" #'
-                return written_fields[:-9]
-            else:
-                return self._write_string_field(key,field)
-        else:
-            if key == 'author':
-                written_fields = self.opening_field_character
-                for entry in field:
-                    written_fields += self._write_normal_field(key,entry)
-                    written_fields += " and "
-                written_fields = written_fields[:-5]
-                written_fields += self.closing_field_character
-                return written_fields
-            else:
-                written_fields = self.opening_field_character + self._write_normal_field(key,field) + self.closing_field_character
-                return written_fields
+                return lambda field: '# "and" #'.join([write_string_field(key,entry) for entry in field])
+            return lambda field: write_string_field(key,field)
+
+        normal_formatter = self._get_normal_formatter(key)
+        if key == 'author':
+            return lambda field: opening + " and ".join([normal_formatter(entry) for entry in field]) + closing
+        return lambda field: opening + normal_formatter(field) + closing
 
     def _write_normal_field(self,key,field):
-        written_field = ''
-        if key in BibDefinitions.not_stored_as_string:
-            if type(field) is str:
-                written_field = field
-            else:
+        return self._get_normal_formatter(key)(field)
+
+    def _get_normal_formatter(self,key):
+        """
+        Returns a function converting a single value of the given key to a string without delimiters.
+        """
+        formatter = self._normal_formatters.get(key)
+        if formatter is None:
+            formatter = self._compile_normal_formatter(key)
+            if self.field_cache is not None and (self.field_cache_fields is None or key in self.field_cache_fields):
+                formatter = _cached_formatter(self.field_cache, key, formatter)
+            self._normal_formatters[key] = formatter
+        return formatter
+
+    def _compile_normal_formatter(self,key):
+        # (name, step) in the order they are applied
+        steps = []
+        config = self._plans_config
+        if key in config.not_stored_as_string:
+            default_strings = config.get_default(key)
+            def integer_to_string(field):
+                if isinstance(field, str):
+                    return field
                 try:
-                    written_field = getattr(BibDefinitions,'default_'+ key)[field]
+                    return default_strings[field]
                 except:
                     logger.warning("There is no default defined for this index.")
-                    written_field = str(field)
-        else:
-            written_field = field
-                
+                    return str(field)
+            steps.append(('integer_to_string', integer_to_string))
+
         # process the string as requested:
         # protect upper case in all the defined fields
-        if key in BibDefinitions.protect_upper_case_fields:
-            written_field = BibDefinitions.protect_upper_case(written_field)
-            logger.debug("Protecting upper case words: " + written_field)
+        if key in config.protect_upper_case_fields:
+            steps.append(('protect_upper_case', config.protect_upper_case))
         # change latex stuff
-        if key in BibDefinitions.contains_latex_expressions:
-            written_field = BibDefinitions.string_to_latex(written_field)
-            logger.debug("Transform string to latex: " + written_field)
+        if key in config.contains_latex_expressions:
+            steps.append(('string_to_latex', config.string_to_latex))
 
-        return written_field
-        
+        if self.timer is not None:
+            steps = [self.timer.timed(name, key, step) for name, step in steps]
+        else:
+            steps = [step for name, step in steps]
+        if not steps:
+            return lambda field: field
+        if len(steps) == 1:
+            return steps[0]
+        def formatter(field):
+            for step in steps:
+                field = step(field)
+            return field
+        return formatter
 
     def _write_string_field(self,key,field):
-        if key in BibDefinitions.not_stored_as_string:
+        config = self.get_config()
+        if key in config.not_stored_as_string:
             # write the field as a string if it is recognised else write it not as a bibtex string
-            if type(field) is str:
+            if isinstance(field, str):
                 logger.warning("Field is not recognised. Fallback to non-string output")
                 written_field = self.opening_field_character + field + self.closing_field_character
             else:
@@ -211,7 +521,7 @@ class BibTexWriter(object):
                 except:
                     logger.warning("There is no standard string defined even though it should. Fallback to non-string output.")
                     try:
-                        written_field = self.opening_field_character + getattr(BibDefinitions,'default_'+ key)[field] + self.closing_field_character
+                        written_field = self.opening_field_character + config.get_default(key)[field] + self.closing_field_character
                     except:
                         logger.warning("There is no default defined for this field.")
                         written_field =  self.opening_field_character + str(field) + self.closing_field_character
@@ -219,3 +529,41 @@ class BibTexWriter(object):
             # write the field as a bibtex string
             written_field = str(field)
         return written_field
+
+
+def _cached_formatter(field_cache, key, formatter):
+    def cached_formatter(field):
+        try:
+            written_field = field_cache.get((key, field), _MISSING)
+        except TypeError:
+            # unhashable values are not cached
+            return formatter(field)
+        if written_field is _MISSING:
+            written_field = formatter(field)
+            field_cache.put((key, field), written_field)
+        return written_field
+    return cached_formatter
+
+def _is_binary_file(fileobj):
+    if isinstance(fileobj, io.TextIOBase):
+        return False
+    if isinstance(fileobj, (io.RawIOBase, io.BufferedIOBase)):
+        return True
+    return 'b' in getattr(fileobj, 'mode', '')
+
+def _write_pieces(fileobj, pieces, binary, encoding):
+    if not pieces:
+        return
+    text = ''.join(pieces)
+    if binary:
+        fileobj.write(text.encode(encoding))
+    else:
+        fileobj.write(text)
+
+async def _aiterate(entries):
+    if hasattr(entries, '__aiter__'):
+        async for entry in entries:
+            yield entry
+    else:
+        for entry in entries:
+            yield entry
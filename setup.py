@@ -25,6 +25,7 @@ setup(
     license= 'LGPLv3 or BSD',
     packages=find_packages(where=here),
     install_requires=[],
+    extras_require={'numpy': ['numpy']},
     python_requires='>=3',
     platforms=['any']
 )
@@ -0,0 +1,36 @@
+import unittest
+from bibtexentryparser.ahocorasick import AhoCorasick
+from bibtexentryparser.bibDefinitions import _compile_protected_words, _max_regex_protected_words
+
+class TestAhoCorasick(unittest.TestCase):
+
+    def test_replace(self):
+        matcher = AhoCorasick({"he": "1", "she": "2", "his": "3", "hers": "4"})
+        self.assertEqual(matcher.find("ushers"), [(1, 4)])
+        self.assertEqual(matcher.replace("ushers"), "u2rs")
+        self.assertEqual(matcher.replace("his hers she"), "3 4 2")
+        self.assertEqual(matcher.replace("nothing"), "nothing")
+        self.assertEqual(matcher.replace(""), "")
+
+    def test_leftmost_longest(self):
+        matcher = AhoCorasick({"Markov": "{M}arkov", "Markovian": "{M}arkovian", "ovian": "x"})
+        self.assertEqual(matcher.replace("Markovian Markov chains"), "{M}arkovian {M}arkov chains")
+
+    def test_many_words(self):
+        words = dict(("Gene%d" % i, "{G}ene%d" % i) for i in range(5000))
+        matcher = AhoCorasick(words)
+        self.assertEqual(len(matcher), 5000)
+        self.assertEqual(matcher.replace("Gene42 and Gene4999"), "{G}ene42 and {G}ene4999")
+
+    def test_protected_words_regex_and_automaton_agree(self):
+        words = {"Markov": "{M}arkov", "Markovian": "{M}arkovian", "ovian": "x", "he": "1", "she": "2", "a.b": "{A}"}
+        fillers = dict(("Gene%d" % i, "{G}ene%d" % i) for i in range(_max_regex_protected_words))
+        text = "Markovian Markov chains, ushers and a.b but not axb: Gene7"
+        regex_replace = _compile_protected_words(words)
+        automaton_replace = _compile_protected_words(dict(words, **fillers))
+        self.assertEqual(regex_replace(text), "{M}arkovian {M}arkov chains, u2rs and {A} but not axb: Gene7")
+        self.assertEqual(automaton_replace(text), "{M}arkovian {M}arkov chains, u2rs and {A} but not axb: {G}ene7")
+        self.assertEqual(_compile_protected_words({})(text), text)
+
+if __name__ =="__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import bibtexparser as bp
+
+TEST_FILE = """
+@article{first, title = {First {MIMO}}, month = {jan}}
+@article{second, title = {Second}, month = {someday}}
+"""
+
+class TestParsedFileCache(unittest.TestCase):
+
+    def setUp(self):
+        bp.reset_to_default_settings()
+        self.directory = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.directory, 'cache')
+        self.path = os.path.join(self.directory, 'test.bib')
+        with open(self.path, 'w', encoding='utf-8') as bib_file:
+            bib_file.write(TEST_FILE)
+
+    def tearDown(self):
+        bp.BibDefinitions.reset()
+        shutil.rmtree(self.directory)
+
+    def test_load_file_cache(self):
+        entries = bp.load_file(self.path, cache_dir=self.cache_dir)
+        self.assertEqual([entry['ID'] for entry in entries], ['first', 'second'])
+        self.assertEqual(entries[0]['month'], 1)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+        # a warm load does not parse
+        bp.BibDefinitions.get_non_recognised_string_fields('month').clear()
+        with mock.patch.object(bp.bibparser.BibTexParser, 'parse', side_effect=AssertionError):
+            self.assertEqual(bp.load_file(self.path, cache_dir=self.cache_dir), entries)
+        self.assertIn('someday', bp.BibDefinitions.get_non_recognised_string_fields('month'))
+
+        # changed settings invalidate the cache
+        parser = bp.bibparser.BibTexParser()
+        parser.add_key_replacement('title', 'name')
+        self.assertEqual(bp.load_file(self.path, cache_dir=self.cache_dir, parser=parser)[0]['name'], 'First {MIMO}')
+        bp.BibDefinitions.reset()
+        self.assertEqual(bp.load_file(self.path, cache_dir=self.cache_dir)[0]['month'], 'jan')
+        self.assertEqual(len(os.listdir(self.cache_dir)), 3)
+
+        # a changed file invalidates the cache
+        with open(self.path, 'a', encoding='utf-8') as bib_file:
+            bib_file.write("@misc{third}\n")
+        self.assertEqual(len(bp.load_file(self.path, cache_dir=self.cache_dir)), 3)
+
+    def test_load_file_without_cache(self):
+        self.assertEqual(len(bp.load_file(self.path)), 2)
+
+    def test_load_file_with_failing_cache(self):
+        for error in (PermissionError(13, 'Permission denied'), pickle.PicklingError('can not pickle')):
+            with mock.patch.object(bp.bibcache.pickle, 'dump', side_effect=error):
+                with self.assertLogs('bibtexentryparser.bibcache', level='WARNING'):
+                    entries = bp.load_file(self.path, cache_dir=self.cache_dir)
+            self.assertEqual([entry['ID'] for entry in entries], ['first', 'second'])
+            # no cache or temporary files are left behind
+            self.assertEqual(os.listdir(self.cache_dir), [])
+
+        # a file in place of the cache directory
+        with self.assertLogs('bibtexentryparser.bibparser', level='WARNING'):
+            entries = bp.load_file(self.path, cache_dir=self.path)
+        self.assertEqual([entry['ID'] for entry in entries], ['first', 'second'])
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_eviction_and_statistics(self):
+        cache = bp.bibcache.LRUCache(maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(cache.statistics(), {'hits': 2, 'misses': 1, 'evictions': 1, 'size': 2, 'maxsize': 2, 'hit_rate': 2 / 3})
+
+if __name__ =="__main__":
+    unittest.main()
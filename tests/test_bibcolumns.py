@@ -0,0 +1,60 @@
+import unittest
+import bibtexparser as bp
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+TEST_ENTRIES = """
+@article{first, author = {A. Author and B. Author}, title = {First}, year = {2012}, month = {jan}}
+@inproceedings{second, title = {Second}, year = {2015}, month = {someday}}
+@article{third, author = {A. Author and B. Author}, year = {unknown}, month = {mar}}
+"""
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class TestColumns(unittest.TestCase):
+
+    def setUp(self):
+        bp.reset_to_default_settings()
+        parser = bp.bibparser.BibTexParser()
+        self.entries = [parser.parse(entry) for entry in TEST_ENTRIES.strip().split('\n')]
+
+    def tearDown(self):
+        bp.BibDefinitions.reset()
+
+    def test_integer_columns(self):
+        columns = bp.to_columns(self.entries, fields=['year', 'month'])
+        self.assertEqual(columns['year'].dtype, numpy.int64)
+        self.assertEqual(columns['year'].tolist(), [2012, 2015, bp.bibcolumns.MISSING_CODE])
+        self.assertEqual(columns['month'].tolist(), [1, bp.bibcolumns.MISSING_CODE, 3])
+        self.assertEqual(int(numpy.count_nonzero(columns['year'] >= 2015)), 1)
+
+    def test_dictionary_columns(self):
+        columns = bp.to_columns(iter(self.entries), fields=['ENTRYTYPE', 'author', 'title'])
+        entrytype = columns['ENTRYTYPE']
+        self.assertEqual(entrytype.codes.tolist(), [0, 1, 0])
+        self.assertEqual(entrytype.vocabulary.tolist(), ['article', 'inproceedings'])
+        self.assertEqual(columns['author'].codes.tolist(), [0, -1, 0])
+        self.assertEqual(columns['author'].vocabulary[0], 'A. Author and B. Author')
+        self.assertEqual(columns['title'].codes.tolist(), [0, 1, -1])
+
+    def test_default_fields(self):
+        columns = bp.to_columns(self.entries)
+        self.assertEqual(set(columns), {'ENTRYTYPE', 'ID', 'author', 'title', 'year', 'month'})
+        self.assertEqual(len(columns['ID'].vocabulary), 3)
+
+    def test_config(self):
+        config = bp.BibConfig(stored_as_integer={'edition': ({'first': 1, 'second': 2}, ['', 'first', 'second'])})
+        parser = bp.bibparser.BibTexParser(config=config)
+        entries = [parser.parse('@book{a, edition = {First}, month = {jan}}'), parser.parse('@book{b, edition = {second}}'),
+                   {'ENTRYTYPE': 'book', 'ID': 'c', 'edition': 'Second'}, {'ENTRYTYPE': 'book', 'ID': 'd'}]
+        columns = bp.to_columns(entries, fields=['edition', 'month'], config=config)
+        self.assertEqual(columns['edition'].dtype, numpy.int64)
+        self.assertEqual(columns['edition'].tolist(), [1, 2, 2, bp.bibcolumns.MISSING_CODE])
+        self.assertEqual(columns['month'].codes.tolist(), [0, -1, -1, -1])
+        self.assertEqual(columns['month'].vocabulary.tolist(), ['jan'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import pickle
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import bibtexparser as bp
+
+TEST_ENTRY = """@article{id,
+    title = {{MIMO} control of {M}arkov chains},
+    author = {St\\"{u}dli, S.},
+    month = {someday},
+}"""
+
+class TestBibConfig(unittest.TestCase):
+
+    def setUp(self):
+        bp.reset_to_default_settings()
+        self.config = bp.BibConfig(
+            protected_upper_case_words=['Markov'],
+            protect_upper_case_fields=['title'],
+            contains_latex_expressions=['title', 'author'],
+            stored_as_integer={'month': ({'jan': 1}, ['', 'January'])},
+        )
+
+    def tearDown(self):
+        bp.BibDefinitions.reset()
+
+    def test_frozen(self):
+        with self.assertRaises(AttributeError):
+            self.config.protect_upper_case_fields = set()
+        with self.assertRaises(AttributeError):
+            self.config.protect_upper_case_fields.add('journal')
+        with self.assertRaises(TypeError):
+            self.config.protected_upper_case_words['Lyapunov'] = '{L}yapunov'
+
+        changed = self.config.replace(protect_upper_case_fields=['title', 'journal'])
+        self.assertEqual(changed.protect_upper_case_fields, {'title', 'journal'})
+        self.assertEqual(self.config.protect_upper_case_fields, {'title'})
+        self.assertNotEqual(changed, self.config)
+        self.assertEqual(pickle.loads(pickle.dumps(changed)), changed)
+        with self.assertRaises(TypeError):
+            self.config.replace(unknown=1)
+
+    def test_from_definitions(self):
+        config = bp.BibConfig.from_definitions()
+        self.assertIs(bp.BibConfig.from_definitions(), config)
+        self.assertEqual(config.get_fingerprint(), bp.BibDefinitions.get_settings_fingerprint())
+        self.assertEqual(config.get_recognised('month')['june'], 6)
+        bp.BibDefinitions.add_protected_upper_case_words('Kalman')
+        self.assertIsNot(bp.BibConfig.from_definitions(), config)
+        self.assertNotIn('Kalman', config.protected_upper_case_words)
+
+    def test_parse_and_write_side_by_side(self):
+        parser = bp.bibparser.BibTexParser(config=self.config)
+        entry = parser.parse(TEST_ENTRY)
+        global_entry = bp.load(TEST_ENTRY)
+        self.assertEqual(entry['author'], ['Stüdli, S.'])
+        self.assertEqual(entry['month'], 'someday')
+        self.assertEqual(parser.get_non_recognised_string_fields('month'), {'someday'})
+        self.assertEqual(global_entry, entry)
+
+        bp.BibDefinitions.reset()
+        # the global settings do not change the configured parser
+        self.assertEqual(parser.parse(TEST_ENTRY), entry)
+        self.assertEqual(bp.load(TEST_ENTRY)['author'], ['St\\"{u}dli, S.'])
+
+        writer = bp.bibwriter.BibTexWriter(config=self.config)
+        entry['month'] = 1
+        self.assertEqual(writer.get_entry_field(entry, 'title'), '{{MIMO} control of {M}arkov chains}')
+        self.assertEqual(writer.get_entry_field(entry, 'author'), '{St\\"{u}dli, S.}')
+        self.assertEqual(writer.get_entry_field(entry, 'month'), '{January}')
+        self.assertEqual(bp.getString(entry, 'author'), '{Stüdli, S.}')
+
+    def test_threads(self):
+        configs = [self.config, self.config.replace(contains_latex_expressions=[])]
+
+        def parse(index):
+            parser = bp.bibparser.BibTexParser(config=configs[index % 2])
+            return [parser.parse(TEST_ENTRY)['author'][0] for _ in range(50)]
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(parse, range(8)))
+        for index, authors in enumerate(results):
+            expected = 'Stüdli, S.' if index % 2 == 0 else 'St\\"{u}dli, S.'
+            self.assertEqual(set(authors), {expected})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import bibtexparser as bp
+
+TEST_ENTRIES = """
+@article{first, author = {A. Author and B. Author}, year = {2012}, keywords = {control, Markov chains}}
+@inproceedings{second, author = {B. Author}, year = {2015}, keywords = {control}}
+@article{third, author = {C. Author and B. Author}, year = {2016}}
+@article{fourth, author = {B. Author}, year = {unknown}}
+"""
+
+class TestBibDatabase(unittest.TestCase):
+
+    def setUp(self):
+        bp.reset_to_default_settings()
+        parser = bp.bibparser.BibTexParser()
+        self.database = bp.BibDatabase(parser.parse(entry) for entry in TEST_ENTRIES.strip().split('\n'))
+
+    def tearDown(self):
+        bp.BibDefinitions.reset()
+
+    def ids(self, entries):
+        return [entry['ID'] for entry in entries]
+
+    def test_find(self):
+        self.assertEqual(len(self.database), 4)
+        self.assertEqual(self.database['second']['year'], '2015')
+        self.assertEqual(self.ids(self.database.find(author='b. author')), ['first', 'second', 'third', 'fourth'])
+        self.assertEqual(self.ids(self.database.find(author='B. Author', year_min=2015, entrytype='article')), ['third'])
+        self.assertEqual(self.ids(self.database.find(year_max=2015)), ['first', 'second'])
+        self.assertEqual(self.ids(self.database.find(year=2016)), ['third'])
+        self.assertEqual(self.ids(self.database.find(keyword='Control')), ['first', 'second'])
+        self.assertEqual(self.ids(self.database.find(keyword='markov chains', author='C. Author')), [])
+        self.assertEqual(self.ids(self.database.find(author='Nobody')), [])
+
+    def test_incremental_updates(self):
+        self.database.remove('first')
+        self.assertEqual(self.ids(self.database.find(keyword='control')), ['second'])
+        self.assertEqual(self.ids(self.database.find(year_max=2015)), ['second'])
+
+        self.database.set_entry_field('second', 'year', '2020')
+        self.database.set_entry_field('second', 'author', 'D. Author')
+        self.assertEqual(self.ids(self.database.find(year_min=2017)), ['second'])
+        self.assertEqual(self.ids(self.database.find(author='B. Author')), ['third', 'fourth'])
+        self.assertEqual(self.ids(self.database.find(author='D. Author')), ['second'])
+
+        self.database['third']['ID'] = 'renamed'
+        self.database.reindex('third')
+        self.assertNotIn('third', self.database)
+        self.assertEqual(self.ids(self.database.find(author='C. Author')), ['renamed'])
+
+        self.database['fourth']['ENTRYTYPE'] = 'book'
+        self.database.reindex('fourth')
+        self.assertEqual(self.ids(self.database.find(entrytype='book')), ['fourth'])
+        self.assertEqual(self.ids(self.database.find(entrytype='article')), ['renamed'])
+        self.assertEqual(list(self.database), ['second', 'fourth', 'renamed'])
+
+    def test_set_id(self):
+        entry = self.database.set_entry_field('first', 'ID', 'renamed')
+        self.assertEqual(entry['ID'], 'renamed')
+        self.assertNotIn('first', self.database)
+        self.assertIs(self.database['renamed'], entry)
+        self.assertNotIn('id', entry)
+        self.assertEqual(self.ids(self.database.find(keyword='control')), ['second', 'renamed'])
+        self.assertEqual(self.ids(self.database.find(year=2012)), ['renamed'])
+        self.assertEqual(list(self.database), ['second', 'third', 'fourth', 'renamed'])
+
+        with self.assertRaises(ValueError):
+            self.database.set_entry_field('renamed', 'ID', 'second')
+        self.assertEqual(self.database['renamed']['ID'], 'renamed')
+        self.assertEqual(self.database['second']['year'], '2015')
+        self.assertEqual(len(self.database), 4)
+
+    def test_replace(self):
+        self.database.add({'ENTRYTYPE': 'book', 'ID': 'first', 'year': '1999'})
+        self.assertEqual(len(self.database), 4)
+        self.assertEqual(self.ids(self.database.find(year_max=2000)), ['first'])
+        self.assertEqual(self.ids(self.database.find(keyword='Markov chains')), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import bibtexparser as bp
+
+TEST_ENTRIES = """
+@article{smith2012, author = {J. Smith and A. M\\"{u}ller}, title = {Distributed control of {M}arkov chains}, year = {2012}}
+@article{Smith12, author = {Smith, John and Muller, Anna}, title = {Distributed Control of Markov Chains.}, year = {2012}}
+@inproceedings{smith_conf, author = {John Smith}, title = {Distributed control of Markov chains}, year = {2011}}
+@article{doi_a, author = {B. Jones}, title = {A survey}, doi = {10.1000/XYZ}, year = {2010}}
+@article{doi_b, author = {B. Jones}, title = {Survey of everything}, doi = {https://doi.org/10.1000/xyz}, year = {2010}}
+@article{other, author = {J. Smith}, title = {Sensor networks}, year = {2012}}
+@article{different_doi, author = {B. Jones}, title = {A survey}, doi = {10.1000/abc}, year = {2010}}
+"""
+
+class TestBibDeduplicator(unittest.TestCase):
+
+    def setUp(self):
+        bp.reset_to_default_settings()
+        parser = bp.bibparser.BibTexParser()
+        self.entries = [parser.parse(entry) for entry in TEST_ENTRIES.strip().split('\n')]
+
+    def tearDown(self):
+        bp.BibDefinitions.reset()
+
+    def test_find_duplicates(self):
+        clusters = bp.BibDeduplicator(threshold=0.7).find_duplicates(self.entries)
+        self.assertEqual([cluster.ids for cluster in clusters], [['doi_a', 'doi_b'], ['Smith12', 'smith2012', 'smith_conf']])
+        self.assertEqual(clusters[0].score, 1.0)
+        self.assertEqual(clusters[0].pairs, [('doi_a', 'doi_b', 1.0)])
+        for first, second, score in clusters[1].pairs:
+            self.assertGreaterEqual(score, 0.7)
+            self.assertLessEqual(score, 1.0)
+
+    def test_threshold(self):
+        clusters = bp.BibDeduplicator(threshold=0.95).find_duplicates(self.entries)
+        self.assertEqual([cluster.ids for cluster in clusters], [['Smith12', 'smith2012'], ['doi_a', 'doi_b']])
+
+    def test_lsh_candidates(self):
+        # without common DOI, year or first author only the title signatures make the entries candidates
+        entries = [
+            {'ID': 'a', 'title': 'Distributed control of Markov chains', 'year': '2012', 'author': ['A. First']},
+            {'ID': 'b', 'title': 'Distributed control of Markov chains', 'year': '2013', 'author': ['B. Second']},
+        ]
+        deduplicator = bp.BibDeduplicator(threshold=0.6)
+        self.assertEqual([cluster.ids for cluster in deduplicator.find_duplicates(entries)], [['a', 'b']])
+
+    def test_config(self):
+        config = bp.BibConfig(string_latex_tuppels=bp.BibDefinitions._string_latex_tuppels + (('Ω', '\\myomega'),))
+        entries = [
+            {'ID': 'a', 'title': 'The \\myomega{} principle', 'year': '2012', 'author': ['A. \\myomega']},
+            {'ID': 'b', 'title': 'The Ω principle', 'year': '2012', 'author': ['A. Ω']},
+        ]
+        self.assertEqual(bp.BibDeduplicator(threshold=0.95).find_duplicates(entries), [])
+        clusters = bp.BibDeduplicator(threshold=0.95, config=config).find_duplicates(entries)
+        self.assertEqual([cluster.ids for cluster in clusters], [['a', 'b']])
+
+    def test_invalid_bands(self):
+        with self.assertRaises(ValueError):
+            bp.BibDeduplicator(num_permutations=10, bands=4)
+
+
+if __name__ == '__main__':
+    unittest.main()
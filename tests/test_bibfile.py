@@ -0,0 +1,75 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import bibtexparser as bp
+
+TEST_FILE = """% test file
+@article{first,
+author = {St\\"{u}dli, S. and Peters, E.},
+title = {First title, with {braces}},
+}
+
+@book{second,
+title = "Second title",
+year = 2012}
+@misc{third, note = {ü and @}}
+"""
+
+class TestBibFile(unittest.TestCase):
+
+    def setUp(self):
+        bp.reset_to_default_settings()
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'test.bib')
+        with open(self.path, 'w', encoding='utf-8') as bib_file:
+            bib_file.write(TEST_FILE)
+
+    def tearDown(self):
+        bp.BibDefinitions.reset()
+        shutil.rmtree(self.directory)
+
+    def test_random_access(self):
+        with bp.BibFile(self.path) as bib_file:
+            self.assertEqual(len(bib_file), 3)
+            self.assertEqual(list(bib_file), ['first', 'second', 'third'])
+            self.assertIn('second', bib_file)
+            self.assertNotIn('fourth', bib_file)
+            self.assertIsNone(bib_file.get('fourth'))
+
+            self.assertEqual(bib_file['first']['author'], ['Stüdli, S.', 'Peters, E.'])
+            self.assertEqual(bib_file['first']['title'], 'First title, with {braces}')
+            self.assertEqual(bib_file['second']['year'], '2012')
+            self.assertEqual(bib_file['third']['note'], 'ü and @')
+            self.assertTrue(bib_file.get_entry_string('third').startswith('@misc{third'))
+
+    def test_index_file(self):
+        with bp.BibFile(self.path) as bib_file:
+            bib_file.save_index()
+            index = bib_file.index
+        self.assertTrue(os.path.exists(self.path + '.idx'))
+
+        # the index must be loaded, not scanned
+        with mock.patch.object(bp.BibFile, '_scan', side_effect=AssertionError):
+            with bp.BibFile(self.path) as bib_file:
+                self.assertEqual(bib_file.index, index)
+                self.assertEqual(bib_file['second']['title'], 'Second title')
+
+        # a changed file invalidates the index
+        with open(self.path, 'a', encoding='utf-8') as bib_file:
+            bib_file.write("@misc{fourth, note = {new}}\n")
+        with bp.BibFile(self.path) as bib_file:
+            self.assertEqual(len(bib_file), 4)
+            self.assertEqual(bib_file['fourth']['note'], 'new')
+
+    def test_unbalanced_entry(self):
+        with open(self.path, 'w', encoding='utf-8') as bib_file:
+            bib_file.write("@article{a, title = {A}}\n@article{b, title = {{B}, year = 2012}\n@misc{c, note = {C}}\n")
+        with self.assertLogs('bibtexentryparser.bibtokenizer', level='WARNING'):
+            with bp.BibFile(self.path) as bib_file:
+                self.assertEqual(list(bib_file.keys()), ['a', 'c'])
+                self.assertEqual(bib_file['c']['note'], 'C')
+
+if __name__ =="__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import pickle
+import unittest
+import bibtexparser as bp
+
+class TestBibNames(unittest.TestCase):
+
+    def setUp(self):
+        bp.reset_to_default_settings()
+        self.parser = bp.bibparser.BibTexParser()
+
+    def tearDown(self):
+        bp.BibDefinitions.reset()
+
+    def assertName(self, name, first, von, last, jr=''):
+        self.assertEqual((name.first, name.von, name.last, name.jr), (first, von, last, jr))
+
+    def test_parse_name(self):
+        self.assertName(bp.bibnames.parse_name('Ludwig van Beethoven'), 'Ludwig', 'van', 'Beethoven')
+        self.assertName(bp.bibnames.parse_name('van Beethoven, Ludwig'), 'Ludwig', 'van', 'Beethoven')
+        self.assertName(bp.bibnames.parse_name('Jean de la Fontaine'), 'Jean', 'de la', 'Fontaine')
+        self.assertName(bp.bibnames.parse_name('Ford, Jr., Henry'), 'Henry', '', 'Ford', 'Jr.')
+        self.assertName(bp.bibnames.parse_name('Stüdli, S.'), 'S.', '', 'Stüdli')
+        self.assertName(bp.bibnames.parse_name('E. Peters'), 'E.', '', 'Peters')
+        self.assertName(bp.bibnames.parse_name('{van Gogh}, Vincent'), 'Vincent', '', '{van Gogh}')
+        self.assertName(bp.bibnames.parse_name('Aristotle'), '', '', 'Aristotle')
+
+    def test_split_names(self):
+        self.assertEqual(bp.bibnames.split_names('A. Author and {Barnes and Noble} and {ACME} and B. {and} C'),
+                         ['A. Author', 'Barnes and Noble', 'ACME', 'B. {and} C'])
+
+    def test_parsed_authors(self):
+        entry = self.parser.parse('@article{id, author = {van Beethoven, Ludwig and St\\"{u}dli, S.}}')
+        self.assertEqual(entry['author'], ['van Beethoven, Ludwig', 'Stüdli, S.'])
+        self.assertIsInstance(entry['author'][0], bp.BibName)
+        self.assertName(entry['author'][1], 'S.', '', 'Stüdli')
+        other = self.parser.parse('@article{other, author = {Stüdli, S.}}')
+        # the parsed name is cached
+        self.assertIs(other['author'][0], entry['author'][1])
+        # by the parser, other parsers have their own cache
+        self.assertIn('Stüdli, S.', self.parser.name_cache)
+        self.assertNotIn('Stüdli, S.', bp.bibparser.BibTexParser().name_cache)
+
+        copy = pickle.loads(pickle.dumps(entry))
+        self.assertName(copy['author'][0], 'Ludwig', 'van', 'Beethoven')
+        self.assertEqual(bp.write(entry), bp.write(copy))
+
+    def test_write_parsed_authors(self):
+        entry = self.parser.parse('@article{id, author = {van Beethoven, Ludwig and St\\"{u}dli, S.}, month = {mar}}')
+        # names are strings, also in the fields stored as integer
+        entry['month'] = bp.BibName('someday')
+        with self.assertLogs('bibtexentryparser.bibwriter', level='DEBUG') as logs:
+            written = bp.write(entry)
+        self.assertEqual(set(record.levelname for record in logs.records), {'DEBUG'})
+        self.assertIn('author = {van Beethoven, Ludwig and St\\"{u}dli, S.}', written)
+        self.assertIn('month = {someday}', written)
+        parsed = self.parser.parse(written)
+        self.assertEqual(parsed['author'], entry['author'])
+        self.assertName(parsed['author'][0], 'Ludwig', 'van', 'Beethoven')
+        self.assertEqual(bp.write(parsed), written)
+
+
+if __name__ == '__main__':
+    unittest.main()
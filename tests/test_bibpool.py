@@ -0,0 +1,63 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import bibtexparser as bp
+
+class TestBibPool(unittest.TestCase):
+
+    def setUp(self):
+        bp.reset_to_default_settings()
+
+    def tearDown(self):
+        bp.BibDefinitions.reset()
+
+    def test_reuse(self):
+        created = []
+
+        def factory():
+            parser = bp.bibparser.BibTexParser()
+            parser.add_key_replacement('keyw', 'tags')
+            created.append(parser)
+            return parser
+
+        pool = bp.BibPool(factory, maxsize=1)
+        with pool.acquire() as parser:
+            self.assertEqual(parser.parse('@misc{id, keyw = {a}}')['tags'], 'a')
+            with pool.acquire() as other:
+                self.assertIsNot(other, parser)
+        self.assertEqual(len(created), 2)
+        self.assertEqual(len(pool), 1)
+        with pool.acquire() as reused:
+            self.assertIn(reused, created)
+        self.assertEqual(len(created), 2)
+
+        # changed global settings discard the pooled instances
+        bp.BibDefinitions.add_protected_upper_case_words('Kalman')
+        with pool.acquire() as parser:
+            self.assertIs(parser, created[-1])
+        self.assertEqual(len(created), 3)
+
+    def test_threads(self):
+        pool = bp.BibPool(bp.bibwriter.BibTexWriter)
+        entry = bp.load('@article{id, title = {{MIMO} control of {M}arkov chains}}')
+
+        def write(index):
+            with pool.acquire() as writer:
+                return writer.get_entry_field(entry, 'title')
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            self.assertEqual(set(executor.map(write, range(100))), {'{{MIMO} control of {M}arkov chains}'})
+        self.assertLessEqual(len(pool), 4)
+
+    def test_default_instances(self):
+        entry = bp.load('@article{id, title = {Title}}')
+        bp.getString(entry, 'title')
+        with bp.bibpool.default_writers.acquire() as writer:
+            self.assertIsInstance(writer, bp.bibwriter.BibTexWriter)
+        self.assertEqual(len(bp.bibpool.default_writers), 1)
+        self.assertEqual(bp.setString(entry, 'month', 'jan')['month'], 1)
+        bp.BibDefinitions.reset()
+        self.assertEqual(bp.setString(entry, 'month', 'jan')['month'], 'jan')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from unittest import mock
+import bibtexparser as bp
+
+VERSION_1 = """
+@article{first, title = {First}, month = {jan}}
+@article{second, title = {Second}}
+@article{third, title = {Third}}
+"""
+
+VERSION_2 = """
+@article{first, title = {First}, month = {jan}}
+@article{third, title = {Third, edited}}
+@book{fourth, title = {Fourth}}
+"""
+
+class TestBibSession(unittest.TestCase):
+
+    def setUp(self):
+        bp.reset_to_default_settings()
+        self.session = bp.BibSession()
+
+    def tearDown(self):
+        bp.BibDefinitions.reset()
+
+    def test_incremental_update(self):
+        delta = self.session.update(VERSION_1)
+        self.assertEqual(list(delta.added), ['first', 'second', 'third'])
+        self.assertEqual(delta.changed, {})
+        self.assertEqual(delta.removed, {})
+        first = self.session.entries['first']
+
+        with mock.patch.object(self.session.parser, 'parse', wraps=self.session.parser.parse) as parse:
+            delta = self.session.update(VERSION_2)
+        self.assertEqual(parse.call_count, 2)
+        self.assertEqual(list(delta.added), ['fourth'])
+        self.assertEqual(delta.changed['third']['title'], 'Third, edited')
+        self.assertEqual(delta.removed['second']['title'], 'Second')
+        self.assertEqual(list(self.session.entries), ['first', 'third', 'fourth'])
+        self.assertIs(self.session.entries['first'], first)
+
+        delta = self.session.update(VERSION_2)
+        self.assertEqual(delta, ({}, {}, {}))
+
+    def test_update_with_unbalanced_entry(self):
+        with self.assertLogs('bibtexentryparser.bibtokenizer', level='WARNING'):
+            delta = self.session.update(VERSION_1.replace('{Second}', '{{Second}'))
+        self.assertEqual(list(delta.added), ['first', 'third'])
+
+    def test_update_after_changed_definitions(self):
+        self.session.update(VERSION_1)
+        self.assertEqual(self.session.entries['first']['month'], 1)
+
+        bp.BibDefinitions.reset()
+        delta = self.session.update(VERSION_1)
+        self.assertEqual(list(delta.changed), ['first', 'second', 'third'])
+        self.assertEqual(self.session.entries['first']['month'], 'jan')
+
+    def test_update_after_changed_parser_settings(self):
+        self.session.update(VERSION_1)
+        self.session.parser.add_key_replacement('title', 'name')
+        delta = self.session.update(VERSION_1)
+        self.assertEqual(list(delta.changed), ['first', 'second', 'third'])
+        self.assertEqual(self.session.entries['second']['name'], 'Second')
+
+        # a session with its own config does not depend on the global definitions
+        session = bp.BibSession(bp.bibparser.BibTexParser(config=bp.BibConfig.from_definitions()))
+        session.update(VERSION_1)
+        bp.BibDefinitions.reset()
+        with mock.patch.object(session.parser, 'parse', wraps=session.parser.parse) as parse:
+            delta = session.update(VERSION_1)
+        self.assertEqual(parse.call_count, 0)
+        self.assertEqual(session.entries['first']['month'], 1)
+
+if __name__ =="__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+import unittest
+import bibtexparser as bp
+
+TEST_ENTRIES = [
+    {'ID': 'first', 'title': 'Stability of {M}arkov chains', 'abstract': 'Markov chains in control. Chains of stability.'},
+    {'ID': 'second', 'title': 'Control of chains', 'abstract': 'Markov models of sensor chains'},
+    {'ID': 'third', 'title': 'Sch\\"{o}ne Markov Chains'},
+]
+
+class TestBibTextIndex(unittest.TestCase):
+
+    def setUp(self):
+        bp.reset_to_default_settings()
+        self.index = bp.BibTextIndex(TEST_ENTRIES)
+
+    def tearDown(self):
+        bp.BibDefinitions.reset()
+
+    def test_tokenize(self):
+        self.assertEqual(self.index.tokenize('Sch\\"{o}ne {M}arkov-Chains'), ['schöne', 'markov', 'chains'])
+
+    def test_find_phrase(self):
+        self.assertEqual(self.index.find_phrase('markov chains'), {'first', 'third'})
+        self.assertEqual(self.index.find_phrase('Schöne Markov'), {'third'})
+        self.assertEqual(self.index.find_phrase('chains markov'), set())
+        # phrases do not span fields
+        self.assertEqual(self.index.find_phrase('chains markov models'), set())
+
+    def test_search(self):
+        results = self.index.search('markov')
+        self.assertEqual(set(entry_id for entry_id, score in results), {'first', 'second', 'third'})
+        self.assertEqual([score for entry_id, score in results], sorted((score for entry_id, score in results), reverse=True))
+        # the short title is the best match
+        self.assertEqual(results[0][0], 'third')
+        self.assertEqual([entry_id for entry_id, score in self.index.search('control "markov chains"')],
+                         ['first', 'third'])
+        self.assertEqual([entry_id for entry_id, score in self.index.search('"sensor chains" "control of"')], ['second'])
+        self.assertEqual(self.index.search('unknown'), [])
+        self.assertEqual(len(self.index.search('chains', limit=1)), 1)
+
+    def test_incremental_updates(self):
+        self.index.remove('first')
+        self.assertEqual(self.index.find_phrase('markov chains'), {'third'})
+        self.index.add({'ID': 'third', 'title': 'Sensor networks'})
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(self.index.find_phrase('markov chains'), set())
+        self.assertEqual([entry_id for entry_id, score in self.index.search('sensor')], ['third', 'second'])
+
+    def test_save_load(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'title.index')
+            self.index.save(path)
+            loaded = bp.BibTextIndex.load(path)
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual(loaded.search('control "markov chains"'), self.index.search('control "markov chains"'))
+        loaded.remove('third')
+        self.assertEqual(loaded.find_phrase('markov chains'), {'first'})
+
+    def test_config(self):
+        config = bp.BibConfig(string_latex_tuppels=bp.BibDefinitions._string_latex_tuppels + (('Ω', '\\myomega'),))
+        index = bp.BibTextIndex([{'ID': 'omega', 'title': 'The \\myomega{} principle'}], fields=('title',), config=config)
+        self.assertEqual(self.index.tokenize('\\myomega{} principle'), ['myomega', 'principle'])
+        self.assertEqual(index.tokenize('\\myomega{} principle'), ['ω', 'principle'])
+        self.assertEqual(index.find_phrase('Ω principle'), {'omega'})
+
+
+if __name__ == '__main__':
+    unittest.main()
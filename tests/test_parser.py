@@ -1,4 +1,9 @@
+import io
+import asyncio
+import threading
 import unittest
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
 import bibtexparser as bp
 
 class TestBibtexparser(unittest.TestCase):
@@ -223,6 +228,16 @@ class TestBibtexparser(unittest.TestCase):
         self.parser.set_entry_field(test_entry,"title","I call for HELP")
         self.assertEqual(test_entry["title"],"I call for HELP")
 
+    def test_processing_latex_variants(self):
+        test_entry = {"ENTRYTYPE":"article","ID":"test"}
+
+        self.parser.set_entry_field(test_entry,"title",'St\\"{u}dli St\\"udli St{\\"u}dli St{\\"{u}}dli')
+        self.assertEqual(test_entry["title"],"Stüdli Stüdli Stüdli Stüdli")
+        self.parser.set_entry_field(test_entry,"title","\\v{S}ime\\v cek \\L\\'{o}d\\'{z} Gau\\ss{} \\'{\\i}")
+        self.assertEqual(test_entry["title"],"Šimeček Łódź Gauß í")
+        self.parser.set_entry_field(test_entry,"title","\\o \\over")
+        self.assertEqual(test_entry["title"],"ø \\over")
+
     def test_processing_internal_integer_fields(self):
         test_entry = {"ENTRYTYPE":"article","ID":"test"}
 
@@ -244,6 +259,26 @@ class TestBibtexparser(unittest.TestCase):
         self.assertIn("S. Stüdli", test_entry["author"])
         self.assertIn("Peters, Edwin", test_entry["author"])
 
+    def test_custom_field_processing_stages(self):
+        test_entry = {"ENTRYTYPE":"article","ID":"test"}
+
+        self.parser.add_field_processing_stage("note", str.upper)
+        self.parser.add_field_processing_stage(["title","note"], lambda field: field.replace("-", " "), first=True)
+        self.parser.add_field_processing_stage(None, lambda field: field)
+        self.parser.set_entry_field(test_entry,"note","a-b")
+        self.assertEqual(test_entry["note"],"A B")
+        self.parser.set_entry_field(test_entry,"title","{CO}-\\\"{u}")
+        self.assertEqual(test_entry["title"],"CO ü")
+
+        # changes of the global definitions recompile the pipelines
+        bp.BibDefinitions.add_containing_latex_fields("note")
+        self.parser.set_entry_field(test_entry,"note","\\\"{u}")
+        self.assertEqual(test_entry["note"],"Ü")
+
+        self.parser.clear_field_processing_stages()
+        self.parser.set_entry_field(test_entry,"note","a-b")
+        self.assertEqual(test_entry["note"],"a-b")
+
     def test_adding_internal_integer_fields(self):
         bp.BibDefinitions.add_stored_as_integer('author',{"s. stüdli":1,"stüdli, s.":1,"e. peters": 2,"peters, e.":2, "peters, edwin":2},['',"Stüdli, S.", "Peters, E."])
         test_entry = {"ENTRYTYPE":"article","ID":"test"}
@@ -426,7 +461,283 @@ class TestBibtexparser(unittest.TestCase):
         self.assertEqual(test_entry['volume'], '{85}')
         self.assertNotIn('link',test_entry.keys())
 
+
+    def test_bibtex_string_parse_with_nested_braces(self):
+        test_string = """
+        @article{id,
+        title = {A {Nested} title, with {braces}},
+        note = {field, with {commas, and} braces},
+        journal = jan # "x, y",
+        year = 2012
+        }
+        """
+        test_entry = self.parser.parse(test_string)
+
+        self.assertEqual(test_entry['ID'], 'id')
+        self.assertEqual(test_entry['title'], 'A {Nested} title, with {braces}')
+        self.assertEqual(test_entry['note'], 'field, with {commas, and} braces')
+        self.assertEqual(test_entry['journal'], 'jan # "x, y"')
+        self.assertEqual(test_entry['year'], '2012')
+
+    def test_bibtex_string_parse_with_parentheses(self):
+        test_string = """
+        @Book(id,
+        title = "Title (with parentheses)",
+        year = {2012})
+        """
+        test_entry = self.parser.parse(test_string)
+
+        self.assertEqual(test_entry['ENTRYTYPE'], 'book')
+        self.assertEqual(test_entry['ID'], 'id')
+        self.assertEqual(test_entry['title'], 'Title (with parentheses)')
+        self.assertEqual(test_entry['year'], '2012')
+
+    def test_bibtex_string_parse_invalid(self):
+        self.assertIsNone(self.parser.parse("no bibtex entry"))
+        self.assertIsNone(self.parser.parse("@article"))
+
+    def test_iterparse_several_entries(self):
+        test_string = """
+        % a comment before the entries
+        @article{first,
+        author = {Test. M},
+        title = {Title, with {braces}},
+        note = {mail@example.com},
+        }
+        @book{second, title = "Second"}
+        @broken
+        @misc{third,
+        year = 2012}
+        """
+        for chunk_size in [1, 7, 64, 4096]:
+            entries = list(self.parser.iterparse(io.StringIO(test_string), chunk_size))
+            self.assertEqual([entry['ID'] for entry in entries], ['first', 'second', 'third'])
+            self.assertEqual(entries[0]['title'], 'Title, with {braces}')
+            self.assertEqual(entries[0]['note'], 'mail@example.com')
+            self.assertEqual(entries[2]['year'], '2012')
+
+        entries = list(bp.iterparse(io.BytesIO(test_string.encode('utf-8')), chunk_size=5))
+        self.assertEqual([entry['ID'] for entry in entries], ['first', 'second', 'third'])
+
+    def test_iterparse_blocks(self):
+        test_string = """
+        @string{ieee = "IEEE"}
+        @preamble{"\\newcommand{\\noop}[1]{}"}
+        @article{first, title = {First}}
+        @comment{jabref-meta: databaseType:bibtex;}
+        @STRING(acm = {ACM})
+        @misc{second, note = {Second}}
+        @Comment{jabref-meta: grouping:
+        0 AllEntriesGroup:;
+        }
+        """
+        for chunk_size in [1, 16, 4096]:
+            with self.assertLogs('bibtexentryparser.bibtokenizer', level='DEBUG') as logs:
+                entries = list(self.parser.iterparse(io.StringIO(test_string), chunk_size))
+            self.assertEqual([entry['ID'] for entry in entries], ['first', 'second'])
+            self.assertEqual([record.levelname for record in logs.records], ['DEBUG'] * 5)
+        spans = list(bp.bibtokenizer.iter_entry_spans(test_string))
+        self.assertEqual([test_string[span[2]:span[3]] for span in spans], ['first', 'second'])
+
+    def test_iterparse_unbalanced_entry(self):
+        test_string = """
+        @article{first, title = {First}}
+        @article{broken,
+        title = {{Broken title},
+        year = 2012}
+        @misc{third,
+        title = {Third}}
+        """
+        for chunk_size in [1, 16, 4096]:
+            with self.assertLogs('bibtexentryparser.bibtokenizer', level='WARNING'):
+                entries = list(self.parser.iterparse(io.StringIO(test_string), chunk_size))
+            self.assertEqual([entry['ID'] for entry in entries], ['first', 'third'])
+            self.assertEqual(entries[1]['title'], 'Third')
+
+        for chunk_size in [1, 16, 4096]:
+            with self.assertLogs('bibtexentryparser.bibtokenizer', level='WARNING'):
+                bibstrings = list(bp.bibtokenizer.iter_entry_strings(io.StringIO(test_string), chunk_size,
+                                                                     match_braces=True))
+            self.assertEqual([self.parser.parse(bibstring)['ID'] for bibstring in bibstrings], ['first', 'third'])
+
+    def test_aiterparse(self):
+        test_string = "".join("@article{id%d,\n author = {St\\\"{u}dli, S.},\n title = {Title %d},\n}\n" % (i, i) for i in range(10))
+
+        async def parse():
+            reader = asyncio.StreamReader()
+            data = test_string.encode('utf-8')
+            for start in range(0, len(data), 7):
+                reader.feed_data(data[start:start + 7])
+            reader.feed_eof()
+            return [entry async for entry in bp.aiterparse(reader, batch_size=3)]
+
+        entries = asyncio.run(parse())
+        self.assertEqual([entry['ID'] for entry in entries], ['id%d' % i for i in range(10)])
+        self.assertEqual(entries[9]['author'], ['Stüdli, S.'])
+        self.assertEqual(entries, list(self.parser.iterparse(io.StringIO(test_string))))
+
+    def test_aiterparse_options(self):
+        test_string = "".join("@article{id%d, title = {Tr\xe4ume %d}}\n" % (i, i) for i in range(5))
+        read_sizes = []
+        close_threads = []
+        close = bp.bibtokenizer.EntrySplitter.close
+
+        class RecordingReader(asyncio.StreamReader):
+            async def read(self, n=-1):
+                read_sizes.append(n)
+                return await super().read(n)
+
+        def recorded_close(splitter):
+            close_threads.append(threading.current_thread())
+            return close(splitter)
+
+        async def parse(executor):
+            reader = RecordingReader()
+            reader.feed_data(test_string.encode('latin-1'))
+            reader.feed_eof()
+            return [entry async for entry in bp.aiterparse(reader, batch_size=2, executor=executor, chunk_size=5,
+                                                           encoding='latin-1')]
+
+        with ThreadPoolExecutor(1) as executor:
+            with mock.patch.object(bp.bibtokenizer.EntrySplitter, 'close', autospec=True, side_effect=recorded_close):
+                entries = asyncio.run(parse(executor))
+        self.assertEqual([entry['title'] for entry in entries], ['Träume %d' % i for i in range(5)])
+        self.assertEqual(set(read_sizes), {5})
+        # the splitter is closed in the executor, not in the event loop
+        self.assertEqual(len(close_threads), 1)
+        self.assertIsNot(close_threads[0], threading.main_thread())
+
+    def test_parse_many(self):
+        test_string = "".join("@article{id%d,\n author = {St\\\"{u}dli, S.},\n month = {%s},\n keyw = {k%d},\n}\n" % (i, ['jan', 'june', 'unknown'][i % 3], i) for i in range(20))
+        self.parser.add_key_replacement("keyw","tags")
+        entries = list(self.parser.parse_many(io.StringIO(test_string), workers=2, batch_size=3))
+
+        self.assertIn("unknown",bp.BibDefinitions.get_non_recognised_string_fields("month"))
+        self.assertEqual([entry['ID'] for entry in entries], ['id%d' % i for i in range(20)])
+        self.assertEqual(entries[0]['author'], ['Stüdli, S.'])
+        self.assertEqual(entries[1]['month'], 6)
+        self.assertEqual(entries[5]['tags'], 'k5')
+        self.assertEqual(entries, list(self.parser.iterparse(io.StringIO(test_string))))
+
+    def test_compact_entry_factory(self):
+        test_string = """
+        @article{id,
+        author = {St\\"{u}dli, S. and Peters, E.},
+        title = {Title},
+        month = {June},
+        customfield = {custom},
+        }
+        """
+        parser = bp.bibparser.BibTexParser(entry_factory=bp.BibEntry)
+        test_entry = parser.parse(test_string)
+
+        self.assertIsInstance(test_entry, bp.BibEntry)
+        self.assertEqual(test_entry, self.parser.parse(test_string))
+        self.assertEqual(test_entry['customfield'], 'custom')
+        self.assertEqual(test_entry['month'], 6)
+        self.assertNotIn('journal', test_entry)
+        self.assertRaises(KeyError, lambda: test_entry['journal'])
+        self.assertEqual(bp.write(test_entry), bp.write(self.parser.parse(test_string)))
+
+        bp.setString(test_entry, 'journal', 'Journal')
+        self.assertEqual(bp.getString(test_entry, 'journal'), '{Journal}')
+        del test_entry['customfield']
+        self.assertEqual(sorted(test_entry), ['ENTRYTYPE', 'ID', 'author', 'journal', 'month', 'title'])
+
+    def test_interning(self):
+        test_string = "".join("@article{id%d,\n author = {Peters, E. and Author %d},\n journal = {Journal of Tests},\n title = {Title %d},\n}\n" % (i, i, i) for i in range(10))
+        self.parser.enable_interning(maxsize=5, fields=['author','journal'])
+        entries = list(self.parser.iterparse(io.StringIO(test_string)))
+
+        self.assertIs(entries[0]['journal'], entries[9]['journal'])
+        self.assertIs(entries[0]['author'][0], entries[9]['author'][0])
+        self.assertIs(entries[0]['ENTRYTYPE'], entries[9]['ENTRYTYPE'])
+        self.assertIsNot(entries[0]['author'], entries[9]['author'])
+
+        statistics = self.parser.get_interning_statistics()
+        self.assertEqual(statistics['size'], 5)
+        self.assertEqual(statistics['hits'], 27)
+        self.assertEqual(statistics['misses'], 13)
+        self.assertEqual(statistics['evictions'], 8)
+        self.assertGreater(statistics['saved_bytes'], 0)
+
+        self.parser.disable_interning()
+        self.assertIsNone(self.parser.get_interning_statistics())
+
+    def test_field_cache(self):
+        test_entry = {"ENTRYTYPE":"article","ID":"test"}
+        self.parser.enable_field_cache(maxsize=10, fields=['journal','author','month'])
+
+        for i in range(3):
+            self.parser.set_entry_field(test_entry,"journal","{IEEE} Transactions")
+            self.parser.set_entry_field(test_entry,"note","Note")
+        self.assertEqual(test_entry["journal"],"IEEE Transactions")
+        statistics = self.parser.get_field_cache_statistics()
+        self.assertEqual((statistics['hits'], statistics['misses'], statistics['size']), (2, 1, 1))
+
+        self.parser.set_entry_field(test_entry,"author","Peters, E. and St\\\"{u}dli, S.")
+        authors = test_entry["author"]
+        self.parser.set_entry_field(test_entry,"author","Peters, E. and St\\\"{u}dli, S.")
+        self.assertEqual(test_entry["author"], ["Peters, E.", "Stüdli, S."])
+        self.assertIsNot(test_entry["author"], authors)
+
+        # changes of the global definitions clear the cache
+        bp.BibDefinitions.add_stored_as_integer('month',{'spring':3},['','','','Spring'])
+        self.parser.set_entry_field(test_entry,"journal","{IEEE} Transactions")
+        self.assertEqual(self.parser.get_field_cache_statistics()['size'], 1)
+        self.parser.set_entry_field(test_entry,"month","Spring")
+        self.assertEqual(test_entry["month"], 3)
+
+        self.parser.disable_field_cache()
+        self.assertIsNone(self.parser.get_field_cache_statistics())
         
+    def test_timing(self):
+        test_string = """@article{id,
+        author = {M{\\"u}ller, Anna and Smith, John},
+        title = {{M}arkov chains},
+        month = {jan},
+        year = {2012},}"""
+        self.assertIsNone(self.parser.get_timing_statistics())
+        self.parser.add_field_processing_stage('year', int)
+        self.parser.enable_timing()
+        entry = self.parser.parse(test_string)
+        self.assertEqual(entry['author'], ['Müller, Anna', 'Smith, John'])
+        self.assertEqual(entry['year'], 2012)
+        self.parser.parse(test_string)
+
+        statistics = self.parser.get_timing_statistics()
+        self.assertEqual(statistics['stages']['entry']['calls'], 2)
+        self.assertEqual(statistics['stages']['tokenize']['calls'], 2)
+        self.assertEqual(statistics['stages']['latex_to_string']['calls'], 4)
+        self.assertEqual(statistics['fields']['author']['authors']['calls'], 2)
+        self.assertEqual(statistics['fields']['title']['unprotect_upper_case']['calls'], 2)
+        self.assertEqual(statistics['fields']['month']['stored_as_integer']['calls'], 2)
+        self.assertEqual(statistics['fields']['year']['custom:int']['calls'], 2)
+        self.assertGreater(statistics['stages']['entry']['ns'], 0)
+
+        self.parser.timer.reset()
+        self.assertEqual(self.parser.get_timing_statistics()['stages']['entry'], {'calls': 0, 'ns': 0})
+        self.parser.disable_timing()
+        self.assertEqual(self.parser.parse(test_string), entry)
+        self.assertIsNone(self.parser.get_timing_statistics())
+
+    def test_set_entry_fields(self):
+        test_entries = [{"ID": "a", "ENTRYTYPE": "article"}, {"ID": "b", "ENTRYTYPE": "book"}]
+        updates = [
+            {"Authors": 'M{\\"u}ller, Anna and Smith, John', "month": "jan"},
+            {"title": "{M}arkov chains", "month": "{}"},
+        ]
+        self.assertIs(self.parser.set_entry_fields(test_entries, updates)[0], test_entries[0])
+        self.assertEqual(test_entries[0]["author"], ["Müller, Anna", "Smith, John"])
+        self.assertEqual(test_entries[0]["month"], 1)
+        self.assertEqual(test_entries[1], {"ID": "b", "ENTRYTYPE": "book", "title": "Markov chains", "month": 0})
+
+        bp.setStrings(test_entries, {"keyw": "control", "month": "June"})
+        self.assertEqual([entry["keyword"] for entry in test_entries], ["control", "control"])
+        self.assertEqual([entry["month"] for entry in test_entries], [6, 6])
+        with self.assertRaises(ValueError):
+            self.parser.set_entry_fields(test_entries, [{"month": "jan"}])
+
     def test_load_function(self):
         test_string = """
         @article{id,
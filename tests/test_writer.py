@@ -1,3 +1,5 @@
+import io
+import asyncio
 import unittest
 import bibtexparser as bp
 
@@ -129,6 +131,47 @@ class TestBibtexparser(unittest.TestCase):
         self.assertEqual(self.writer.get_entry_field(test_entry,"month"),"{March}")
         self.assertEqual(self.writer.get_entry_field(test_entry,"note"),"Test")
 
+    def test_writing_latex_conversions(self):
+        test_entry = {
+            "ID": "test",
+            "ENTRYTYPE": "article",
+            "publisher": "Šimeček & Łódź ò ó",
+            "note": "Šimeček & Łódź",
+        }
+        self.assertEqual(self.writer.get_entry_field(test_entry,"publisher"),"{\\v{S}ime\\v{c}ek \\& {\\L}\\'{o}d\\'{z} \\`{o} \\'{o}}")
+        self.assertEqual(self.writer.get_entry_field(test_entry,"note"),"{Šimeček & Łódź}")
+
+        string_latex_tuppels = bp.BibDefinitions._string_latex_tuppels
+        try:
+            bp.BibDefinitions.add_latex_conversions([("€","\\texteuro{}")])
+            test_entry["publisher"] = "5€"
+            self.assertEqual(self.writer.get_entry_field(test_entry,"publisher"),"{5\\texteuro{}}")
+            self.assertEqual(bp.BibDefinitions.latex_to_string("5\\texteuro{}"),"5€")
+        finally:
+            bp.BibDefinitions._string_latex_tuppels = string_latex_tuppels
+
+    def test_writing_control_words(self):
+        test_entry = {
+            "ID": "test",
+            "ENTRYTYPE": "article",
+            "author": ["Søren Straße Łukasz", "García, Æsop"],
+        }
+        self.assertEqual(self.writer.get_entry_field(test_entry,"author"),"{S{\\o}ren Stra{\\ss}e {\\L}ukasz and Garc\\'{\\i}a, {\\AE}sop}")
+        parsed_entry = bp.bibparser.BibTexParser().parse(self.writer.write(test_entry))
+        self.assertEqual(parsed_entry["author"], test_entry["author"])
+        self.assertEqual(bp.BibDefinitions.latex_to_string("Garc\\'{i}a"), "García")
+
+    def test_writing_protected_upper_case_words(self):
+        test_entry = {
+            "ID": "test",
+            "ENTRYTYPE": "article",
+            "title": "Markovian jump systems: Lyapunov functions for MIMO iPhones",
+        }
+        self.assertEqual(self.writer.get_entry_field(test_entry,"title"),"{{M}arkovian jump systems: {L}yapunov functions for {MIMO} iPhones}")
+
+        bp.BibDefinitions.add_protected_upper_case_words(["Markovian","iPhone"])
+        self.assertEqual(self.writer.get_entry_field(test_entry,"title"),"{{M}arkovian jump systems: {L}yapunov functions for {MIMO} i{P}hones}")
+
     def test_write_full_basic(self):
         test_entry = {
             "ID": "test",
@@ -180,6 +223,144 @@ class TestBibtexparser(unittest.TestCase):
         expected_output = """@article{test,\n    author = {S. St\\\"{u}dli and E. Peters},\n    title = {{L}yapunov and {CO}: {L}atex strings \\\"{u}},\n}\n"""
         self.assertEqual(self.writer.write(test_entry),expected_output)
         
+    def test_write_output_plan_invalidation(self):
+        test_entry = {
+            "ID": "test",
+            "ENTRYTYPE": "article",
+            "title": "Title",
+            "month": 3,
+            "note": "ü",
+        }
+        self.assertEqual(self.writer.write(test_entry),"""@article{test,\n    month = {March},\n    note = {ü},\n    title = {Title},\n}\n""")
+
+        self.writer.add_do_not_display_field("month")
+        self.assertEqual(self.writer.write(test_entry),"""@article{test,\n    note = {ü},\n    title = {Title},\n}\n""")
+
+        self.writer.display_order = ["title"]
+        self.writer.indent = "  "
+        self.assertEqual(self.writer.write(test_entry),"""@article{test,\n  title = {Title},\n  note = {ü},\n}\n""")
+
+        bp.BibDefinitions.add_containing_latex_fields("note")
+        self.assertEqual(self.writer.write(test_entry),"""@article{test,\n  title = {Title},\n  note = {\\"{u}},\n}\n""")
+
+        # settings changed in place
+        self.writer.display_order.append("note")
+        self.writer.do_not_display_fields.clear()
+        self.assertEqual(self.writer.write(test_entry),"""@article{test,\n  title = {Title},\n  note = {\\"{u}},\n  month = {March},\n}\n""")
+        self.writer.do_not_display_fields.add("note")
+        self.writer.write_as_string_fields.add("title")
+        self.assertEqual(self.writer.write(test_entry),"""@article{test,\n  title = Title,\n  month = {March},\n}\n""")
+
+    def test_write_field_cache(self):
+        self.writer.enable_field_cache(maxsize=10)
+        test_entry = {
+            "ID": "test",
+            "ENTRYTYPE": "article",
+            "author": ["S. Stüdli","E. Peters"],
+            "journal": "IEEE Transactions für",
+            "month": 3,
+        }
+        expected_output = """@article{test,\n    author = {S. St\\\"{u}dli and E. Peters},\n    journal = {{IEEE} Transactions für},\n    month = {March},\n}\n"""
+        for i in range(3):
+            self.assertEqual(self.writer.write(test_entry),expected_output)
+        statistics = self.writer.get_field_cache_statistics()
+        self.assertEqual((statistics['hits'], statistics['misses'], statistics['size']), (8, 4, 4))
+
+        bp.BibDefinitions.add_containing_latex_fields("journal")
+        self.assertEqual(self.writer.get_entry_field(test_entry,"journal"),"{{IEEE} Transactions f\\\"{u}r}")
+        self.assertEqual(self.writer.get_field_cache_statistics()['size'], 1)
+
+    def test_write_timing(self):
+        test_entry = {
+            "ID": "test",
+            "ENTRYTYPE": "article",
+            "author": ["S. Stüdli","E. Peters"],
+            "title": "Lyapunov and CO",
+            "month": 3,
+        }
+        expected_output = self.writer.write(test_entry)
+        self.assertIsNone(self.writer.get_timing_statistics())
+        self.writer.enable_timing()
+        for i in range(3):
+            self.assertEqual(self.writer.write(test_entry),expected_output)
+
+        statistics = self.writer.get_timing_statistics()
+        self.assertEqual(statistics['stages']['entry']['calls'], 3)
+        self.assertEqual(statistics['stages']['field']['calls'], 9)
+        self.assertEqual(statistics['fields']['author']['string_to_latex']['calls'], 6)
+        self.assertEqual(statistics['fields']['title']['protect_upper_case']['calls'], 3)
+        self.assertEqual(statistics['fields']['month']['integer_to_string']['calls'], 3)
+        self.assertEqual(set(statistics['fields']), {'author', 'title', 'month'})
+
+        self.writer.disable_timing()
+        self.assertEqual(self.writer.write(test_entry),expected_output)
+        self.assertIsNone(self.writer.get_timing_statistics())
+
+    def test_get_entry_fields(self):
+        test_entries = [
+            {"ID": "a", "ENTRYTYPE": "article", "author": ["S. Stüdli","E. Peters"], "title": "Lyapunov", "month": 6},
+            {"ID": "b", "ENTRYTYPE": "book", "title": "CO and Markov"},
+        ]
+        keys = ["ID", "author", "title", "month"]
+        rows = self.writer.get_entry_fields(test_entries, keys)
+        self.assertEqual(rows, [
+            [self.writer.get_entry_field(test_entries[0], key) for key in keys],
+            ["{b}", None, "{{CO} and {M}arkov}", None],
+        ])
+        self.assertEqual(rows[0][1], "{S. St\\\"{u}dli and E. Peters}")
+        self.assertEqual(bp.getStrings(iter(test_entries), ["month"], default=""), [["{June}"], [""]])
+        self.assertEqual(self.writer.get_entry_fields([], keys), [])
+
+    def test_write_to_file(self):
+        test_entries = [{
+            "ID": "test%d" % i,
+            "ENTRYTYPE": "article",
+            "author": ["S. Stüdli","E. Peters"],
+            "note": "Test",
+        } for i in range(3)]
+        expected_entry = """@article{test%d,\n    author = {S. St\\\"{u}dli and E. Peters},\n    note = {Test},\n}\n"""
+        expected_output = "\n".join(expected_entry % i for i in range(3))
+
+        self.assertEqual(list(self.writer.write_many(test_entries)), [expected_entry % i for i in range(3)])
+
+        text_file = io.StringIO()
+        self.assertEqual(self.writer.write_to(text_file, test_entries, buffer_size=10), 3)
+        self.assertEqual(text_file.getvalue(), expected_output)
+
+        binary_file = io.BytesIO()
+        self.assertEqual(bp.write_to(binary_file, iter(test_entries)), 3)
+        self.assertEqual(binary_file.getvalue().decode('utf-8'), expected_output)
+
+        self.assertEqual(list(bp.iterparse(io.StringIO(expected_output))), [
+            {"ID": "test%d" % i, "ENTRYTYPE": "article", "author": ["S. Stüdli","E. Peters"], "note": "Test"} for i in range(3)])
+
+    def test_awrite(self):
+        test_entries = [{"ID": "test%d" % i, "ENTRYTYPE": "article", "note": "Tést"} for i in range(5)]
+
+        class Stream(object):
+            def __init__(self):
+                self.data = b''
+                self.drained = 0
+            def write(self, data):
+                self.data += data
+            async def drain(self):
+                self.drained += 1
+
+        async def entries():
+            for entry in test_entries:
+                yield entry
+
+        stream = Stream()
+        self.assertEqual(asyncio.run(bp.awrite(stream, entries(), batch_size=2)), 5)
+        self.assertEqual(stream.drained, 3)
+        text_file = io.StringIO()
+        self.writer.write_to(text_file, test_entries)
+        self.assertEqual(stream.data.decode('utf-8'), text_file.getvalue())
+
+        stream = Stream()
+        self.assertEqual(asyncio.run(self.writer.awrite(stream, test_entries)), 5)
+        self.assertEqual(stream.data.decode('utf-8'), text_file.getvalue())
+
 if __name__ =="__main__":
     unittest.main()
 